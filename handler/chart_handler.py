@@ -1,12 +1,14 @@
 from telegram.ext import CallbackContext
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto
 
+import asyncio
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from modules.oscillator_chart import draw_chart
 from utils.recent_search_util import save_recent_searches
-from utils.naver_stock_util import search_stock_code
+from utils.naver_stock_util import search_stock_code_async
+from utils.deadline_util import Deadline, DeadlineExceeded, CHART_DEADLINE
 
 async def process_selected_stock_for_chart(update: Update, context: CallbackContext, stock_name: str, stock_code: str):
     chat_id = update.effective_chat.id
@@ -21,7 +23,11 @@ async def process_selected_stock_for_chart(update: Update, context: CallbackCont
         context.bot_data['recent_searches'][user_id].append({'name': stock_name, 'code': stock_code})
     save_recent_searches(context.bot_data['recent_searches'])
 
-    chart_filename = draw_chart(stock_code, stock_name)
+    # 차트 생성(pykrx 조회 + 렌더링)은 스레드에서 실행해 봇 이벤트 루프를 막지 않음 (같은 종목 동시 요청은 draw_chart에서 하나로 합쳐짐)
+    try:
+        chart_filename = await asyncio.to_thread(draw_chart, stock_code, stock_name, Deadline(CHART_DEADLINE))
+    except DeadlineExceeded:
+        chart_filename = None
     if chart_filename and os.path.exists(chart_filename):
         context.user_data['generated_charts'].append(chart_filename)
     else:
@@ -66,9 +72,16 @@ async def generate_and_send_charts_from_files(context, chat_id, chart_files):
 
 async def process_generate_chart_stock_list(update: Update, context: CallbackContext, user_id: str, message) -> None:
     stock_list = context.user_data.get('stock_list', [])
+    # 명령 전체(검색 + 차트 생성)의 처리 시한. 시한이 지나면 그때까지 만든 차트만 전송
+    deadline = Deadline(CHART_DEADLINE)
 
     for stock_name in stock_list:
-        results = search_stock_code(stock_name)
+        try:
+            deadline.check()
+            results = await search_stock_code_async(stock_name, hedge=True, deadline=deadline)
+        except DeadlineExceeded:
+            await message.reply_text(f"처리 시간({CHART_DEADLINE:.0f}초)을 초과하여 {stock_name}부터는 차트를 생성하지 못했습니다.")
+            break
         if results and len(results) == 1:
             stock_name, stock_code = results[0]['name'], results[0]['code']
             await message.reply_text(f"{stock_name}({stock_code}) 차트를 생성 중...")
@@ -80,7 +93,10 @@ async def process_generate_chart_stock_list(update: Update, context: CallbackCon
                 context.bot_data['recent_searches'][user_id].append({'name': stock_name, 'code': stock_code})
             save_recent_searches(context.bot_data['recent_searches'])
 
-            chart_filename = draw_chart(stock_code, stock_name)
+            try:
+                chart_filename = await asyncio.to_thread(draw_chart, stock_code, stock_name, deadline)
+            except DeadlineExceeded:
+                chart_filename = None
             if chart_filename and os.path.exists(chart_filename):
                 context.user_data['generated_charts'].append(chart_filename)
             else:
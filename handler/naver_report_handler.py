@@ -2,7 +2,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CallbackContext
 from datetime import datetime, timedelta
 from modules.naver_stock_report import search_stock_report_pc
-from utils.naver_stock_util import search_stock_code
+from utils.naver_stock_util import search_stock_code_async
 from utils.recent_search_util import save_recent_searches
 
 async def process_naver_report_request(update: Update, context: CallbackContext, user_id: str, message) -> None:
@@ -11,7 +11,7 @@ async def process_naver_report_request(update: Update, context: CallbackContext,
     writeToDate = datetime.today().strftime('%Y-%m-%d')
 
     for stock_name in stock_list:
-        results = search_stock_code(stock_name)
+        results = await search_stock_code_async(stock_name, hedge=True)
         if results and len(results) == 1:
             stock_name, stock_code = results[0]['name'], results[0]['code']
             await fetch_and_send_reports(update, context, user_id, message, stock_name, stock_code, writeFromDate, writeToDate)
@@ -2,14 +2,18 @@ from telegram import Update, InputFile
 from telegram.ext import CallbackContext
 import os
 import pandas as pd
-from modules.naver_upjong_quant import fetch_stock_info_quant_API
+from modules.naver_upjong_quant import fetch_stock_info_quant_API_async
+from utils.deadline_util import Deadline, DeadlineExceeded, STOCK_QUANT_DEADLINE
 from datetime import datetime
 
 async def process_selected_stock_for_quant(update: Update, context: CallbackContext, stock_name: str, stock_code: str, url: str):
     chat_id = update.effective_chat.id
 
-    # 종목 정보를 가져옵니다.
-    quant_data = fetch_stock_info_quant_API(stock_code, url)
+    # 종목 정보를 가져옵니다. (명령 처리 시한 내에서만 조회, 시한 초과 시 받은 항목까지만 반환, 만료 직후 캐시는 바로 반환 후 백그라운드 갱신)
+    try:
+        quant_data = await fetch_stock_info_quant_API_async(stock_code, url=url, hedge=True, deadline=Deadline(STOCK_QUANT_DEADLINE), allow_stale=True)
+    except DeadlineExceeded:
+        quant_data = {}
     all_quant_data = []
     if quant_data:
         all_quant_data.append(quant_data)
@@ -1,12 +1,12 @@
 from telegram import Update
 from telegram.ext import CallbackContext
-from modules.naver_upjong_quant import fetch_upjong_list_API
+from modules.naver_upjong_quant import fetch_upjong_list_API_async
 
 # 업종 목록을 보여주는 함수 (인덱스 포함)
 async def show_upjong_list(update: Update, context: CallbackContext) -> None:
     chat_id = update.effective_chat.id
     try:
-        upjong_list = fetch_upjong_list_API('KOR')
+        upjong_list = await fetch_upjong_list_API_async('KOR')
         upjong_message = "업종 목록:\n"
         upjong_map = {i: (업종명, 등락률, 링크) for i, (업종명, 등락률, 링크) in enumerate(upjong_list, 1)}
         
@@ -6,11 +6,13 @@ import time
 from telegram import Update, BotCommand, InputFile
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters, CallbackQueryHandler, CallbackContext
 from dotenv import load_dotenv
-from modules.naver_upjong_quant import fetch_upjong_list_API, fetch_stock_info_in_upjong, fetch_stock_info_quant_API
-from utils.naver_stock_util import search_stock_code
+from modules.naver_upjong_quant import fetch_upjong_list_API_async, fetch_stock_info_in_upjong_async, fetch_stock_info_quant_batch_async, DEADLINE_FAILURE
+from utils.naver_stock_util import search_stock_code_async
+from utils.deadline_util import Deadline, DeadlineExceeded, EXCEL_JOB_DEADLINE
+from utils.http_util import aclose_async_client
 from app_secrets.endpoints import NAVER_FINANCE_STOCK_PREFIX
 from utils.recent_search_util import load_recent_searches, show_recent_searches
-from modules.naver_stock_quant import fetch_dividend_stock_list_API
+from modules.naver_stock_quant import fetch_dividend_stock_list_API_async
 from utils.excel_util import process_excel_file
 
 
@@ -75,7 +77,7 @@ async def send_dividend_total_stock_count(update: Update, context: CallbackConte
     chat_id = update.effective_chat.id
     try:
         # 국내 배당 종목 수를 가져옴
-        dividend_data, dividend_total_stock_count = fetch_dividend_stock_list_API(requested_stock_count=1)
+        dividend_data, dividend_total_stock_count = await fetch_dividend_stock_list_API_async(requested_stock_count=1, allow_stale=True)
         dividend_message = (
             f"*국내 배당 종목 수는 {dividend_total_stock_count}개입니다\\.*\n\n"
             "필요한 *종목 수*를 전송해주세요\\.\n\n"
@@ -149,17 +151,14 @@ async def handle_message(update: Update, context: CallbackContext) -> None:
         링크 = context.user_data.get('링크')
         업종명 = context.user_data.get('업종명')
         
-        stock_info = fetch_stock_info_in_upjong(링크)
+        # 엑셀 작업 전체의 처리 시한 (시한이 지나면 그때까지 조회한 종목만으로 파일 생성)
+        deadline = Deadline(EXCEL_JOB_DEADLINE)
+        stock_info = await fetch_stock_info_in_upjong_async(링크)
         if stock_info:
-            all_quant_data = []
-            for 종목명, _, _, _, 종목링크 in stock_info:
-                stock_code = 종목링크.split('=')[-1]
-                results = search_stock_code(stock_code)
-                stock_code, stock_name, url, reutersCode = results[0]['code'], results[0]['name'], results[0]['url'], results[0]['reutersCode']
-                quant_data = fetch_stock_info_quant_API(stock_code, stock_name, url, reutersCode)
-                if quant_data:
-                    all_quant_data.append(quant_data)
-                else: pass
+            df = await fetch_stock_info_quant_batch_async([종목링크.split('=')[-1] for _, _, _, _, 종목링크 in stock_info], deadline=deadline)
+            timed_out = [code for code, reason in df.attrs['failures'].items() if reason == DEADLINE_FAILURE]
+            if timed_out:
+                await context.bot.send_message(chat_id=chat_id, text=f"처리 시간({EXCEL_JOB_DEADLINE:.0f}초) 초과로 {len(timed_out)}종목은 제외되었습니다.")
 
             # Ensure the folder exists
             if not os.path.exists(EXCEL_FOLDER_PATH):
@@ -167,10 +166,9 @@ async def handle_message(update: Update, context: CallbackContext) -> None:
             today_date = datetime.today().strftime('%y%m%d')
             excel_file_name = os.path.join(EXCEL_FOLDER_PATH, f'{업종명}_naver_quant_{today_date}.xlsx')
 
-            # Create a DataFrame and save to Excel with the sheet name as 업종명
-            df = pd.DataFrame(all_quant_data)
+            # Save to Excel with the sheet name as 업종명
             with pd.ExcelWriter(excel_file_name, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=업종명, index=False)
+                df.to_excel(writer, sheet_name=업종명, index=False, na_rep='N/A')
 
             process_excel_file(excel_file_name)
 
@@ -190,19 +188,22 @@ async def handle_message(update: Update, context: CallbackContext) -> None:
         stock_list = [stock.strip() for stock in re.split('[,\n]', user_input) if stock.strip()]
         context.user_data['stock_list'] = stock_list
 
-        all_quant_data = []
+        stock_records = []
         print(stock_list)
+        # 엑셀 작업 전체(검색 + 조회)의 처리 시한
+        deadline = Deadline(EXCEL_JOB_DEADLINE)
         # 종목 검색
         for stock_name in stock_list:
-            results = search_stock_code(stock_name)
+            try:
+                results = await search_stock_code_async(stock_name, hedge=True, deadline=deadline)
+            except DeadlineExceeded:
+                await update.message.reply_text(f"처리 시간({EXCEL_JOB_DEADLINE:.0f}초)을 초과하여 {stock_name}부터는 검색하지 못했습니다.")
+                break
             print(results)
             if results and len(results) == 1:
-                stock_code, stock_name, url, reutersCode = results[0]['code'], results[0]['name'], results[0]['url'], results[0]['reutersCode']
+                stock_name = results[0]['name']
                 await update.message.reply_text(f"{stock_name} 퀀트 파일 생성 중입니다.")
-                quant_data = fetch_stock_info_quant_API(stock_code, stock_name, url, reutersCode)
-                print(quant_data)
-                if quant_data:
-                    all_quant_data.append(quant_data)
+                stock_records.append(results[0])
             elif results and len(results) > 1:
                 # 사용자에게 종목 선택을 받지 않고 종목명이 일치하는 값으로 자동 치환처리
                 select_stock = None  # 초기 값으로 None 설정
@@ -218,21 +219,23 @@ async def handle_message(update: Update, context: CallbackContext) -> None:
                     await update.message.reply_text(f"{results} \n 종목에서 ")
                     await update.message.reply_text(f"{results[0]['name']}로 처리됩니다. ")
                     
-                stock_code, stock_name, url, reutersCode = results[0]['code'], results[0]['name'], results[0]['url'], results[0]['reutersCode']
+                stock_name = results[0]['name']
                 await update.message.reply_text(f"{stock_name} 퀀트 파일 생성 중입니다.")
-                quant_data = fetch_stock_info_quant_API(stock_code, stock_name, url, reutersCode)
-
-                if quant_data:
-                    all_quant_data.append(quant_data)
+                stock_records.append(results[0])
                 context.user_data['search_results'] = results
             else:
                 await update.message.reply_text(f"{stock_name} 검색 결과가 없습니다. 다시 시도하세요.")
+
+        # 검색이 끝난 레코드를 넘겨 자동완성 재조회 없이 한 번에 조회
+        df = await fetch_stock_info_quant_batch_async(stock_records, deadline=deadline)
+        for failed_code, reason in df.attrs['failures'].items():
+            await update.message.reply_text(f"{failed_code} 퀀트 데이터를 가져오지 못했습니다. ({reason})")
         
         # Ensure the folder exists
         if not os.path.exists(EXCEL_FOLDER_PATH):
             os.makedirs(EXCEL_FOLDER_PATH)
 
-        if all_quant_data:
+        if not df.empty:
             # Define the base file name and extension
             today_date = datetime.today().strftime('%y%m%d')
             base_file_name = f'stock_quant_{today_date}_{user_id}'
@@ -245,9 +248,8 @@ async def handle_message(update: Update, context: CallbackContext) -> None:
                 counter += 1
                 excel_file_name = os.path.join(EXCEL_FOLDER_PATH, f"{base_file_name}_{counter}{file_extension}")
 
-            # Create a DataFrame and save to Excel
-            df = pd.DataFrame(all_quant_data)
-            df.to_excel(excel_file_name, index=False, engine='openpyxl')
+            # Save to Excel
+            df.to_excel(excel_file_name, index=False, na_rep='N/A', engine='openpyxl')
 
             # Send the file to the user
             if os.path.exists(excel_file_name):
@@ -281,7 +283,7 @@ async def handle_message(update: Update, context: CallbackContext) -> None:
 
         elif next_command == 'upjong_quant':
             # 업종 검색 처리
-            upjong_list = fetch_upjong_list_API('KOR')
+            upjong_list = await fetch_upjong_list_API_async('KOR', allow_stale=True)
             upjong_map = {업종명: (등락률, 링크) for 업종명, 등락률, 링크 in upjong_list}
             upjong_number_map = {str(index + 1): 업종명 for index, (업종명, _, _) in enumerate(upjong_list)}
 
@@ -353,57 +355,63 @@ async def handle_document(update: Update, context: CallbackContext) -> None:
 
             # 최초 메시지 전송
             message = await context.bot.send_message(chat_id=chat_id, text="엑셀 퀀트 갱신 처리 중...")
+            # 모든 시트에 걸친 처리 시한 (시한 초과 종목은 기존 값을 유지)
+            deadline = Deadline(EXCEL_JOB_DEADLINE)
             with pd.ExcelWriter(updated_file_name, engine='openpyxl') as writer:
                 for sheet_name in sheet_names:
                     df = pd.read_excel(file_path, sheet_name=sheet_name)
                     update_message += f"============\n시트 이름: {sheet_name}\n"
 
                     stock_update_count = 0  # 갱신된 종목 수를 세기 위한 변수
+                    timed_out_count = 0  # 처리 시한 초과로 갱신하지 못한 종목 수
 
+                    # 행별 조회 키 (네이버url > 종목코드 > 종목명 순)
+                    row_targets = {}
                     for index, row in df.iterrows():
                         naver_url = row.get('네이버url')
                         stock_code = row.get('종목코드')
                         stock_name = row.get('종목명')
-                        memo = row.get('비고(메모)')
 
                         # 빈 값 처리
                         naver_url = '' if pd.isna(naver_url) else naver_url
                         stock_code = '' if pd.isna(stock_code) else stock_code
                         stock_name = '' if pd.isna(stock_name) else stock_name
-                        memo = '' if pd.isna(memo) else memo
 
                         if naver_url:
                             stock_code = naver_url.replace(NAVER_FINANCE_STOCK_PREFIX, '')
-                        try:
-                            # 퀀트 데이터 가져오기
-                            if stock_code:
-                                results = search_stock_code(stock_code)
-                                stock_code, stock_name, url, reutersCode = results[0]['code'], results[0]['name'], results[0]['url'], results[0]['reutersCode']
-                                quant_data = fetch_stock_info_quant_API(stock_code, stock_name, url, reutersCode)
-                            elif stock_name:
-                                results = search_stock_code(stock_name)
-                                stock_code, stock_name, url, reutersCode = results[0]['code'], results[0]['name'], results[0]['url'], results[0]['reutersCode']
-                                quant_data = fetch_stock_info_quant_API(stock_code, stock_name, url, reutersCode)
-                            else:
-                                quant_data = None
-                        except Exception as e:
-                            await context.bot.send_message(chat_id=chat_id, text=f"[{sheet_name}]시트의 [{stock_name}] 종목 처리 오류 데이터 갱신 실패. \n 오류 로그 : {e}")
+                        target = str(stock_code or stock_name).strip()
+                        if target:
+                            row_targets[index] = target
+
+                    # 시트의 종목을 한 번에 조회
+                    quant_df = await fetch_stock_info_quant_batch_async(row_targets.values(), deadline=deadline)
+                    failures = quant_df.attrs['failures']
+
+                    for index, target in row_targets.items():
+                        if failures.get(target) == DEADLINE_FAILURE:
+                            timed_out_count += 1
+                            continue
+                        if target in failures:
+                            await context.bot.send_message(chat_id=chat_id, text=f"[{sheet_name}]시트의 [{target}] 종목 처리 오류 데이터 갱신 실패. \n 오류 로그 : {failures[target]}")
                             continue  # 에러가 발생한 경우 다음 항목으로 넘어감
-                        
-                        # 각 종목 갱신 메시지 업데이트
-                        if quant_data:
-                            for key, value in quant_data.items():
-                                if key == '비고(메모)': value = row.get('비고(메모)')
-                                elif key == '분류': value = row.get('분류')
-                                df.at[index, key] = value
+                        if target not in quant_df.index:
+                            continue
 
-                            stock_update_count += 1  # 갱신된 종목 수 증가
+                        # 각 종목 갱신 (메모/분류 열은 사용자 값 유지)
+                        for key, value in quant_df.loc[target].items():
+                            if key in ('비고(메모)', '분류'):
+                                continue
+                            df.at[index, key] = 'N/A' if pd.isna(value) else value
+
+                        stock_update_count += 1  # 갱신된 종목 수 증가
 
                     # 시트 갱신 완료 메시지 추가
                     if stock_update_count > 0:
                         update_message += f"   {stock_update_count}종목 갱신 완료\n"
                     else:
                         update_message += "   갱신된 종목이 없습니다.\n"
+                    if timed_out_count > 0:
+                        update_message += f"   {timed_out_count}종목 처리 시간 초과 (기존 값 유지)\n"
 
                     # 시트가 넘어갈 때 메시지 업데이트
                     try:
@@ -502,10 +510,16 @@ def main():
     application.add_handler(CallbackQueryHandler(search_report, pattern="^search_new_keyword$"))
 
     # post_init을 사용하여 봇이 시작될 때 명령어를 설정합니다
+    # (캐시 정리는 reporter-worker의 매시 30분 작업에서만 실행)
     async def post_init(application):
         await set_commands(application.bot)
+
+    # 종료 시 공용 HTTP 커넥션 풀 정리
+    async def post_shutdown(application):
+        await aclose_async_client()
     
     application.post_init = post_init
+    application.post_shutdown = post_shutdown
 
     application.run_polling()
 
@@ -1,63 +1,62 @@
-import random, time, os, requests, pandas as pd, math, concurrent.futures, sys
+import random, time, os, pandas as pd, concurrent.futures, sys
 from pathlib import Path
 from dotenv import load_dotenv
-from tqdm import tqdm
 from datetime import datetime
-from modules.naver_upjong_quant import fetch_stock_info_quant_API
+from modules.naver_upjong_quant import (
+    fetch_stock_info_quant_batch, merge_preloaded,
+    QUANT_SNAPSHOT_NUMERIC_COLUMNS, QUANT_SNAPSHOT_STRING_COLUMNS,
+)
+from modules.naver_market_listing import fetch_market_listing, build_quote_table, build_listing_record
+from modules.krx_bulk_quant import build_valuation_table, build_returns_table
+from utils.http_util import http_post
+from utils.http_cache_util import http_cache_stats
+from models.MemoryCache import memory_cache_stats
+from models.NegativeCache import negative_cache_stats
+from models.QuantSnapshot import publish_snapshot
 from app_secrets.endpoints import (
     NAVER_KOSPI_MARKET_URL, NAVER_KOSDAQ_MARKET_URL,
-    NAVER_STOCK_PAGE_URL, TELEGRAM_SEND_DOCUMENT_URL,
+    TELEGRAM_SEND_DOCUMENT_URL,
 )
 
 # 전역 설정
 kospi_url = NAVER_KOSPI_MARKET_URL
 kosdaq_url = NAVER_KOSDAQ_MARKET_URL
-max_workers = 4 
-headers = {"User-Agent": "Mozilla/5.0"}
 
 def ensure_directory(path):
     if not os.path.exists(path): os.makedirs(path, exist_ok=True)
 
 def fetch_all_stocks(base_url, market_name):
-    params = {"page": 1, "pageSize": 100}
-    response = requests.get(base_url, headers=headers, params=params)
-    if response.status_code != 200: return [], []
-    total_count = response.json().get("totalCount", 0)
-    total_pages = math.ceil(total_count / 100)
-    all_stocks, etf_etn_stocks = [], []
-    for page in range(1, total_pages + 1):
-        res = requests.get(base_url, headers=headers, params={"page": page, "pageSize": 100})
-        if res.status_code == 200:
-            for s in res.json().get("stocks", []):
-                name = s.get("stockName", "")
-                if '스팩' in name and '호' in name: continue
-                info = {"종목코드": s.get("itemCode", ""), "종목명": name, "시가총액(억)": int(str(s.get("marketValue", "0")).replace(",", ""))}
-                if s.get("stockEndType") in ["etf", "etn"]: etf_etn_stocks.append(info)
-                else: all_stocks.append(info)
-    return all_stocks, etf_etn_stocks
-
-def fetch_quant_data(stock_info, target_date=None):
-    code = stock_info["종목코드"]
-    url = NAVER_STOCK_PAGE_URL.format(code=code)
-    # 날짜 인자를 추가하여 API 호출
-    return fetch_stock_info_quant_API(code, url=url, date=target_date) or {}
+    """
+    시장 목록 전체를 받아 (일반 종목, ETF/ETN, 시세 테이블, 종목 레코드)를 반환합니다.
+    목록에 들어있는 시세와 종목 정보를 그대로 사용해 종목별 검색/basic 호출을 생략합니다.
+    """
+    all_stocks, etf_etn_stocks, listed = [], [], []
+    for s in fetch_market_listing(base_url, market_name):
+        name = s.get("stockName", "")
+        if '스팩' in name and '호' in name: continue
+        listed.append(s)
+        info = {"종목코드": s.get("itemCode", ""), "종목명": name, "시가총액(억)": int(str(s.get("marketValue", "0")).replace(",", ""))}
+        if s.get("stockEndType") in ["etf", "etn"]: etf_etn_stocks.append(info)
+        else: all_stocks.append(info)
+    records = {s["itemCode"]: build_listing_record(s) for s in listed if s.get("itemCode")}
+    return all_stocks, etf_etn_stocks, build_quote_table(listed), records
 
-def add_quant_data(df, market_name, target_date=None):
+def add_quant_data(df, market_name, target_date=None, preloaded=None, records=None):
     if df.empty: return df
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # target_date를 각 스레드에 전달
-        futures = [executor.submit(fetch_quant_data, row, target_date) for row in df.to_dict('records')]
-        results = [f.result() for f in tqdm(futures, desc=f"Quant {market_name}", leave=False)]
-    
-    df_res = pd.concat([df, pd.DataFrame(results)], axis=1)
-    return df_res.sort_values(by="시가총액(억)", ascending=False).loc[:, ~df_res.columns.duplicated()]
+    # 목록 레코드/시세와 KRX 일괄 지표를 넘겨 배치 API로 조회 후 요청 종목코드 기준으로 병합 (종목코드/종목명은 목록 값 유지)
+    records = records or {}
+    targets = [records.get(code) or code for code in df["종목코드"]]
+    quant_df = fetch_stock_info_quant_batch(targets, date=target_date, preloaded=preloaded)
+    print(f"[{market_name}] 퀀트 수집 {len(quant_df)}/{len(df)}건 (실패 {len(quant_df.attrs['failures'])}건)")
+    df_res = df.join(quant_df.drop(columns=["종목코드", "종목명"]), on="종목코드")
+    return df_res.sort_values(by="시가총액(억)", ascending=False)
 
-def process_market_unit(market_tuple, target_date=None):
+def process_market_unit(market_tuple, target_date=None, valuations=None):
     market_name, base_url = market_tuple
     print(f"[{market_name}] 데이터 수집 시작... (기준일: {target_date or '오늘'})")
-    stocks, etf_etn = fetch_all_stocks(base_url, market_name)
-    df = add_quant_data(pd.DataFrame(stocks), market_name, target_date)
-    return market_name, df, etf_etn
+    stocks, etf_etn, quotes, records = fetch_all_stocks(base_url, market_name)
+    df = add_quant_data(pd.DataFrame(stocks), market_name, target_date, merge_preloaded(quotes, valuations), records)
+    return market_name, df, etf_etn, quotes, records
 
 def send_to_telegram(file_name, target_date):
     BASE_DIR = Path(__file__).parent.resolve()
@@ -70,7 +69,7 @@ def send_to_telegram(file_name, target_date):
     url = TELEGRAM_SEND_DOCUMENT_URL.format(token=token)
     caption = f"📊 [{target_date}] 주식 스크리닝 결과"
     with open(FILE_PATH, 'rb') as f:
-        res = requests.post(url, data={'chat_id': chat_id, 'caption': caption}, files={'document': f})
+        res = http_post(url, data={'chat_id': chat_id, 'caption': caption}, files={'document': f})
     return res.status_code == 200
 
 def main():
@@ -91,26 +90,45 @@ def main():
     
     market_dfs = {}
     combined_etf_etn = []
+    combined_quotes, combined_records = {}, {}
+
+    # KRX 전 종목 PER/PBR/배당수익률을 기준일 스냅샷 한 번으로 조회 (없는 종목은 종목별 조회로 보완)
+    # 기간수익률(1W~1Y)도 비교 영업일별 전 종목 종가 스냅샷으로 한 번에 계산 (종목별 380일 일봉 조회 생략)
+    valuations = merge_preloaded(build_valuation_table(target_date), build_returns_table(target_date))
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-        futures = [executor.submit(process_market_unit, m, target_date) for m in markets_to_process]
+        futures = [executor.submit(process_market_unit, m, target_date, valuations) for m in markets_to_process]
         for future in concurrent.futures.as_completed(futures):
-            name, df, etf_list = future.result()
+            name, df, etf_list, quotes, records = future.result()
             market_dfs[name] = df
             combined_etf_etn.extend(etf_list)
+            combined_quotes.update(quotes)
+            combined_records.update(records)
 
     print("[ETF_ETN] 데이터 수집 시작...")
-    df_etf = add_quant_data(pd.DataFrame(combined_etf_etn), "ETF_ETN", target_date)
+    df_etf = add_quant_data(pd.DataFrame(combined_etf_etn), "ETF_ETN", target_date, merge_preloaded(combined_quotes, valuations), combined_records)
 
     with pd.ExcelWriter(file_path, engine="xlsxwriter") as writer:
-        if "KOSPI" in market_dfs: market_dfs["KOSPI"].to_excel(writer, sheet_name="KOSPI", index=False)
-        if "KOSDAQ" in market_dfs: market_dfs["KOSDAQ"].to_excel(writer, sheet_name="KOSDAQ", index=False)
-        df_etf.to_excel(writer, sheet_name="ETF_ETN", index=False)
+        if "KOSPI" in market_dfs: market_dfs["KOSPI"].to_excel(writer, sheet_name="KOSPI", index=False, na_rep="N/A")
+        if "KOSDAQ" in market_dfs: market_dfs["KOSDAQ"].to_excel(writer, sheet_name="KOSDAQ", index=False, na_rep="N/A")
+        df_etf.to_excel(writer, sheet_name="ETF_ETN", index=False, na_rep="N/A")
         for sheet in writer.sheets.values():
             sheet.set_column(1, 1, 25)
             sheet.freeze_panes(1, 0)
     
     print(f"✅ [{target_date}] 엑셀 생성 완료 -> 전송")
+    # 오늘 기준 수집분만 봇 조회용 스냅샷으로 게시 (과거 날짜 재생성은 현재 데이터가 아니므로 제외)
+    # 장 마감 데이터 확정(16:30) 전 게시분이므로 시세/기간수익률은 16:35 예열(--publish_snapshot)이 다시 게시
+    if target_date == datetime.today().strftime('%y%m%d'):
+        frames = [*market_dfs.values(), df_etf]
+        records = [record for frame in frames if not frame.empty for record in frame.to_dict('records')]
+        # 스냅샷 게시 실패(디스크 등)로 엑셀 전송이 막히지 않도록 기록만 하고 진행
+        try:
+            publish_snapshot(records, QUANT_SNAPSHOT_NUMERIC_COLUMNS, QUANT_SNAPSHOT_STRING_COLUMNS, target_date=target_date)
+        except Exception as e:
+            print(f"[ERROR] 퀀트 스냅샷 게시 실패: {e}")
+    print(f"[DEBUG] 메모리 캐시: {memory_cache_stats()}, HTTP 캐시: {http_cache_stats()}")
+    print(f"[DEBUG] 부정 캐시: {negative_cache_stats()}")
     send_to_telegram(file_name, target_date)
 
 if __name__ == '__main__':
@@ -1,17 +1,13 @@
-import random, time
 import os
-import requests
 import pandas as pd
-import math
-import concurrent.futures
-from pathlib import Path
 from dotenv import load_dotenv
-from tqdm import tqdm
 from datetime import datetime
-from modules.naver_upjong_quant import fetch_stock_info_quant_API
+from modules.naver_upjong_quant import fetch_stock_info_quant_batch
+from modules.naver_market_listing import fetch_market_listing, build_quote_table
+from utils.http_util import http_post
 from app_secrets.endpoints import (
     NAVER_NYSE_MARKET_URL, NAVER_NASDAQ_MARKET_URL, NAVER_AMEX_MARKET_URL,
-    NAVER_STOCK_PAGE_URL, TELEGRAM_SEND_DOCUMENT_URL,
+    TELEGRAM_SEND_DOCUMENT_URL,
 )
 
 # .env 파일 로드
@@ -25,78 +21,42 @@ nyse_url = NAVER_NYSE_MARKET_URL
 nasdaq_url = NAVER_NASDAQ_MARKET_URL
 amex_url = NAVER_AMEX_MARKET_URL
 
-# 최대 스레드 수
-max_workers = 4
-
-# 요청 헤더
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-}
-
 def ensure_directory(path):
     """폴더가 존재하지 않으면 생성"""
     if not os.path.exists(path):
         os.makedirs(path)
 
 def fetch_all_stocks(base_url, market_name):
-    params = {"page": 1, "pageSize": 100}
-    response = requests.get(base_url, headers=headers, params=params)
-    
-    if response.status_code != 200:
-        print(f"{market_name} 첫 페이지 요청 실패: {response.status_code}")
-        return [], []
-    
-    data = response.json()
-    total_count = data.get("totalCount", 0)
-    if total_count == 0:
-        print(f"{market_name}에서 totalCount를 가져올 수 없습니다.")
-        return [], []
-    
-    page_size = 100
-    total_pages = math.ceil(total_count / page_size)
-    print(f"{market_name} - 총 종목 수: {total_count}, 총 페이지 수: {total_pages}")
+    """시장 목록 전체를 받아 (일반 종목, ETF/ETN, 시세 테이블)을 반환합니다. 시세 테이블은 퀀트 조회 시 basic 시세 대신 사용합니다."""
+    stocks = fetch_market_listing(base_url, market_name)
+    if not stocks:
+        print(f"{market_name}에서 종목 목록을 가져올 수 없습니다.")
+        return [], [], {}
     
     all_stocks = []
     etf_etn_stocks = []
-    for page in tqdm(range(1, total_pages + 1), desc=f"Fetching {market_name}"):
-        params = {"page": page, "pageSize": page_size}
-        response = requests.get(base_url, headers=headers, params=params)
-        
-        if response.status_code == 200:
-            page_data = response.json()
-            stocks = page_data.get("stocks", [])
-            for stock in stocks:
-                print("종목명:", stock.get("stockName", ""), "종목코드:", stock.get("symbolCode", ""), "시가총액(억):", stock.get("marketValue", ""))
-                stock_info = {
-                    "종목코드": stock.get("symbolCode", ""),
-                    "종목명": stock.get("stockName", ""),
-                    "시가총액(억)": int(stock.get("marketValue", 0).replace(",", "").replace("-", "0"))
-                }
-                if stock.get("stockEndType") in ["etf", "etn"]:
-                    etf_etn_stocks.append(stock_info)
-                else:
-                    all_stocks.append(stock_info)
+    for stock in stocks:
+        print("종목명:", stock.get("stockName", ""), "종목코드:", stock.get("symbolCode", ""), "시가총액(억):", stock.get("marketValue", ""))
+        stock_info = {
+            "종목코드": stock.get("symbolCode", ""),
+            "종목명": stock.get("stockName", ""),
+            "시가총액(억)": int(stock.get("marketValue", 0).replace(",", "").replace("-", "0"))
+        }
+        if stock.get("stockEndType") in ["etf", "etn"]:
+            etf_etn_stocks.append(stock_info)
         else:
-            print(f"{market_name} 페이지 {page} 요청 실패: {response.status_code}")
-    
-    return all_stocks, etf_etn_stocks
-
-def fetch_quant_data(stock_info):
-    stock_code = stock_info["종목코드"]
-    
-    url = NAVER_STOCK_PAGE_URL.format(code=stock_code)
-    quant_data = fetch_stock_info_quant_API(stock_code, url)
-    time.sleep(random.uniform(1.0, 2.0))
-    return quant_data if quant_data else {}
-
-def add_quant_data(df, market_name):
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        quant_data_list = list(tqdm(executor.map(fetch_quant_data, df.to_dict('records')), total=len(df), desc=f"Fetching Quant Data for {market_name}"))
+            all_stocks.append(stock_info)
     
-    quant_df = pd.DataFrame(quant_data_list)
-    df = pd.concat([df, quant_df], axis=1)
+    return all_stocks, etf_etn_stocks, build_quote_table(stocks, code_key="symbolCode")
+
+def add_quant_data(df, market_name, quotes=None):
+    if df.empty:
+        return df
+    # 배치 API로 조회 후 (요청 속도는 호스트별 적응형 리미터가 조절) 요청 종목코드 기준으로 병합 (종목코드/종목명은 목록 값 유지, 시세는 목록 값 사용)
+    quant_df = fetch_stock_info_quant_batch(df["종목코드"].tolist(), preloaded=quotes)
+    print(f"{market_name} - 퀀트 수집 {len(quant_df)}/{len(df)}건 (실패 {len(quant_df.attrs['failures'])}건)")
+    df = df.join(quant_df.drop(columns=["종목코드", "종목명"]), on="종목코드")
     df = df.sort_values(by="시가총액(억)", ascending=False)
-    df = df.loc[:, ~df.columns.duplicated()]
     return df
 
 def send_to_telegram():
@@ -134,7 +94,7 @@ def send_to_telegram():
     
     with open(FILE_PATH, 'rb') as file:
         files = {'document': file}
-        response = requests.post(url, data=data, files=files)
+        response = http_post(url, data=data, files=files)
     
     # 응답 출력
     print(f"Response: {response.text}")
@@ -164,18 +124,18 @@ def main():
     
     # 2. send_folder에 파일이 없고, send_to_telegram()로 보낼 파일이 없는 경우
     if not send_to_telegram():  # 최초 전송 시도 후 파일이 없으면 데이터 생성
-        nyse_stocks, nyse_etf_etn = fetch_all_stocks(nyse_url, "NYSE")
-        nasdaq_stocks, nasdaq_etf_etn = fetch_all_stocks(nasdaq_url, "NASDAQ")
-        amex_stocks, amex_etf_etn = fetch_all_stocks(amex_url, "AMEX")
+        nyse_stocks, nyse_etf_etn, nyse_quotes = fetch_all_stocks(nyse_url, "NYSE")
+        nasdaq_stocks, nasdaq_etf_etn, nasdaq_quotes = fetch_all_stocks(nasdaq_url, "NASDAQ")
+        amex_stocks, amex_etf_etn, amex_quotes = fetch_all_stocks(amex_url, "AMEX")
         
         df_nyse = pd.DataFrame(nyse_stocks)
         df_nasdaq = pd.DataFrame(nasdaq_stocks)
         df_amex = pd.DataFrame(amex_stocks)
         # df_etf_etn = pd.DataFrame(nyse_etf_etn + nasdaq_etf_etn + amex_etf_etn)
         
-        df_nyse = add_quant_data(df_nyse, "NYSE")
-        df_nasdaq = add_quant_data(df_nasdaq, "NASDAQ")
-        df_amex = add_quant_data(df_amex, "AMEX")
+        df_nyse = add_quant_data(df_nyse, "NYSE", nyse_quotes)
+        df_nasdaq = add_quant_data(df_nasdaq, "NASDAQ", nasdaq_quotes)
+        df_amex = add_quant_data(df_amex, "AMEX", amex_quotes)
         # df_etf_etn = add_quant_data(df_etf_etn, "ETF_ETN")
         
         # send_folder가 아닌 기본 경로에 저장
@@ -183,9 +143,9 @@ def main():
         file_path = os.path.join(base_path, file_name)
         
         with pd.ExcelWriter(file_path, engine="xlsxwriter") as writer:
-            df_nyse.to_excel(writer, sheet_name="NYSE", index=False)
-            df_nasdaq.to_excel(writer, sheet_name="NASDAQ", index=False)
-            df_amex.to_excel(writer, sheet_name="AMEX", index=False)
+            df_nyse.to_excel(writer, sheet_name="NYSE", index=False, na_rep="N/A")
+            df_nasdaq.to_excel(writer, sheet_name="NASDAQ", index=False, na_rep="N/A")
+            df_amex.to_excel(writer, sheet_name="AMEX", index=False, na_rep="N/A")
             # df_etf_etn.to_excel(writer, sheet_name="ETF_ETN", index=False)
         
         print(f"\n데이터가 '{file_name}' 파일에 저장되었습니다. (시트: NYSE, NASDAQ, AMEX, ETF_ETN)")
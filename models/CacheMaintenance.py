@@ -0,0 +1,182 @@
+import glob
+import os
+import sys
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from models.CacheStorage import get_storage, CACHE_PREFIXES
+from models.MemoryCache import MEMORY_CACHE, memory_cache_stats
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+# 캐시 디렉터리 전체 크기 상한(바이트, HTTP 응답 캐시 포함) / 저장 후 보관 기간(일)
+CACHE_MAX_BYTES = int(_env_float('CACHE_MAX_BYTES', 512 * 1024 * 1024))
+CACHE_MAX_AGE_DAYS = _env_float('CACHE_MAX_AGE_DAYS', 30)
+# 상한을 넘었을 때 지우는 순서 ('lru': 오래 조회하지 않은 순, 'lfu': 조회수가 적은 순)
+CACHE_EVICTION_POLICY = os.getenv('CACHE_EVICTION_POLICY', 'lru').lower()
+# 상한을 넘으면 상한의 이 비율까지 줄임 (정리 직후 다시 상한에 걸리지 않도록)
+CACHE_EVICTION_TARGET = _env_float('CACHE_EVICTION_TARGET', 0.9)
+
+# 통계의 저장 경과시간 구간 (이름, 상한 초)
+AGE_BUCKETS = [('<1h', 3600), ('<1d', 86400), ('<7d', 7 * 86400), ('<30d', 30 * 86400), ('30d+', float('inf'))]
+# HTTP 응답 캐시를 통계/정리에서 부르는 접두어와 위치 (utils.http_cache_util과 같은 설정, httpx/엔드포인트 설정 없이 정리만 하도록 직접 읽음)
+HTTP_PREFIX = 'http'
+HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', os.path.join('cache', 'http'))
+# 쓰다 중단된 임시 파일을 지우는 기준 경과시간(초)
+_TMP_FILE_MAX_AGE = 3600
+
+
+def _http_entries(http_dir):
+    """HTTP 응답 캐시의 (key, 크기, 저장시각, 최근 조회시각, 조회수) 목록 (.json 메타데이터 + .body 본문 한 쌍이 한 항목)"""
+    for meta_path in glob.glob(os.path.join(glob.escape(http_dir), '*.json')):
+        key = os.path.basename(meta_path)[:-len('.json')]
+        try:
+            meta_stat = os.stat(meta_path)
+        except OSError:
+            continue
+        try:
+            body_size = os.path.getsize(os.path.join(http_dir, f"{key}.body"))
+        except OSError:
+            body_size = 0
+        yield key, meta_stat.st_size + body_size, meta_stat.st_mtime, meta_stat.st_mtime, 0
+
+
+def _delete_http(http_dir, keys):
+    for key in keys:
+        for suffix in ('.json', '.body'):
+            try:
+                os.remove(os.path.join(http_dir, f"{key}{suffix}"))
+            except FileNotFoundError:
+                pass
+
+
+def _remove_stale_tmp_files(directory, now):
+    """프로세스가 중단돼 남은 *.tmp 파일을 지웁니다."""
+    for path in glob.glob(os.path.join(glob.escape(directory), '*.tmp')):
+        try:
+            if now - os.path.getmtime(path) >= _TMP_FILE_MAX_AGE:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _collect_entries(storage, http_dir):
+    """{접두어: [(key, 크기, 저장시각, 최근 조회시각, 조회수), ...]}"""
+    entries = {prefix: list(storage.entries(prefix)) for prefix in CACHE_PREFIXES}
+    entries[HTTP_PREFIX] = list(_http_entries(http_dir))
+    return entries
+
+
+def _age_histogram(prefix_entries, now):
+    histogram = {name: 0 for name, _ in AGE_BUCKETS}
+    for _, _, stored_at, _, _ in prefix_entries:
+        age = now - stored_at
+        histogram[next(name for name, limit in AGE_BUCKETS if age < limit)] += 1
+    return histogram
+
+
+def cache_stats(cache_dir='cache', backend=None, http_dir=HTTP_CACHE_DIR, now=None):
+    """
+    접두어별 캐시 통계: 항목 수, 바이트, 누적 조회수, 저장소/메모리 조회 hit 비율과 깨진 파일 읽기 횟수(이 프로세스 기준), 저장 경과시간 분포.
+    '_total'에는 전체 항목 수/바이트와 저장소 파일 크기(압축 전 빈 공간 포함)를 담습니다.
+    """
+    now = time.time() if now is None else now
+    storage = get_storage(cache_dir, backend)
+    entries = _collect_entries(storage, http_dir)
+    memory_prefixes = memory_cache_stats()['prefixes']
+
+    report = {}
+    for prefix, prefix_entries in entries.items():
+        counters = storage.counters.get(prefix, {'hits': 0, 'misses': 0})
+        report[prefix] = {
+            'entries': len(prefix_entries),
+            'bytes': sum(size for _, size, _, _, _ in prefix_entries),
+            'hits': sum(hits for _, _, _, _, hits in prefix_entries),
+            'hit_ratio': round(counters['hits'] / max(1, counters['hits'] + counters['misses']), 3),
+            'memory_hit_ratio': memory_prefixes.get(prefix, {}).get('hit_rate'),
+            'torn_reads': counters.get('torn', 0),
+            'age': _age_histogram(prefix_entries, now),
+        }
+    report['_total'] = {
+        'entries': sum(stats['entries'] for stats in report.values()),
+        'bytes': sum(stats['bytes'] for stats in report.values()),
+        'storage_bytes': storage.size_bytes(),
+    }
+    return report
+
+
+def evict(cache_dir='cache', backend=None, http_dir=HTTP_CACHE_DIR, max_bytes=CACHE_MAX_BYTES,
+          max_age_days=CACHE_MAX_AGE_DAYS, policy=CACHE_EVICTION_POLICY, now=None):
+    """
+    1) 저장 후 max_age_days가 지난 항목을 지우고
+    2) 남은 항목 합계가 max_bytes를 넘으면 policy 순서로 max_bytes * CACHE_EVICTION_TARGET 이하가 될 때까지 지웁니다.
+    지운 저장소 항목은 메모리 캐시에서도 내보냅니다. {'expired': 개수, 'evicted': 개수, 'freed_bytes': 바이트}
+    """
+    if policy not in ('lru', 'lfu'):
+        raise ValueError(f"Unknown CACHE_EVICTION_POLICY: {policy}")
+    now = time.time() if now is None else now
+    storage = get_storage(cache_dir, backend)
+    entries = _collect_entries(storage, http_dir)
+
+    expire_before = now - max_age_days * 86400
+    expired, candidates = [], []
+    for prefix, prefix_entries in entries.items():
+        for key, size, stored_at, accessed_at, hits in prefix_entries:
+            item = (prefix, key, size, accessed_at, hits)
+            (expired if stored_at < expire_before else candidates).append(item)
+
+    evicted = []
+    total = sum(size for _, _, size, _, _ in candidates)
+    if total > max_bytes:
+        if policy == 'lfu':
+            candidates.sort(key=lambda item: (item[4], item[3]))
+        else:
+            candidates.sort(key=lambda item: item[3])
+        target = max_bytes * CACHE_EVICTION_TARGET
+        for item in candidates:
+            if total <= target:
+                break
+            evicted.append(item)
+            total -= item[2]
+
+    removed = {}
+    for prefix, key, _, _, _ in expired + evicted:
+        removed.setdefault(prefix, []).append(key)
+    for prefix, keys in removed.items():
+        if prefix == HTTP_PREFIX:
+            _delete_http(http_dir, keys)
+            continue
+        storage.delete_many(prefix, keys)
+        for key in keys:
+            MEMORY_CACHE.invalidate(prefix, key)
+
+    return {
+        'expired': len(expired),
+        'evicted': len(evicted),
+        'freed_bytes': sum(size for _, _, size, _, _ in expired + evicted),
+    }
+
+
+def run_maintenance(cache_dir='cache', backend=None, http_dir=HTTP_CACHE_DIR, **budget):
+    """
+    정리(만료/상한 초과 항목 삭제) → 저장소 압축 → 통계 순으로 실행하고 결과를 출력합니다.
+    여러 프로세스가 동시에 압축하지 않도록 reporter-worker의 run/cache_maintenance.py에서만 실행합니다.
+    """
+    started = time.time()
+    result = evict(cache_dir, backend, http_dir, **budget)
+    storage = get_storage(cache_dir, backend)
+    storage.compact()
+    _remove_stale_tmp_files(http_dir, started)
+    _remove_stale_tmp_files(cache_dir, started)
+    stats = cache_stats(cache_dir, backend, http_dir)
+
+    print(f"[DEBUG] 캐시 정리 완료 ({time.time() - started:.1f}초): 만료 {result['expired']}개, "
+          f"상한 초과 {result['evicted']}개, {result['freed_bytes'] / 1024 / 1024:.1f}MB 확보")
+    for prefix, prefix_stats in stats.items():
+        print(f"[DEBUG] 캐시 통계 {prefix}: {prefix_stats}")
+    return {**result, 'stats': stats}
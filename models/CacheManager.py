@@ -1,159 +1,168 @@
-import json
-from datetime import datetime, time, timedelta
-import pytz
+from datetime import datetime
+import time as time_module
 import os
 import sys
+import threading
+import concurrent.futures
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from models.CacheStorage import get_storage, CacheWriteError
+from models.MemoryCache import MEMORY_CACHE
+from utils.market_calendar_util import stale_before, SESSION
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+# 캐시 상태: 유효 / 만료됐지만 허용 지연 안(바로 반환하고 백그라운드 갱신) / 만료
+FRESH, STALE, EXPIRED = 'FRESH', 'STALE', 'EXPIRED'
+# 접두어별 최대 허용 지연(초): 만료 후 이 시간 안이면 stale-while-revalidate로 캐시를 바로 반환 (CACHE_MAX_STALE_<접두어>)
+CACHE_MAX_STALE_SECONDS = {
+    prefix: _env_float(f'CACHE_MAX_STALE_{prefix.upper()}', default)
+    for prefix, default in (('stock', 600), ('upjong', 1800), ('dividend_stock', 3600))
+}
+# 백그라운드 갱신 작업 스레드 수
+CACHE_REFRESH_WORKERS = int(_env_float('CACHE_REFRESH_WORKERS', 4))
+
+_REFRESH_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=CACHE_REFRESH_WORKERS, thread_name_prefix='cache-refresh')
+# 갱신 중인 (접두어, 키) - 같은 키의 갱신은 한 번만 예약
+_REFRESHING = set()
+_REFRESHING_LOCK = threading.Lock()
 
 class CacheManager:
-    def __init__(self, cache_dir, cache_file_prefix):
+    """
+    접두어(stock, upjong, dividend_stock 등)별 캐시. 실제 저장은 CACHE_BACKEND에 따라
+    SQLite 단일 파일(기본) 또는 키별 JSON 파일 저장소(models.CacheStorage)가 담당합니다.
+    두 저장소 모두 쓰기가 원자적이라 봇과 reporter-worker가 같은 캐시 디렉터리를 함께 써도 깨진 값을 읽지 않습니다.
+    디스크 앞단에 프로세스 전역 LRU 메모리 캐시(models.MemoryCache)를 두어 조회/저장 시 함께 채우고,
+    is_cache_valid가 만료로 판단한 항목은 메모리에서 내보냅니다.
+    """
+    def __init__(self, cache_dir, cache_file_prefix, backend=None):
         self.cache_dir = cache_dir
         self.cache_file_prefix = cache_file_prefix
 
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
-
-    def _get_cache_file_path(self, stock_code):
-        return os.path.join(self.cache_dir, f"{self.cache_file_prefix}_{stock_code}_cache.json")
+        self.storage = get_storage(self.cache_dir, backend)
 
     def load_cache(self, stock_code):
-        cache_file = self._get_cache_file_path(stock_code)
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        return None
+        entry = MEMORY_CACHE.get(self.cache_file_prefix, stock_code)
+        if entry is None:
+            entry = self.storage.load_entry(self.cache_file_prefix, stock_code)
+            if entry is None:
+                return None
+            MEMORY_CACHE.put(self.cache_file_prefix, stock_code, *entry)
+        return entry[0]
+
+    def reload_cache(self, stock_code):
+        """메모리 캐시를 거치지 않고 저장소(다른 프로세스가 저장한 값 포함)에서 다시 읽어 메모리 캐시도 갱신합니다."""
+        entry = self.storage.load_entry(self.cache_file_prefix, stock_code)
+        if entry is None:
+            MEMORY_CACHE.invalidate(self.cache_file_prefix, stock_code)
+            return None
+        MEMORY_CACHE.put(self.cache_file_prefix, stock_code, *entry)
+        return entry[0]
+
+    def lock(self, stock_code):
+        """
+        키별 프로세스 간 배타 잠금 (with cache_manager.lock(key): ...).
+        읽고-병합하고-쓰는 갱신을 감싸 봇과 reporter-worker가 같은 키를 동시에 갱신해도 한쪽 결과를 잃지 않게 합니다.
+        """
+        return self.storage.lock(self.cache_file_prefix, stock_code)
 
     def save_cache(self, stock_code, data):
-        cache_file = self._get_cache_file_path(stock_code)
-        with open(cache_file, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=4)
-
-
-    def is_cache_valid(self, stock_code, nation_code):
-        # 타임존 설정
-        kst = pytz.timezone('Asia/Seoul')
-        now = datetime.now(kst)
-        day_of_week = now.weekday()  # 0: 월요일, 1: 화요일, ..., 6: 일요일
-        market_open_time = time(9, 0)
-        market_close_time = time(16, 40)
-
-        # 장 상태와 마지막 거래일자 및 시간 정보를 확인합니다.
-        sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-        from utils.naver_stock_util import check_market_status
-        market_status, last_traded_at = check_market_status(nation_code)
-
-        print(f"[DEBUG] 조회 국가 코드 : {nation_code}")
-        print(f"[DEBUG] 마켓 상태: {market_status}, 마지막 거래일자: {last_traded_at}")
-
-        # 캐시 파일 경로 확인
-        cache_file = self._get_cache_file_path(stock_code)
-
-        if os.path.exists(cache_file):
-            file_mod_time = datetime.fromtimestamp(os.path.getmtime(cache_file), kst)
-            print(f"[DEBUG] 캐시 생성 시간: {file_mod_time}")
-        else:
-            print("[DEBUG] 유효한 캐시가 없으므로 데이터를 호출합니다.")
-            return False
-
-        # 한국 주식일 때만 16:30 설정
-        if nation_code == 'KOR':
-            close_time = time(16, 30)
-
-            # 마지막 거래일자 및 시간을 처리
-            if isinstance(last_traded_at, datetime):
-                last_trading_day = last_traded_at
+        stored_at = time_module.time()
+        try:
+            self.storage.save(self.cache_file_prefix, stock_code, data, stored_at)
+        except CacheWriteError as e:
+            # 캐시 저장만 건너뛰고 조회 결과는 그대로 사용 (메모리 캐시에는 보관)
+            print(f"[ERROR] {e}")
+        MEMORY_CACHE.put(self.cache_file_prefix, stock_code, data, stored_at)
+
+    def load_many(self, stock_codes):
+        """여러 키를 한 번에 조회합니다. {키: 데이터} (없는 키는 제외, 메모리에 없는 키만 저장소에서 일괄 조회)"""
+        found, missing = {}, []
+        for stock_code in stock_codes:
+            entry = MEMORY_CACHE.get(self.cache_file_prefix, stock_code)
+            if entry is None:
+                missing.append(stock_code)
             else:
-                last_trading_day = datetime.strptime(last_traded_at, "%Y-%m-%dT%H:%M:%S%z").astimezone(kst)
-
-            last_trading_day_close_time = datetime.combine(last_trading_day.date(), close_time, kst)
-
-            # 한국 주식의 경우
-            if market_status == 'OPEN':
-                # 장중일 때는 5분 이내 캐시가 유효
-                if (now - file_mod_time) < timedelta(minutes=5):
-                    print(f"[DEBUG] 장중이며 5분 이내 생성된 캐시가 있습니다. 유효 처리됩니다. (생성 시각: {file_mod_time})")
-                    return True
-                print("[DEBUG] 장중이지만 캐시가 유효하지 않습니다.")
+                found[str(stock_code)] = entry[0]
+        for stock_code, entry in self.storage.load_many(self.cache_file_prefix, missing).items():
+            MEMORY_CACHE.put(self.cache_file_prefix, stock_code, *entry)
+            found[stock_code] = entry[0]
+        return found
+
+    def save_many(self, items):
+        """{키: 데이터}를 한 번에 저장합니다. (SQLite는 하나의 트랜잭션)"""
+        stored_at = time_module.time()
+        try:
+            self.storage.save_many(self.cache_file_prefix, [(key, data, stored_at) for key, data in items.items()])
+        except CacheWriteError as e:
+            print(f"[ERROR] {e}")
+        for key, data in items.items():
+            MEMORY_CACHE.put(self.cache_file_prefix, key, data, stored_at)
+
+    def _stored_at(self, stock_code):
+        """캐시 저장시각(epoch 초). 없으면 None. (메모리에 있으면 저장소를 조회하지 않음)"""
+        stored_at = MEMORY_CACHE.stored_at(self.cache_file_prefix, stock_code)
+        if stored_at is None:
+            stored_at = self.storage.stored_at(self.cache_file_prefix, stock_code)
+        return stored_at
+
+    def get_stored_at(self, stock_code, tz=None):
+        """캐시 저장시각(datetime). 없으면 None."""
+        stored_at = self._stored_at(stock_code)
+        return None if stored_at is None else datetime.fromtimestamp(stored_at, tz)
+
+    def max_stale(self):
+        """이 접두어의 최대 허용 지연(초)."""
+        return CACHE_MAX_STALE_SECONDS.get(self.cache_file_prefix, 0.0)
+
+    def cache_freshness(self, stock_code, nation_code, policy=SESSION):
+        """FRESH / STALE(만료 후 max_stale 이내) / EXPIRED (캐시가 없으면 EXPIRED)"""
+        stored_at = self._stored_at(stock_code)
+        if stored_at is None:
+            return EXPIRED
+        boundary = stale_before(nation_code, policy=policy)
+        if stored_at >= boundary:
+            return FRESH
+        return STALE if stored_at >= boundary - self.max_stale() else EXPIRED
+
+    def refresh_in_background(self, stock_code, refresh):
+        """
+        refresh()(캐시를 다시 채우는 함수)를 작업 스레드에서 실행합니다.
+        같은 키의 갱신이 이미 예약/진행 중이면 다시 예약하지 않고 False를 반환합니다.
+        """
+        key = (self.cache_file_prefix, str(stock_code))
+        with _REFRESHING_LOCK:
+            if key in _REFRESHING:
                 return False
+            _REFRESHING.add(key)
 
-            if market_status == 'CLOSE':
-                # 개장시간 내에 CLOSE 상태로, 마지막 거래일자가 오늘보다 이전이며 현재 요일이 평일인 경우 휴장일로 간주
-                if market_open_time <= now.time() <= market_close_time and last_trading_day.date() < now.date() and day_of_week < 5:
-                    print(f"[DEBUG] 개장시간 내 CLOSE 상태이며, 마지막 거래일자가 오늘보다 이전이고 현재 요일이 평일입니다. 휴장일로 간주.")
-                    return False
-
-                # 장 마감 이후 생성된 캐시가 유효
-                if file_mod_time > last_trading_day_close_time:
-                    print(f"[DEBUG] 장 마감 이후 생성된 캐시. 유효 처리됩니다.")
-                    return True
-
-                # 금요일 장 마감 이후 ~ 주말 및 월요일 0시 ~ 8시까지는 금요일 16시 30분 이후 생성된 캐시가 유효
-                if day_of_week == 0 and now.time() < time(8, 0):
-                    last_friday = now - timedelta(days=3)  # 지난 금요일
-                    last_friday_close_time = datetime.combine(last_friday.date(), close_time, kst)
-                    if file_mod_time > last_friday_close_time:
-                        print(f"[DEBUG] 월요일 0시~8시까지 금요일 장 마감 이후 생성된 캐시. 유효 처리됩니다.")
-                        return True
-                    print("[DEBUG] 월요일 0시~8시까지 생성된 캐시가 금요일 장 마감 이후가 아닙니다.")
-                    return False
-
-                # 평일의 경우 장 마감 이후 생성된 캐시가 유효
-                if day_of_week < 5:
-                    today_close_time = datetime.combine(now.date(), close_time, kst)
-                    if file_mod_time > today_close_time:
-                        print(f"[DEBUG] 평일 장 마감 이후 생성된 캐시. 유효 처리됩니다.")
-                        return True
-                    print("[DEBUG] 평일 장 마감 이후 생성된 캐시가 아닙니다.")
-                    return False
-
-                # 주말의 경우, 금요일 장 마감 이후 생성된 캐시가 유효
-                if day_of_week >= 5:
-                    last_friday = now - timedelta(days=day_of_week - 4)  # 지난 금요일
-                    last_friday_close_time = datetime.combine(last_friday.date(), close_time, kst)
-                    if file_mod_time > last_friday_close_time:
-                        print(f"[DEBUG] 주말의 경우 금요일 장 마감 이후 생성된 캐시. 유효 처리됩니다.")
-                        return True
-                    print("[DEBUG] 주말에 생성된 캐시가 금요일 장 마감 이후가 아닙니다.")
-                    return False
-
-        # 해외 주식의 경우
-        else:
-            # 해외 주식은 장중에 캐시를 유효하지 않다고 가정
-            if market_status == 'OPEN':
-                print("[DEBUG] 해외 주식은 장중에 캐시를 유효하지 않다고 가정합니다.")
-                return False
+        def run():
+            try:
+                refresh()
+                print(f"[DEBUG] 백그라운드 캐시 갱신 완료: {key}")
+            except Exception as e:
+                print(f"[ERROR] 백그라운드 캐시 갱신 실패: {key} ({e})")
+            finally:
+                with _REFRESHING_LOCK:
+                    _REFRESHING.discard(key)
 
-            # 해외 주식은 장 마감 이후 유효 처리
-            if market_status == 'CLOSE':
-                if isinstance(last_traded_at, datetime):
-                    last_trading_day = last_traded_at
-                else:
-                    last_trading_day = datetime.strptime(last_traded_at, "%Y-%m-%dT%H:%M:%S%z").astimezone(kst)
-
-                last_trading_day_close_time = datetime.combine(last_trading_day.date(), time(16, 30), kst)
-                if file_mod_time > last_trading_day_close_time:
-                    print(f"[DEBUG] 해외 주식의 마지막 거래일 {last_trading_day} 이후 생성된 캐시. 유효 처리됩니다.")
-                    return True
-
-                # 해외 주식은 평일, 주말 구분 없이 장 마감 이후 유효 처리
-                if day_of_week < 5:
-                    today_close_time = datetime.combine(now.date(), time(16, 30), kst)
-                    if file_mod_time > today_close_time:
-                        print(f"[DEBUG] 평일 장 마감 이후 생성된 해외 주식 캐시. 유효 처리됩니다.")
-                        return True
-                    print("[DEBUG] 평일 장 마감 이후 생성된 해외 주식 캐시가 아닙니다.")
-                    return False
-
-                if day_of_week >= 5:
-                    last_friday = now - timedelta(days=day_of_week - 4)  # 지난 금요일
-                    last_friday_close_time = datetime.combine(last_friday.date(), time(16, 30), kst)
-                    if file_mod_time > last_friday_close_time:
-                        print(f"[DEBUG] 주말의 경우 금요일 장 마감 이후 생성된 해외 주식 캐시. 유효 처리됩니다.")
-                        return True
-                    print("[DEBUG] 주말에 생성된 해외 주식 캐시가 금요일 장 마감 이후가 아닙니다.")
-                    return False
-
-        print("[DEBUG] 유효한 캐시가 아닙니다. 새 데이터를 호출합니다.")
-        return False
+        _REFRESH_EXECUTOR.submit(run)
+        return True
+
+    def is_cache_valid(self, stock_code, nation_code):
+        """
+        시장 세션 기준 시각(utils.market_calendar_util) 이후에 저장된 캐시만 유효합니다.
+        저장시각 비교 한 번으로 판단하며(시장 상태 API 호출 없음), 만료된 항목은 메모리 캐시에서도 내보냅니다.
+        """
+        valid = self.cache_freshness(stock_code, nation_code) == FRESH
+        if not valid:
+            MEMORY_CACHE.invalidate(self.cache_file_prefix, stock_code)
+        return valid
 
 # 함수 사용 예
 if __name__ == "__main__":
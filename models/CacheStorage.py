@@ -0,0 +1,461 @@
+import atexit
+import contextlib
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+try:
+    import fcntl  # 프로세스 간 잠금 (없는 플랫폼에서는 스레드 잠금만 사용)
+except ImportError:
+    fcntl = None
+
+# 캐시 저장소 종류 ('sqlite' | 'json') 및 SQLite 파일 경로 (없으면 캐시 디렉터리 아래 cache.sqlite3)
+# 기존 JSON 캐시는 run/migrate_cache_to_sqlite.py로 옮기며, 옮기기 전에도 SQLite에 없는 키는 JSON 파일에서 읽어 SQLite로 복사합니다.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'sqlite').lower()
+CACHE_DB_PATH = os.getenv('CACHE_DB_PATH')
+# CacheManager를 사용하는 캐시 접두어
+CACHE_PREFIXES = ['stock', 'upjong', 'dividend_stock']
+# IN (...) 조회 한 번에 넣는 키 수 (SQLite 바인딩 변수 한도 이하)
+_SQLITE_BATCH_SIZE = 500
+# 깨진 JSON 캐시 파일을 다시 읽기 전 대기(초)
+_TORN_READ_RETRY_DELAY = 0.05
+# 키별 잠금을 나누는 구간 수 (잠금 파일 하나의 바이트 구간으로 표현)
+_LOCK_STRIPES = 1024
+# 조회 기록(최근 조회시각/조회수)을 모아 두었다가 한 번에 반영하는 기준 (항목 수 / 초)
+_ACCESS_FLUSH_SIZE = 200
+_ACCESS_FLUSH_SECONDS = 60
+
+
+class CacheWriteError(Exception):
+    """캐시 저장 실패 (잠금 대기 초과 등). 런타임 호출자는 기록만 하고 진행하며, 마이그레이션은 해당 키를 옮기지 않은 것으로 처리합니다."""
+
+
+def _count(counters, prefix, name, amount=1):
+    prefix_counters = counters.setdefault(prefix, {'hits': 0, 'misses': 0, 'torn': 0})
+    prefix_counters[name] += amount
+
+
+def _has_json_cache(cache_dir):
+    """cache_dir에 JSON 저장소의 캐시 파일({prefix}_*_cache.json)이 하나라도 있는지"""
+    return any(
+        glob.glob(os.path.join(glob.escape(cache_dir), f"{glob.escape(prefix)}_*_cache.json")) for prefix in CACHE_PREFIXES
+    )
+
+
+class KeyLocks:
+    """
+    (prefix, key)별 배타 잠금. 봇과 reporter-worker 컨테이너가 같은 캐시 디렉터리를 쓰므로
+    잠금 파일 하나에서 키 해시에 해당하는 1바이트 구간을 fcntl.lockf로 잠가 프로세스 간에도 같은 키의 쓰기를 직렬화합니다.
+    fcntl 잠금은 프로세스 단위라 같은 프로세스의 스레드끼리는 구간별 threading.RLock으로 먼저 직렬화합니다.
+    같은 스레드가 다시 잡으면(잠금 안에서 save 호출 등) 중첩으로 처리해 가장 바깥에서만 fcntl 잠금을 잡고 풉니다.
+    """
+
+    def __init__(self, lock_path):
+        self.lock_path = lock_path
+        self._thread_locks = [threading.RLock() for _ in range(_LOCK_STRIPES)]
+        self._depths = [0] * _LOCK_STRIPES
+        # 같은 파일의 다른 fd를 닫으면 이 프로세스의 잠금이 모두 풀리므로 fd 하나를 계속 열어 둠
+        self._fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o666) if fcntl else None
+
+    @contextlib.contextmanager
+    def lock(self, prefix, key):
+        stripe = zlib.crc32(f"{prefix}\0{key}".encode('utf-8')) % _LOCK_STRIPES
+        with self._thread_locks[stripe]:
+            if self._fd is not None and self._depths[stripe] == 0:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+            self._depths[stripe] += 1
+            try:
+                yield
+            finally:
+                self._depths[stripe] -= 1
+                if self._fd is not None and self._depths[stripe] == 0:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+
+
+class JsonCacheStorage:
+    """
+    기존 방식의 저장소. 키마다 cache_dir/{prefix}_{key}_cache.json 파일 하나를 쓰며 저장시각은 파일 수정시각입니다.
+    임시 파일에 쓴 뒤 rename으로 교체하므로 읽는 쪽은 이전 파일이나 새 파일 전체만 보며,
+    그래도 깨진 파일(이전 버전 프로세스의 제자리 쓰기, 디스크 가득 참 등)을 만나면 한 번 더 읽어 보고 캐시 없음으로 처리합니다.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.locks = KeyLocks(os.path.join(cache_dir, '.cache.lock'))
+        # 이 프로세스의 접두어별 조회 hit/miss
+        self.counters = {}
+
+    def _path(self, prefix, key):
+        return os.path.join(self.cache_dir, f"{prefix}_{key}_cache.json")
+
+    def lock(self, prefix, key):
+        return self.locks.lock(prefix, key)
+
+    @staticmethod
+    def _read(path, touch=False):
+        """
+        (data, stored_at). 저장시각은 연 파일 기준이라 읽는 중 교체돼도 내용과 어긋나지 않음.
+        touch=True이면 같은 파일의 접근시각을 최근 조회시각으로 갱신 (수정시각=저장시각은 유지, LRU 정리 기준).
+        경로가 아닌 연 파일에 기록하므로 그사이 다른 프로세스가 교체한 새 파일의 저장시각을 되돌리지 않음.
+        """
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+            stored_at = os.fstat(file.fileno()).st_mtime
+            if touch and os.utime in os.supports_fd:
+                try:
+                    os.utime(file.fileno(), (time.time(), stored_at))
+                except OSError:
+                    pass
+            return data, stored_at
+
+    def stored_at(self, prefix, key):
+        """저장시각(epoch 초). 없으면 None."""
+        try:
+            return os.path.getmtime(self._path(prefix, key))
+        except OSError:
+            return None
+
+    def load(self, prefix, key):
+        entry = self.load_entry(prefix, key)
+        return None if entry is None else entry[0]
+
+    def load_entry(self, prefix, key):
+        """(data, stored_at) 또는 None."""
+        path = self._path(prefix, key)
+        try:
+            try:
+                data, stored_at = self._read(path, touch=True)
+            except ValueError:
+                # 제자리에 쓰던 이전 버전 프로세스 등이 쓰다 만 파일: 잠시 기다렸다가 한 번 더 읽음
+                time.sleep(_TORN_READ_RETRY_DELAY)
+                data, stored_at = self._read(path, touch=True)
+        except FileNotFoundError:
+            _count(self.counters, prefix, 'misses')
+            return None
+        except ValueError as e:
+            print(f"[ERROR] 깨진 캐시 파일을 무시합니다: {path} ({e})")
+            _count(self.counters, prefix, 'torn')
+            _count(self.counters, prefix, 'misses')
+            return None
+        _count(self.counters, prefix, 'hits')
+        return data, stored_at
+
+    def save(self, prefix, key, data, stored_at=None):
+        path = self._path(prefix, key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, indent=4)
+            if stored_at is not None:
+                os.utime(tmp_path, (stored_at, stored_at))
+            with self.lock(prefix, key):
+                os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load_many(self, prefix, keys):
+        """{key: (data, stored_at)} (없는 키는 제외)"""
+        found = {}
+        for key in keys:
+            entry = self.load_entry(prefix, key)
+            if entry is not None:
+                found[str(key)] = entry
+        return found
+
+    def save_many(self, prefix, items):
+        """items: (key, data, stored_at) 목록. stored_at이 None이면 현재 시각."""
+        for key, data, stored_at in items:
+            self.save(prefix, key, data, stored_at)
+
+    def items(self, prefix):
+        """prefix의 모든 (key, data, stored_at) (마이그레이션용)"""
+        head, tail = f"{prefix}_", "_cache.json"
+        for path in glob.glob(os.path.join(glob.escape(self.cache_dir), f"{glob.escape(head)}*{tail}")):
+            key = os.path.basename(path)[len(head):-len(tail)]
+            try:
+                data, stored_at = self._read(path)
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] 캐시 파일을 읽지 못했습니다: {path} ({e})")
+                continue
+            yield key, data, stored_at
+
+    def entries(self, prefix):
+        """prefix의 (key, 크기, 저장시각, 최근 조회시각, 조회수) 목록 (값은 읽지 않음, 조회수는 기록하지 않아 0)"""
+        head, tail = f"{prefix}_", "_cache.json"
+        for path in glob.glob(os.path.join(glob.escape(self.cache_dir), f"{glob.escape(head)}*{tail}")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield os.path.basename(path)[len(head):-len(tail)], stat.st_size, stat.st_mtime, max(stat.st_atime, stat.st_mtime), 0
+
+    def delete_many(self, prefix, keys):
+        for key in keys:
+            with self.lock(prefix, key):
+                try:
+                    os.remove(self._path(prefix, key))
+                except FileNotFoundError:
+                    pass
+
+    def size_bytes(self):
+        """캐시 파일 전체 크기"""
+        return sum(os.path.getsize(path) for path in glob.glob(os.path.join(glob.escape(self.cache_dir), "*_cache.json")))
+
+    def compact(self):
+        """비어 있거나 깨진(쓰다 중단된) 캐시 파일을 지웁니다."""
+        for path in glob.glob(os.path.join(glob.escape(self.cache_dir), "*_cache.json")):
+            try:
+                if os.path.getsize(path) == 0:
+                    os.remove(path)
+                    continue
+                self._read(path)
+            except ValueError:
+                print(f"[ERROR] 깨진 캐시 파일을 삭제합니다: {path}")
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class SQLiteCacheStorage:
+    """
+    단일 SQLite 파일(WAL 모드) 저장소. (prefix, key)별로 공백 없이 직렬화한 JSON 문자열(압축하지 않음)과 저장시각을 한 행에 보관하며
+    load_many/save_many는 한 번의 조회/트랜잭션으로 처리합니다.
+    연결은 스레드마다 따로 열고, WAL 덕분에 읽기는 쓰기와 동시에 진행됩니다.
+    행 단위 쓰기는 트랜잭션이라 원자적이며, 읽고-병합하고-쓰는 갱신은 lock(prefix, key)로 프로세스 간 직렬화합니다.
+    """
+
+    def __init__(self, db_path, legacy_dir=None):
+        self.db_path = db_path
+        # 아직 옮기지 않은 JSON 캐시 파일이 있는 디렉터리 (없으면 None, SQLite에 없는 키를 여기서 읽어 복사)
+        self.legacy_dir = legacy_dir if legacy_dir and _has_json_cache(legacy_dir) else None
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._local = threading.local()
+        self.locks = KeyLocks(f"{db_path}.lock")
+        # 이 프로세스의 접두어별 조회 hit/miss, 아직 반영하지 않은 조회 기록 {(prefix, key): [최근 조회시각, 조회수]}
+        self.counters = {}
+        self._access = {}
+        self._access_flushed_at = time.time()
+        self._access_lock = threading.Lock()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "prefix TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, stored_at REAL NOT NULL, "
+                "accessed_at REAL, hits INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (prefix, key)) WITHOUT ROWID"
+            )
+            # 조회 기록 컬럼이 없던 기존 파일은 컬럼 추가
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(cache)")}
+            if 'accessed_at' not in columns:
+                connection.execute("ALTER TABLE cache ADD COLUMN accessed_at REAL")
+            if 'hits' not in columns:
+                connection.execute("ALTER TABLE cache ADD COLUMN hits INTEGER NOT NULL DEFAULT 0")
+        atexit.register(self.flush_access)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            # 새 파일은 정리 때 전체 VACUUM 없이 빈 페이지만 반환하도록 증분 모드로 생성 (파일 생성 전에만 적용됨)
+            connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def lock(self, prefix, key):
+        return self.locks.lock(prefix, key)
+
+    @staticmethod
+    def _dumps(data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+    def _record_access(self, prefix, requested, found_keys):
+        """조회 hit/miss를 집계하고, 찾은 키의 조회 기록을 모아 두었다가 일정량/일정 시간마다 반영합니다."""
+        now = time.time()
+        with self._access_lock:
+            _count(self.counters, prefix, 'hits', len(found_keys))
+            _count(self.counters, prefix, 'misses', requested - len(found_keys))
+            for key in found_keys:
+                entry = self._access.setdefault((prefix, key), [now, 0])
+                entry[0] = now
+                entry[1] += 1
+            due = len(self._access) >= _ACCESS_FLUSH_SIZE or now - self._access_flushed_at >= _ACCESS_FLUSH_SECONDS
+        if due:
+            self.flush_access()
+
+    def flush_access(self):
+        """모아 둔 조회 기록을 최근 조회시각(accessed_at)/조회수(hits) 컬럼에 반영합니다. (LRU/LFU 정리 기준)"""
+        with self._access_lock:
+            pending, self._access = self._access, {}
+            self._access_flushed_at = time.time()
+        if not pending:
+            return
+        try:
+            with self._connection() as connection:
+                connection.executemany(
+                    "UPDATE cache SET accessed_at = MAX(COALESCE(accessed_at, 0), ?), hits = hits + ? WHERE prefix = ? AND key = ?",
+                    [(accessed_at, hits, prefix, key) for (prefix, key), (accessed_at, hits) in pending.items()]
+                )
+        except sqlite3.Error as e:
+            print(f"[ERROR] 캐시 조회 기록 반영 실패: {e}")
+
+    def stored_at(self, prefix, key):
+        row = self._connection().execute(
+            "SELECT stored_at FROM cache WHERE prefix = ? AND key = ?", (prefix, str(key))
+        ).fetchone()
+        return row[0] if row else None
+
+    def load(self, prefix, key):
+        entry = self.load_entry(prefix, key)
+        return None if entry is None else entry[0]
+
+    def load_entry(self, prefix, key):
+        try:
+            row = self._connection().execute(
+                "SELECT value, stored_at FROM cache WHERE prefix = ? AND key = ?", (prefix, str(key))
+            ).fetchone()
+        except sqlite3.DatabaseError as e:
+            # 잠금 대기 초과/파일 손상 시 요청을 실패시키지 않고 캐시 없음으로 처리
+            print(f"[ERROR] 캐시 조회 실패, 캐시 없이 진행합니다: {prefix} {key} ({e})")
+            return None
+        self._record_access(prefix, 1, [str(key)] if row else [])
+        if row:
+            return json.loads(row[0]), row[1]
+        return self._load_legacy(prefix, [str(key)]).get(str(key))
+
+    def save(self, prefix, key, data, stored_at=None):
+        self.save_many(prefix, [(key, data, stored_at)])
+
+    def load_many(self, prefix, keys):
+        keys = [str(key) for key in keys]
+        found = {}
+        connection = self._connection()
+        try:
+            for start in range(0, len(keys), _SQLITE_BATCH_SIZE):
+                chunk = keys[start:start + _SQLITE_BATCH_SIZE]
+                placeholders = ', '.join('?' for _ in chunk)
+                rows = connection.execute(
+                    f"SELECT key, value, stored_at FROM cache WHERE prefix = ? AND key IN ({placeholders})", [prefix, *chunk]
+                )
+                found.update({key: (json.loads(value), stored_at) for key, value, stored_at in rows})
+        except sqlite3.DatabaseError as e:
+            print(f"[ERROR] 캐시 일괄 조회 실패, 찾은 {len(found)}개만 사용합니다: {prefix} ({e})")
+        if keys:
+            self._record_access(prefix, len(keys), list(found))
+        found.update(self._load_legacy(prefix, [key for key in keys if key not in found]))
+        return found
+
+    def _load_legacy(self, prefix, keys):
+        """
+        SQLite에 없는 키를 옮기기 전 JSON 캐시 파일에서 읽어 (저장시각 유지) SQLite로 복사합니다. {key: (data, stored_at)}
+        JSON 저장소에서 SQLite로 바꾼 직후 마이그레이션 전에도 기존 캐시를 그대로 쓰기 위한 경로입니다.
+        """
+        if not self.legacy_dir or not keys:
+            return {}
+        found = {}
+        for key in keys:
+            try:
+                found[key] = JsonCacheStorage._read(os.path.join(self.legacy_dir, f"{prefix}_{key}_cache.json"))
+            except (OSError, ValueError):
+                continue
+        if found:
+            try:
+                self.save_many(prefix, [(key, data, stored_at) for key, (data, stored_at) in found.items()])
+            except CacheWriteError as e:
+                print(f"[ERROR] 기존 JSON 캐시 복사 실패 (다음 조회 때 재시도): {e}")
+        return found
+
+    def save_many(self, prefix, items):
+        now = time.time()
+        rows = [(prefix, str(key), self._dumps(data), now if stored_at is None else stored_at) for key, data, stored_at in items]
+        try:
+            with self._connection() as connection:  # 하나의 트랜잭션으로 커밋 (실패하면 전체 롤백)
+                connection.executemany(
+                    "INSERT INTO cache (prefix, key, value, stored_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (prefix, key) DO UPDATE SET value = excluded.value, stored_at = excluded.stored_at", rows
+                )
+        except sqlite3.OperationalError as e:
+            # 다른 프로세스의 긴 쓰기로 잠금 대기가 초과된 경우 등: 트랜잭션 전체가 롤백되었으므로 호출자에게 알림
+            raise CacheWriteError(f"캐시 저장 실패 ({len(rows)}개, {prefix}): {e}") from e
+
+    def items(self, prefix):
+        rows = self._connection().execute("SELECT key, value, stored_at FROM cache WHERE prefix = ?", (prefix,))
+        for key, value, stored_at in rows:
+            yield key, json.loads(value), stored_at
+
+    def entries(self, prefix):
+        """prefix의 (key, 크기, 저장시각, 최근 조회시각, 조회수) 목록 (값은 읽지 않음)"""
+        self.flush_access()
+        rows = self._connection().execute(
+            "SELECT key, LENGTH(CAST(value AS BLOB)) + LENGTH(CAST(key AS BLOB)), stored_at, COALESCE(accessed_at, stored_at), hits "
+            "FROM cache WHERE prefix = ?", (prefix,)
+        )
+        yield from rows.fetchall()
+
+    def delete_many(self, prefix, keys):
+        keys = [str(key) for key in keys]
+        with self._connection() as connection:
+            for start in range(0, len(keys), _SQLITE_BATCH_SIZE):
+                chunk = keys[start:start + _SQLITE_BATCH_SIZE]
+                placeholders = ', '.join('?' for _ in chunk)
+                connection.execute(f"DELETE FROM cache WHERE prefix = ? AND key IN ({placeholders})", [prefix, *chunk])
+
+    def size_bytes(self):
+        """DB 파일과 WAL 파일 크기 합계"""
+        return sum(os.path.getsize(path) for path in (self.db_path, f"{self.db_path}-wal") if os.path.exists(path))
+
+    def compact(self, vacuum_ratio=0.2):
+        """
+        WAL을 본 파일에 반영하고 비웁니다. 삭제로 생긴 빈 페이지가 vacuum_ratio 이상이면
+        PRAGMA incremental_vacuum으로 빈 페이지만 반환해 파일을 줄입니다. (DB 전체를 다시 쓰는 VACUUM 없이)
+        증분 모드가 아닌 기존 파일은 처음 한 번만 VACUUM으로 증분 모드로 전환합니다.
+        다른 프로세스가 쓰는 중이라 잠금을 얻지 못하면 다음 정리 때 다시 시도합니다.
+        """
+        self.flush_access()
+        connection = self._connection()
+        try:
+            page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            if page_count and free_pages / page_count >= vacuum_ratio:
+                # auto_vacuum: 0=NONE, 1=FULL, 2=INCREMENTAL
+                if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                    connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    connection.execute("VACUUM")
+                else:
+                    # execute()는 한 단계(1페이지)만 실행하므로 executescript로 끝까지 실행
+                    connection.executescript(f"PRAGMA incremental_vacuum({free_pages});")
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.OperationalError as e:
+            print(f"[ERROR] 캐시 DB 압축 실패 (다음 정리 때 재시도): {e}")
+
+
+# 경로별 저장소 인스턴스 (CacheManager는 호출마다 생성되므로 연결을 공유하도록 재사용)
+_STORAGES = {}
+_STORAGES_LOCK = threading.Lock()
+
+
+def get_storage(cache_dir, backend=None):
+    """CACHE_BACKEND(또는 backend)에 맞는 저장소를 반환합니다."""
+    backend = (backend or CACHE_BACKEND).lower()
+    if backend == 'json':
+        location = os.path.abspath(cache_dir)
+        factory = JsonCacheStorage
+    elif backend == 'sqlite':
+        location = os.path.abspath(CACHE_DB_PATH or os.path.join(cache_dir, 'cache.sqlite3'))
+        legacy_dir = os.path.abspath(cache_dir)
+
+        def factory(db_path):
+            return SQLiteCacheStorage(db_path, legacy_dir=legacy_dir)
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+    with _STORAGES_LOCK:
+        storage = _STORAGES.get((backend, location))
+        if storage is None:
+            storage = _STORAGES[(backend, location)] = factory(location)
+    return storage
@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return int(default)
+
+
+# 프로세스 메모리 캐시 상한 (항목 수 / 직렬화 크기 기준 바이트)
+CACHE_MEMORY_MAX_ENTRIES = _env_int('CACHE_MEMORY_MAX_ENTRIES', 5000)
+CACHE_MEMORY_MAX_BYTES = _env_int('CACHE_MEMORY_MAX_BYTES', 64 * 1024 * 1024)
+
+
+class LRUMemoryCache:
+    """
+    CacheManager 앞단의 프로세스 내 LRU 캐시. (prefix, key)별로 공백 없이 직렬화한 JSON 문자열(압축하지 않음)과 저장시각을 보관합니다.
+    값은 문자열로 보관하고 꺼낼 때마다 새 객체로 복원하므로 호출자가 결과를 수정해도 캐시에 영향이 없습니다.
+    항목 수나 바이트 합계가 상한을 넘으면 가장 오래 쓰지 않은 항목부터 내보냅니다.
+    """
+
+    def __init__(self, max_entries=CACHE_MEMORY_MAX_ENTRIES, max_bytes=CACHE_MEMORY_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, prefix, name):
+        counters = self._stats.setdefault(prefix, {'hits': 0, 'misses': 0})
+        counters[name] += 1
+
+    def _peek(self, prefix, key):
+        """lock 보유 상태에서 호출. 있으면 최근 사용으로 옮기고 (value, stored_at)을 반환."""
+        entry = self._entries.get((prefix, str(key)))
+        if entry is not None:
+            self._entries.move_to_end((prefix, str(key)))
+        return entry
+
+    def get(self, prefix, key):
+        """(data, stored_at) 또는 None. 조회 결과를 접두어별 hit/miss로 집계합니다."""
+        with self._lock:
+            entry = self._peek(prefix, key)
+            self._count(prefix, 'hits' if entry else 'misses')
+        return None if entry is None else (json.loads(entry[0]), entry[1])
+
+    def stored_at(self, prefix, key):
+        """메모리에 있으면 저장시각, 없으면 None (hit/miss 집계 안 함)."""
+        with self._lock:
+            entry = self._peek(prefix, key)
+        return None if entry is None else entry[1]
+
+    def put(self, prefix, key, data, stored_at):
+        value = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop((prefix, str(key)), None)
+            if old is not None:
+                self.total_bytes -= old[2]
+            self._entries[(prefix, str(key))] = (value, stored_at, size)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted[2]
+
+    def invalidate(self, prefix, key):
+        with self._lock:
+            old = self._entries.pop((prefix, str(key)), None)
+            if old is not None:
+                self.total_bytes -= old[2]
+
+    def stats(self):
+        """접두어별 hits/misses/hit_rate와 전체 항목 수/바이트."""
+        with self._lock:
+            prefixes = {
+                prefix: {**counters, 'hit_rate': round(counters['hits'] / max(1, counters['hits'] + counters['misses']), 3)}
+                for prefix, counters in self._stats.items()
+            }
+            return {'entries': len(self._entries), 'bytes': self.total_bytes, 'prefixes': prefixes}
+
+
+# 프로세스 전역 메모리 캐시 (CacheManager 인스턴스는 호출마다 생성되므로 공유)
+MEMORY_CACHE = LRUMemoryCache()
+
+
+def memory_cache_stats():
+    return MEMORY_CACHE.stats()
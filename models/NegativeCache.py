@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from collections import Counter
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+# 실패 사유별 부정 캐시 유지 시간(초) (NEGATIVE_CACHE_TTL_<사유>로 조정)
+NEGATIVE_CACHE_TTL = {
+    reason: _env_float(f'NEGATIVE_CACHE_TTL_{reason.upper()}', default)
+    for reason, default in (('not_found', 600), ('failed', 60), ('error', 300))
+}
+# 보관하는 최대 항목 수 (넘으면 만료된 항목부터 정리)
+NEGATIVE_CACHE_MAX_ENTRIES = int(_env_float('NEGATIVE_CACHE_MAX_ENTRIES', 10000))
+
+
+class NegativeCache:
+    """
+    검색 결과 없음/조회 실패를 (종류, 조회값)별로 짧은 시간 기억해 같은 요청이 반복될 때 호출 없이 바로 실패를 반환합니다.
+    만료와 무관하게 (종류, 조회값, 사유)별 누적 실패 횟수를 집계해 계속 실패하는 종목을 찾을 수 있게 합니다.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._failures = Counter()
+        self._hits = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, kind, query):
+        """기억된 실패 사유. 없거나 만료됐으면 None."""
+        key = (kind, str(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            reason, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._hits[key] += 1
+        return reason
+
+    def put(self, kind, query, reason, ttl=None):
+        key = (kind, str(query))
+        ttl = NEGATIVE_CACHE_TTL.get(reason, NEGATIVE_CACHE_TTL['failed']) if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (reason, now + ttl)
+            self._failures[(kind, str(query), reason)] += 1
+            if len(self._entries) > NEGATIVE_CACHE_MAX_ENTRIES:
+                for expired in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+                    del self._entries[expired]
+                while len(self._entries) > NEGATIVE_CACHE_MAX_ENTRIES:
+                    del self._entries[next(iter(self._entries))]
+        print(f"[DEBUG] 부정 캐시 저장: {kind} {query} ({reason}, {ttl:.0f}초)")
+
+    def forget(self, kind, query):
+        """조회가 성공하면 기억된 실패를 지웁니다."""
+        with self._lock:
+            self._entries.pop((kind, str(query)), None)
+
+    def stats(self, top=20):
+        """현재 항목 수, 부정 캐시로 막은 횟수, 누적 실패가 많은 (종류, 조회값, 사유) 상위 목록."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': sum(self._hits.values()),
+                'top_failures': self._failures.most_common(top),
+            }
+
+
+# 프로세스 전역 부정 캐시
+NEGATIVE_CACHE = NegativeCache()
+
+
+def negative_cache_stats(top=20):
+    return NEGATIVE_CACHE.stats(top)
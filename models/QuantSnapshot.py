@@ -0,0 +1,239 @@
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+# 전 종목 퀀트 스냅샷 위치 (봇과 reporter-worker가 함께 마운트하는 캐시 디렉터리) / 새 스냅샷 확인 주기(초)
+QUANT_SNAPSHOT_PATH = os.getenv('QUANT_SNAPSHOT_PATH', os.path.join('cache', 'quant_snapshot.bin'))
+QUANT_SNAPSHOT_CHECK_INTERVAL = _env_float('QUANT_SNAPSHOT_CHECK_INTERVAL', 5)
+
+# 파일 구조: 헤더(매직, 메타데이터 JSON 길이) + 메타데이터 JSON + 8바이트 정렬된 구간들
+#   codes:        정렬된 종목코드 (code_width 바이트 고정폭, 남는 자리는 0)
+#   numeric:      float64 숫자 컬럼 (컬럼 우선 배치, 값 없음은 NaN)
+#   string_refs:  uint32 (오프셋, 길이) 쌍 문자열 컬럼 (컬럼 우선 배치)
+#   string_table: 중복을 제거한 UTF-8 문자열 모음
+_MAGIC = b'QSNAP001'
+_HEADER = struct.Struct('<8sI')
+_ALIGN = 8
+# 값이 없는 칸을 나타내는 값 (퀀트 결과의 관례)
+MISSING = 'N/A'
+
+
+def _pad(length):
+    return (-length) % _ALIGN
+
+
+def _to_float(value):
+    if value is None or value == MISSING:
+        return math.nan
+    try:
+        if isinstance(value, str):
+            value = value.replace(',', '').replace('%', '').strip()
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _to_str(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return MISSING
+    return str(value)
+
+
+def publish_snapshot(records, numeric_columns, string_columns, path=QUANT_SNAPSHOT_PATH, code_key='종목코드', **meta):
+    """
+    records(종목별 dict)를 스냅샷 파일로 저장합니다. 같은 디렉터리의 임시 파일에 모두 쓴 뒤 rename으로 교체하므로
+    읽는 쪽은 이전 스냅샷이나 새 스냅샷 전체만 보며, 이미 열어 둔 이전 스냅샷도 계속 읽을 수 있습니다.
+    meta(기준일 등)는 메타데이터에 그대로 기록합니다. 저장한 종목 수를 반환합니다.
+    """
+    rows = {}
+    for record in records:
+        code = _to_str(record.get(code_key)).strip()
+        if code and code != MISSING:
+            rows[code] = record  # 같은 종목이 여러 번 나오면 마지막 값 사용
+    codes = sorted(rows)
+    count = len(codes)
+    code_width = max((len(code.encode('utf-8')) for code in codes), default=1)
+
+    code_bytes = b''.join(code.encode('utf-8').ljust(code_width, b'\0') for code in codes)
+    numeric = struct.pack(f'<{count * len(numeric_columns)}d', *(
+        _to_float(rows[code].get(column)) for column in numeric_columns for code in codes
+    ))
+
+    string_offsets, string_table, refs = {}, bytearray(), []
+    for column in string_columns:
+        for code in codes:
+            encoded = _to_str(rows[code].get(column)).encode('utf-8')
+            offset = string_offsets.get(encoded)
+            if offset is None:
+                offset = string_offsets[encoded] = len(string_table)
+                string_table += encoded
+            refs.extend((offset, len(encoded)))
+    string_refs = struct.pack(f'<{len(refs)}I', *refs)
+
+    sections, position = {}, 0
+    for name, data in (('codes', code_bytes), ('numeric', numeric), ('string_refs', string_refs), ('string_table', string_table)):
+        sections[name] = [position, len(data)]
+        position += len(data) + _pad(len(data))
+    header = json.dumps({
+        'rows': count, 'code_width': code_width, 'numeric': list(numeric_columns), 'strings': list(string_columns),
+        'sections': sections, 'published_at': time.time(), **meta,
+    }, ensure_ascii=False).encode('utf-8')
+    header += b' ' * _pad(_HEADER.size + len(header))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, len(header)))
+            file.write(header)
+            for data in (code_bytes, numeric, string_refs, string_table):
+                file.write(data)
+                file.write(b'\0' * _pad(len(data)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    print(f"[DEBUG] 퀀트 스냅샷 게시: {path} ({count}개 종목, {position / 1024 / 1024:.1f}MB)")
+    return count
+
+
+class QuantSnapshot:
+    """
+    publish_snapshot으로 만든 파일을 메모리 매핑해 읽습니다. 열 때 메타데이터 JSON만 읽고,
+    조회는 종목코드 이진 탐색 후 필요한 칸만 매핑된 페이지에서 바로 꺼내므로 파싱/복사가 없습니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a quant snapshot: {path}")
+        self.meta = json.loads(self._mmap[_HEADER.size:_HEADER.size + header_length])
+        self.rows = self.meta['rows']
+        self.numeric_columns = {column: i for i, column in enumerate(self.meta['numeric'])}
+        self.string_columns = {column: i for i, column in enumerate(self.meta['strings'])}
+        self.published_at = self.meta['published_at']
+
+        base = _HEADER.size + header_length
+        view = memoryview(self._mmap)
+
+        def section(name):
+            offset, length = self.meta['sections'][name]
+            return view[base + offset:base + offset + length]
+
+        self._codes_offset = base + self.meta['sections']['codes'][0]
+        self._numeric = section('numeric').cast('d')
+        self._string_refs = section('string_refs').cast('I')
+        self._string_table = section('string_table')
+
+    def __len__(self):
+        return self.rows
+
+    def _code_at(self, index):
+        start = self._codes_offset + index * self.meta['code_width']
+        return self._mmap[start:start + self.meta['code_width']]
+
+    def find(self, code):
+        """종목코드의 행 번호. 없으면 None."""
+        target = str(code).encode('utf-8').ljust(self.meta['code_width'], b'\0')
+        if len(target) != self.meta['code_width']:
+            return None
+        low, high = 0, self.rows
+        while low < high:
+            middle = (low + high) // 2
+            if self._code_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self.rows and self._code_at(low) == target else None
+
+    def value(self, index, column):
+        """행 번호의 한 칸. 숫자 칸의 빈 값은 'N/A'."""
+        if column in self.numeric_columns:
+            number = self._numeric[self.numeric_columns[column] * self.rows + index]
+            return MISSING if math.isnan(number) else number
+        ref = (self.string_columns[column] * self.rows + index) * 2
+        offset, length = self._string_refs[ref], self._string_refs[ref + 1]
+        return str(self._string_table[offset:offset + length], 'utf-8')
+
+    def get(self, code, columns=None):
+        """{컬럼: 값} (columns를 주면 그 컬럼만, 스냅샷에 없는 컬럼은 제외). 종목이 없으면 None."""
+        index = self.find(code)
+        if index is None:
+            return None
+        columns = columns or [*self.numeric_columns, *self.string_columns]
+        return {
+            column: self.value(index, column)
+            for column in columns if column in self.numeric_columns or column in self.string_columns
+        }
+
+    def column(self, name):
+        """숫자 컬럼 전체(종목코드 정렬 순 float64 memoryview, 복사 없음). 전 종목 스크리닝용."""
+        start = self.numeric_columns[name] * self.rows
+        return self._numeric[start:start + self.rows]
+
+
+class SnapshotHandle:
+    """
+    게시된 최신 스냅샷을 돌려줍니다. QUANT_SNAPSHOT_CHECK_INTERVAL마다 파일이 교체됐는지(inode/수정시각) 확인해
+    새로 매핑하며, 이전 스냅샷은 참조가 남아 있는 동안 계속 유효합니다. 파일이 없거나 깨졌으면 None.
+    """
+
+    def __init__(self, path=QUANT_SNAPSHOT_PATH):
+        self.path = path
+        self._snapshot = None
+        self._identity = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self):
+        now = time.monotonic()
+        if now - self._checked_at < QUANT_SNAPSHOT_CHECK_INTERVAL:
+            return self._snapshot
+        with self._lock:
+            if now - self._checked_at < QUANT_SNAPSHOT_CHECK_INTERVAL:
+                return self._snapshot
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._snapshot, self._identity = None, None
+                return None
+            identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if identity != self._identity:
+                try:
+                    self._snapshot = QuantSnapshot(self.path)
+                    print(f"[DEBUG] 퀀트 스냅샷 로드: {self.path} ({len(self._snapshot)}개 종목)")
+                except (OSError, ValueError, struct.error) as e:
+                    print(f"[ERROR] 퀀트 스냅샷을 열지 못했습니다: {self.path} ({e})")
+                    self._snapshot = None
+                self._identity = identity
+            return self._snapshot
+
+    def get(self, code, columns=None):
+        """(값 dict, 게시 시각) 또는 None"""
+        snapshot = self.current()
+        if snapshot is None:
+            return None
+        values = snapshot.get(code, columns)
+        return None if values is None else (values, snapshot.published_at)
+
+
+# 프로세스 전역 스냅샷 핸들
+QUANT_SNAPSHOT = SnapshotHandle()
@@ -1,22 +1,40 @@
+import os
+import sys
 from finvizfinance.quote import finvizfinance
 
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.rate_limit_util import rate_limited
+from utils.circuit_breaker_util import circuit_guard, CircuitOpenError
+from models.NegativeCache import NEGATIVE_CACHE
+
+def _error_row(stock_code, note):
+    """조회 실패 시 반환하는 행 (정상 결과와 같은 구조)"""
+    return {
+        '종목명': 'Error', 'PER': 'N/A', 'fwdPER': 'N/A', 'PBR': 'N/A', 
+        '배당수익률': 'N/A', '예상배당수익률': 'N/A', 'ROE': 'N/A', '현재가': 'N/A', 
+        '전일비': 'N/A', '등락률': 'N/A', '비고(메모)': note, '1D': 'N/A', 
+        '1W': 'N/A', '1M': 'N/A', '3M': 'N/A', '6M': 'N/A', 'YTD': 'N/A', 
+        '1Y': 'N/A', '종목코드': stock_code, '네이버url': '', 'FinvizUrl': ''
+    }
+
 def fetch_worldstock_info(stock_code):
-    """finviz 용으로 재 작성"""
+    """finviz 용으로 재 작성 (최근 실패한 티커는 부정 캐시 유지시간 동안 호출 없이 오류 행 반환)"""
+    reason = NEGATIVE_CACHE.get('finviz', stock_code)
+    if reason:
+        return _error_row(stock_code, f'Fetch Error (cached): {reason}')
     try:
-        stock = finvizfinance(stock_code.replace('.','-'))  # 예: 'TSLA' 또는 'SPY'
-        
-        # Fundament
-        stock_fundament = stock.ticker_fundament()
+        # finvizfinance는 자체 requests 세션을 쓰므로 finviz 회로 차단기/호스트 리미터를 직접 적용
+        with circuit_guard('finviz.com'), rate_limited('finviz.com'):
+            stock = finvizfinance(stock_code.replace('.','-'))  # 예: 'TSLA' 또는 'SPY'
+
+            # Fundament
+            stock_fundament = stock.ticker_fundament()
 
         if not stock_fundament:
             print(f"Error fetching fundamental data for {stock_code} from finviz.")
-            return {
-                '종목명': 'Error', 'PER': 'N/A', 'fwdPER': 'N/A', 'PBR': 'N/A', 
-                '배당수익률': 'N/A', '예상배당수익률': 'N/A', 'ROE': 'N/A', '현재가': 'N/A', 
-                '전일비': 'N/A', '등락률': 'N/A', '비고(메모)': 'Fundamental Data Not Found', '1D': 'N/A', 
-                '1W': 'N/A', '1M': 'N/A', '3M': 'N/A', '6M': 'N/A', 'YTD': 'N/A', 
-                '1Y': 'N/A', '종목코드': stock_code, '네이버url': '', 'FinvizUrl': ''
-            }
+            NEGATIVE_CACHE.put('finviz', stock_code, 'not_found')
+            return _error_row(stock_code, 'Fundamental Data Not Found')
 
         print(stock_fundament)
         # Description
@@ -50,15 +68,13 @@ def fetch_worldstock_info(stock_code):
         }
 
         print(data)
+        NEGATIVE_CACHE.forget('finviz', stock_code)
         return data
 
     except Exception as e:
         print(f"Error fetching data for {stock_code} from finviz: {e}")
+        # 회로 차단은 티커 문제가 아니므로 부정 캐시에 기록하지 않음
+        if not isinstance(e, CircuitOpenError):
+            NEGATIVE_CACHE.put('finviz', stock_code, 'error')
         # Return a dictionary with error values, maintaining the same structure
-        return {
-            '종목명': 'Error', 'PER': 'N/A', 'fwdPER': 'N/A', 'PBR': 'N/A', 
-            '배당수익률': 'N/A', '예상배당수익률': 'N/A', 'ROE': 'N/A', '현재가': 'N/A', 
-            '전일비': 'N/A', '등락률': 'N/A', '비고(메모)': f'Fetch Error: {e}', '1D': 'N/A', 
-            '1W': 'N/A', '1M': 'N/A', '3M': 'N/A', '6M': 'N/A', 'YTD': 'N/A', 
-            '1Y': 'N/A', '종목코드': stock_code, '네이버url': '', 'FinvizUrl': ''
-        }
+        return _error_row(stock_code, f'Fetch Error: {e}')
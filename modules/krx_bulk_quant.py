@@ -0,0 +1,193 @@
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+import pandas as pd
+from pykrx import stock
+
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from modules.naver_upjong_quant import fetch_upjong_list_API, fetch_stock_info_in_upjong
+from utils.naver_stock_util import _resolve_end_date
+from utils.rate_limit_util import rate_limited
+
+# pykrx가 요청하는 KRX 정보데이터시스템 호스트 (리미터 키)
+KRX_DATA_HOST = 'data.krx.co.kr'
+
+# 기간수익률 기준 (기준일로부터 역산할 일수, YTD는 별도 처리) - stock_fetch_yield_by_period와 동일
+RETURN_PERIODS = {'1W': 7, '1M': 30, '3M': 90, '6M': 180, '1Y': 365}
+
+# 기준일(YYYYMMDD)별 KRX 전 종목 지표 / 종가 / 업종 매핑 (프로세스 내 1회만 조회)
+_FUNDAMENTAL_CACHE = {}
+_CLOSE_CACHE = {}
+_SECTOR_MAP = None
+_LOCK = threading.Lock()
+
+
+def _to_krx_date(date=None):
+    """'yymmdd', 'YYYYMMDD', 'YYYY-MM-DD' 또는 None(오늘)을 pykrx용 YYYYMMDD로 변환합니다."""
+    if date is None:
+        return datetime.today().strftime('%Y%m%d')
+    date = str(date).replace('-', '')
+    if len(date) == 6:
+        return datetime.strptime(date, '%y%m%d').strftime('%Y%m%d')
+    return date
+
+
+def resolve_trading_date(date=None):
+    """기준일이 휴장일이면 가장 가까운 이전 영업일(YYYYMMDD)을 반환합니다."""
+    return stock.get_nearest_business_day_in_a_week(_to_krx_date(date))
+
+
+def _ratio(value, zero_is_missing=True):
+    """pykrx 지표값을 퀀트 결과 형식으로 변환합니다. (PER/PBR의 0은 적자/자본잠식으로 N/A 처리)"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 'N/A'
+    if zero_is_missing and value == 0:
+        return 'N/A'
+    return round(value, 2)
+
+
+def fetch_market_fundamentals(date=None):
+    """
+    KRX 전 종목(KOSPI/KOSDAQ/KONEX)의 PER/PBR/DIV 스냅샷을 한 번의 호출로 받아
+    {종목코드: {'PER', 'PBR', '배당수익률'}}로 반환합니다. 같은 영업일은 프로세스 내에서 재사용합니다.
+    """
+    trading_date = resolve_trading_date(date)
+    with _LOCK:
+        if trading_date in _FUNDAMENTAL_CACHE:
+            return _FUNDAMENTAL_CACHE[trading_date]
+
+    print(f"[DEBUG] KRX 전 종목 지표 조회 (기준일: {trading_date})")
+    with rate_limited(KRX_DATA_HOST):
+        df = stock.get_market_fundamental(trading_date, market='ALL')
+    fundamentals = {
+        ticker: {
+            'PER': _ratio(row.get('PER')),
+            'PBR': _ratio(row.get('PBR')),
+            '배당수익률': _ratio(row.get('DIV'), zero_is_missing=False),
+        }
+        for ticker, row in df.iterrows()
+    }
+
+    with _LOCK:
+        _FUNDAMENTAL_CACHE[trading_date] = fundamentals
+    return fundamentals
+
+
+def fetch_sector_map():
+    """
+    네이버 업종 페이지(업종 수만큼의 요청)로 {종목코드: 업종명} 매핑을 만듭니다.
+    종목별 integration 호출 없이 업종 컬럼을 채우기 위해 사용합니다.
+    """
+    global _SECTOR_MAP
+    with _LOCK:
+        if _SECTOR_MAP is not None:
+            return _SECTOR_MAP
+
+    sector_map = {}
+    for 업종명, _, 링크 in fetch_upjong_list_API('KOR'):
+        try:
+            stock_info = fetch_stock_info_in_upjong(링크)
+        except Exception as e:
+            print(f"[ERROR] 업종 종목 조회 실패 ({업종명}): {e}")
+            continue
+        for _, _, _, _, 종목링크 in stock_info:
+            sector_map.setdefault(종목링크.split('=')[-1], 업종명)
+
+    with _LOCK:
+        _SECTOR_MAP = sector_map
+    return sector_map
+
+
+def build_valuation_table(date=None, codes=None):
+    """
+    배치 API의 preloaded 형식인 {종목코드: {'valuation': {...}}} 테이블을 만듭니다.
+    PER/PBR/배당수익률은 KRX 스냅샷, 업종은 업종 페이지 매핑에서 채웁니다.
+    일괄 자료에 없는 추정PER(fwdPER)는 별도 그룹(consensus)이라 종목별 캐시/integration 호출로 채워집니다.
+    스냅샷에 없는 종목은 테이블에서 빠지므로 배치 API가 종목별 네이버 호출로 보완합니다.
+    """
+    try:
+        fundamentals = fetch_market_fundamentals(date)
+    except Exception as e:
+        print(f"[ERROR] KRX 일괄 지표 조회 실패, 종목별 조회로 대체합니다: {e}")
+        return {}
+    sector_map = fetch_sector_map()
+
+    table = {}
+    for code in (codes if codes is not None else fundamentals):
+        if code not in fundamentals:
+            continue
+        valuation = dict(fundamentals[code])
+        valuation['업종'] = sector_map.get(code, 'N/A')
+        table[code] = {'valuation': valuation}
+    print(f"[DEBUG] KRX 일괄 지표 적용 {len(table)}건")
+    return table
+
+
+def fetch_market_closes(trading_date):
+    """
+    KRX 전 종목의 해당 영업일(YYYYMMDD) 종가를 한 번의 호출로 받아 pd.Series(index=종목코드)로 반환합니다.
+    거래정지 등으로 종가가 0인 종목은 NaN으로 둡니다.
+    """
+    with _LOCK:
+        if trading_date in _CLOSE_CACHE:
+            return _CLOSE_CACHE[trading_date]
+
+    print(f"[DEBUG] KRX 전 종목 종가 조회 (기준일: {trading_date})")
+    with rate_limited(KRX_DATA_HOST):
+        df = stock.get_market_ohlcv(trading_date, market='ALL')
+    closes = pd.to_numeric(df['종가'], errors='coerce').where(lambda s: s > 0)
+
+    with _LOCK:
+        _CLOSE_CACHE[trading_date] = closes
+    return closes
+
+
+def _reference_dates(date=None):
+    """
+    기준일과 기간별(1W/1M/3M/6M/YTD/1Y) 비교 영업일(YYYYMMDD)을 계산합니다.
+    종목별 일봉에서 '목표일 이전의 가장 최근 거래일'을 찾는 stock_fetch_yield_by_period와 같은 날짜가 되도록
+    목표일마다 가장 가까운 이전 영업일을 사용하고, YTD는 해당 연도 첫 영업일(없으면 전년도 마지막 영업일)을 사용합니다.
+    """
+    end_date = _resolve_end_date(date)
+    current = resolve_trading_date(end_date.strftime('%Y%m%d'))
+
+    references = {
+        key: resolve_trading_date((end_date - timedelta(days=days)).strftime('%Y%m%d'))
+        for key, days in RETURN_PERIODS.items()
+    }
+    year_start = stock.get_nearest_business_day_in_a_week(f"{end_date.year}0101", prev=False)
+    if year_start > current:
+        year_start = resolve_trading_date(f"{end_date.year - 1}1231")
+    references['YTD'] = year_start
+    return current, references
+
+
+def build_returns_table(date=None, codes=None):
+    """
+    배치 API의 preloaded 형식인 {종목코드: {'returns': {...}}} 테이블을 만듭니다.
+    종목별로 380일치 일봉을 받는 대신 기준일과 비교일(최대 7개 영업일)의 전 종목 종가만 받아 한 번에 나눠 계산합니다.
+    비교일 중 하나라도 종가가 없는 종목(신규상장/거래정지 등)은 테이블에서 빠지므로 배치 API가 종목별 조회로 보완합니다.
+    """
+    try:
+        current, references = _reference_dates(date)
+        current_close = fetch_market_closes(current)
+        past_closes = pd.DataFrame({key: fetch_market_closes(ref) for key, ref in references.items()})
+    except Exception as e:
+        print(f"[ERROR] KRX 일괄 기간수익률 조회 실패, 종목별 조회로 대체합니다: {e}")
+        return {}
+
+    # 기간별 수익률(%)을 전 종목에 대해 한 번에 계산
+    returns_df = (past_closes.rdiv(current_close, axis=0) - 1).mul(100).dropna()
+    if codes is not None:
+        returns_df = returns_df[returns_df.index.isin(list(codes))]
+
+    table = {
+        code: {'returns': {key: "{:.2f}".format(round(row[key], 2)) for key in ['1W', '1M', '3M', '6M', 'YTD', '1Y']}}
+        for code, row in returns_df.iterrows()
+    }
+    print(f"[DEBUG] KRX 일괄 기간수익률 적용 {len(table)}건 (기준일: {current}, 비교일: {references})")
+    return table
@@ -0,0 +1,84 @@
+import math
+import os
+import sys
+
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app_secrets.endpoints import NAVER_STOCK_PAGE_URL
+from utils.http_util import http_get
+from utils.naver_stock_util import clean_numeric_dict
+
+# 시장 목록 API 한 페이지당 종목 수 (최대)
+LISTING_PAGE_SIZE = 100
+# 목록에서 가져오는 시세 컬럼 (quote 그룹)
+LISTING_NUMERIC_KEYS = ['현재가', '전일비', '등락률', '1D']
+
+
+def fetch_market_listing(base_url, market_name, page_size=LISTING_PAGE_SIZE):
+    """
+    시장 목록 API(KOSPI/KOSDAQ/NYSE/NASDAQ/AMEX)의 모든 페이지를 받아 원본 종목 목록(stocks)을 반환합니다.
+    페이지마다 종목 100개의 시세/시가총액이 들어 있어 종목별 basic 호출 없이 시세 테이블을 만들 수 있습니다.
+    """
+    response = http_get(base_url, params={"page": 1, "pageSize": page_size})
+    if response.status_code != 200:
+        print(f"{market_name} 첫 페이지 요청 실패: {response.status_code}")
+        return []
+
+    data = response.json()
+    total_count = data.get("totalCount", 0)
+    total_pages = math.ceil(total_count / page_size)
+    print(f"[DEBUG] {market_name} - 총 종목 수: {total_count}, 총 페이지 수: {total_pages}")
+
+    stocks = list(data.get("stocks", []))
+    for page in range(2, total_pages + 1):
+        response = http_get(base_url, params={"page": page, "pageSize": page_size})
+        if response.status_code == 200:
+            stocks.extend(response.json().get("stocks", []))
+        else:
+            print(f"{market_name} 페이지 {page} 요청 실패: {response.status_code}")
+    return stocks
+
+
+def parse_listing_quote(stock):
+    """목록 항목 하나를 퀀트 결과의 quote 그룹 형식(종목명/시장구분/현재가/전일비/등락률/1D)으로 변환합니다."""
+    quote = {
+        '종목명': stock.get('stockName', 'N/A'),
+        '시장구분': (stock.get('stockExchangeType') or {}).get('nameEng', 'N/A'),
+        '현재가': stock.get('closePrice', 'N/A'),
+        '전일비': stock.get('compareToPreviousClosePrice', 'N/A'),
+        '등락률': stock.get('fluctuationsRatio', 'N/A'),
+    }
+    quote['1D'] = quote['등락률']
+    return clean_numeric_dict(quote, LISTING_NUMERIC_KEYS)
+
+
+def build_quote_table(stocks, code_key='itemCode'):
+    """
+    목록 원본에서 배치 API의 preloaded 형식인 {종목코드: {'quote': 시세}} 테이블을 만듭니다.
+    국내 목록은 itemCode, 해외 목록은 symbolCode를 code_key로 사용합니다.
+    """
+    table = {}
+    for stock in stocks:
+        code = stock.get(code_key)
+        if code and code not in table:
+            table[code] = {'quote': parse_listing_quote(stock)}
+    return table
+
+
+def build_listing_record(stock, code_key='itemCode', nation_code='KOR'):
+    """
+    국내 목록 항목으로 search_stock_code 결과와 같은 형식의 레코드를 만듭니다.
+    국내 종목은 nationCode만으로 조회 경로가 정해지므로 자동완성 검색을 생략할 수 있습니다.
+    해외 종목은 조회 경로(worldstock url/reutersCode)가 검색 결과에 의존하므로 None을 반환합니다.
+    """
+    nation_code = (stock.get('stockExchangeType') or {}).get('nationCode', nation_code)
+    code = stock.get(code_key)
+    if not code or nation_code != 'KOR':
+        return None
+    return {
+        'code': code,
+        'name': stock.get('stockName', ''),
+        'url': NAVER_STOCK_PAGE_URL.format(code=code),
+        'reutersCode': stock.get('reutersCode', code),
+        'nationCode': nation_code,
+    }
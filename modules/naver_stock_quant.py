@@ -1,89 +1,158 @@
-import requests
+import asyncio
 import os
 import sys
+import functools
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from models.CacheManager import CacheManager
+from models.CacheManager import CacheManager, FRESH, STALE
 from app_secrets.endpoints import NAVER_DIVIDEND_RATE_URL
-from modules.naver_upjong_quant import fetch_stock_info_quant_API
+from utils.http_util import http_get, http_get_async
+from utils.circuit_breaker_util import CircuitOpenError
+from modules.naver_upjong_quant import fetch_stock_info_quant_batch
 
 import openpyxl
-from openpyxl.utils.dataframe import dataframe_to_rows
 import pandas as pd
 
-def fetch_dividend_stock_list_API(requested_stock_count=0):
-    # 기본 세팅
-    page=1 
-    # API당 fetch 수(최대)
-    pageSize = 100
-
-    # CacheManager 인스턴스 생성
-    cache_manager = CacheManager("cache", "dividend_stock")
-
-    # 전체 데이터를 담을 리스트
-    all_data = []
-
-    # 첫 페이지 호출하여 전체 페이지 수와 종목 수를 알아냄
-    first_page_url = NAVER_DIVIDEND_RATE_URL.format(page=1, pageSize=pageSize)
-    response = requests.get(first_page_url)
+# 배당 목록 API당 fetch 수(최대)
+DIVIDEND_PAGE_SIZE = 100
 
+def _dividend_response_json(response):
     if response.status_code != 200:
         raise Exception(f"API 요청 실패: {response.status_code}")
-
-    first_page_data = response.json()
+    return response.json()
+
+def _expired_dividend_page(cache_manager, cache_key, error):
+    """회로가 열려 있을 때 만료된 페이지 캐시라도 반환합니다. 캐시가 없으면 None."""
+    data = cache_manager.load_cache(cache_key)
+    if data is not None:
+        print(f"[DEBUG] {error} - 만료된 캐시를 사용합니다. ({cache_key})")
+    return data
+
+def _fetch_dividend_page(url, cache_manager, cache_key):
+    """
+    배당 목록 한 페이지를 조회해 (data, 새로 받았는지 여부)를 반환합니다.
+    회로가 열려 있으면 만료된 페이지 캐시라도 반환하고, 캐시가 없으면 즉시 실패합니다.
+    """
+    try:
+        response = http_get(url)
+    except CircuitOpenError as e:
+        data = _expired_dividend_page(cache_manager, cache_key, e)
+        if data is None:
+            raise
+        return data, False
+    return _dividend_response_json(response), True
+
+async def _fetch_dividend_page_async(url, cache_manager, cache_key):
+    """_fetch_dividend_page의 비동기 버전 (공용 AsyncClient 사용, 캐시 읽기는 스레드에서 실행)"""
+    try:
+        response = await http_get_async(url)
+    except CircuitOpenError as e:
+        data = await asyncio.to_thread(_expired_dividend_page, cache_manager, cache_key, e)
+        if data is None:
+            raise
+        return data, False
+    return _dividend_response_json(response), True
+
+def _refresh_dividend_page(url, cache_manager, cache_key):
+    """백그라운드 갱신: 배당 목록 페이지를 다시 받아 캐시에 저장합니다."""
+    data, fresh = _fetch_dividend_page(url, cache_manager, cache_key)
+    if fresh:
+        cache_manager.save_cache(cache_key, data)
+
+def _dividend_page_url(page):
+    return NAVER_DIVIDEND_RATE_URL.format(page=page, pageSize=DIVIDEND_PAGE_SIZE)
+
+def _dividend_pages(first_page_data, requested_stock_count):
+    """첫 페이지 응답으로 (수집할 페이지 수, 요청 종목 수, 전체 종목 수, 국가코드)를 계산합니다."""
     # nationCode 값을 0번째 인덱스에서 가져오기
     nation_code = first_page_data['dividends'][0]['stockExchangeType']['nationCode']
-    totalCount  = first_page_data.get('totalCount', 0)  # totalCount 추출, 없을 경우 기본값 0
+    total_count = first_page_data.get('totalCount', 0)  # totalCount 추출, 없을 경우 기본값 0
     print(f"0번째 인덱스 종목의 Nation Code: {nation_code}")
-    print(f"전체 종목수 : {totalCount}")
-    total_count = first_page_data.get('totalCount', 0)
-    total_pages = (total_count // pageSize) + (1 if total_count % pageSize > 0 else 0)
+    print(f"전체 종목수 : {total_count}")
 
     # requested_stock_count가 0이거나 값이 없는 경우 전체 데이터를 가져옴
     if requested_stock_count <= 0:
         requested_stock_count = total_count
 
-    # 데이터를 수집할 페이지 수 계산 (requested_stock_count에 맞게)
-    required_pages = (requested_stock_count // pageSize) + (1 if requested_stock_count % pageSize > 0 else 0)
-    
-    # 전체 페이지 수와 비교하여 최소 페이지 수로 설정
-    if page <= 0:
-        page = required_pages
-    else:
-        page = min(page, required_pages)
+    # 데이터를 수집할 페이지 수 계산 (requested_stock_count에 맞게, 기존 동작대로 최대 1페이지)
+    required_pages = (requested_stock_count // DIVIDEND_PAGE_SIZE) + (1 if requested_stock_count % DIVIDEND_PAGE_SIZE > 0 else 0)
+    return min(1, required_pages), requested_stock_count, total_count, nation_code
+
+def _cached_dividend_page(cache_manager, cache_key, page, nation_code, allow_stale):
+    """
+    유효한 페이지 캐시가 있으면 반환합니다. (allow_stale이면 만료 직후 캐시를 반환하고 백그라운드에서 갱신)
+    API를 호출해야 하면 None.
+    """
+    freshness = cache_manager.cache_freshness(cache_key, nation_code)
+    if freshness == FRESH:
+        print(f"[DEBUG] 유효한 캐시를 발견했습니다. (Page {page})")
+        return cache_manager.load_cache(cache_key)
+    if allow_stale and freshness == STALE:
+        print(f"[DEBUG] 만료 직후 캐시를 반환하고 백그라운드에서 갱신합니다. (Page {page})")
+        cache_manager.refresh_in_background(
+            cache_key, functools.partial(_refresh_dividend_page, _dividend_page_url(page), cache_manager, cache_key)
+        )
+        return cache_manager.load_cache(cache_key)
+    print(f"[DEBUG] 유효한 캐시가 없으므로 API를 호출합니다. (Page {page})")
+    return None
+
+def _collect_dividends(all_data, data, requested_stock_count):
+    """페이지의 배당 종목을 all_data에 추가하고 요청 수에 도달했는지 반환합니다."""
+    # 수집된 데이터를 리스트에 추가
+    all_data.extend(data.get('dividends', []))  # 'dividends' 키로 데이터 추출
+
+    # 수집된 데이터가 requested_stock_count에 도달하면 종료
+    if len(all_data) >= requested_stock_count:
+        print(f"[DEBUG] 요청한 {requested_stock_count}개의 데이터를 모두 수집했습니다.")
+        return True
+    return False
+
+def fetch_dividend_stock_list_API(requested_stock_count=0, allow_stale=False):
+    """국내 배당 종목 목록 (종목 목록, 전체 종목 수). allow_stale=True면 만료 직후 캐시를 바로 반환하고 백그라운드에서 갱신합니다."""
+    # CacheManager 인스턴스 생성
+    cache_manager = CacheManager("cache", "dividend_stock")
+
+    # 전체 데이터를 담을 리스트
+    all_data = []
+
+    # 첫 페이지 호출하여 전체 페이지 수와 종목 수를 알아냄
+    first_page_data, _ = _fetch_dividend_page(_dividend_page_url(1), cache_manager, 'dividend_stock_1')
+    page, requested_stock_count, total_count, nation_code = _dividend_pages(first_page_data, requested_stock_count)
 
     # 지정된 페이지 수만큼 데이터를 수집
     for p in range(1, page + 1):
         # 캐시 키를 페이지별로 구분하여 설정
         cache_key = f'dividend_stock_{p}'
+        data = _cached_dividend_page(cache_manager, cache_key, p, nation_code, allow_stale)
+        if data is None:
+            data, fresh = _fetch_dividend_page(_dividend_page_url(p), cache_manager, cache_key)
+            # 데이터를 캐시에 저장 (만료된 캐시로 대체한 경우는 저장하지 않음)
+            if fresh:
+                cache_manager.save_cache(cache_key, data)
+        if _collect_dividends(all_data, data, requested_stock_count):
+            break
 
-        # 캐시가 유효한지 확인
-        if cache_manager.is_cache_valid(cache_key, nation_code):
-            print(f"[DEBUG] 유효한 캐시를 발견했습니다. (Page {p})")
-            data = cache_manager.load_cache(cache_key)
-        else:
-            print(f"[DEBUG] 유효한 캐시가 없으므로 API를 호출합니다. (Page {p})")
-            # API 호출 URL
-            url = NAVER_DIVIDEND_RATE_URL.format(page=p, pageSize=pageSize)
-            response = requests.get(url)
-
-            if response.status_code != 200:
-                raise Exception(f"API 요청 실패: {response.status_code}")
-
-            data = response.json()
+    # 수집된 데이터가 requested_stock_count보다 많으면 잘라내기
+    return all_data[:requested_stock_count], total_count
 
-            # 데이터를 캐시에 저장
-            cache_manager.save_cache(cache_key, data)
+async def fetch_dividend_stock_list_API_async(requested_stock_count=0, allow_stale=False):
+    """fetch_dividend_stock_list_API의 비동기 버전 (봇 이벤트 루프를 막지 않도록 HTTP는 AsyncClient, 캐시 I/O는 스레드에서 실행)"""
+    cache_manager = CacheManager("cache", "dividend_stock")
+    all_data = []
 
-        # 수집된 데이터를 리스트에 추가
-        all_data.extend(data.get('dividends', []))  # 'dividends' 키로 데이터 추출
+    first_page_data, _ = await _fetch_dividend_page_async(_dividend_page_url(1), cache_manager, 'dividend_stock_1')
+    page, requested_stock_count, total_count, nation_code = _dividend_pages(first_page_data, requested_stock_count)
 
-        # 수집된 데이터가 requested_stock_count에 도달하면 종료
-        if len(all_data) >= requested_stock_count:
-            print(f"[DEBUG] 요청한 {requested_stock_count}개의 데이터를 모두 수집했습니다.")
+    for p in range(1, page + 1):
+        cache_key = f'dividend_stock_{p}'
+        data = await asyncio.to_thread(_cached_dividend_page, cache_manager, cache_key, p, nation_code, allow_stale)
+        if data is None:
+            data, fresh = await _fetch_dividend_page_async(_dividend_page_url(p), cache_manager, cache_key)
+            if fresh:
+                await asyncio.to_thread(cache_manager.save_cache, cache_key, data)
+        if _collect_dividends(all_data, data, requested_stock_count):
             break
 
-    # 수집된 데이터가 requested_stock_count보다 많으면 잘라내기
-    return all_data[:requested_stock_count], totalCount
+    return all_data[:requested_stock_count], total_count
 
 
 def save_stock_data_to_excel(data, file_name='dividend_stock_data.xlsx'):
@@ -96,43 +165,16 @@ def save_stock_data_to_excel(data, file_name='dividend_stock_data.xlsx'):
     ws.title = 'Dividend Stock Data'
     
     # 헤더 추가
-    headers = ['종목명', '종목코드', '배당수익률', '시장구분', 'PER', 'fwdPER', 'PBR', '예상배당수익률', 'ROE', '현재가', '전일비', '등락률', '비고(메모)', '1D', '1W', '1M', '3M', '6M', 'YTD', '1Y', '네이버url']
+    headers = ['종목명', '종목코드', '배당수익률', '시장구분', 'PER', 'fwdPER', 'PBR', '예상배당수익률', 'ROE', '현재가', '전일비', '등락률', '비고(메모)', '1D', '네이버url']
     ws.append(headers)
     
+    # 배당 종목의 퀀트 정보를 한 번에 조회 (입력 순서 유지, 기간수익률 차트 조회는 생략)
+    quant_df = fetch_stock_info_quant_batch(df['itemCode'].tolist(), fields=['quote', 'valuation', 'consensus', 'finance'])
+    quant_df = quant_df.astype(object).where(quant_df.notna(), 'N/A')
+
     # 데이터 추가
-    for row in dataframe_to_rows(df, index=False, header=False):
-        # ws.append(row)
-        # itemCode 값을 출력
-        item_code_index = df.columns.get_loc('itemCode')
-        stock_code = row[item_code_index]
-        
-        # fetch_stock_info_quant_API 호출 및 데이터 추가
-        stock_info = fetch_stock_info_quant_API(stock_code=stock_code)
-        
-        # 데이터 추가
-        info_row = [
-            stock_info['종목명'],
-            stock_info['종목코드'],
-            stock_info['배당수익률'],
-            stock_info['시장구분'],
-            stock_info['PER'],
-            stock_info['fwdPER'],
-            stock_info['PBR'],
-            stock_info['예상배당수익률'],
-            stock_info['ROE'],
-            stock_info['현재가'],
-            stock_info['전일비'],
-            stock_info['등락률'],
-            stock_info['비고(메모)'],
-            stock_info['1D'],
-            stock_info['1W'],
-            stock_info['1M'],
-            stock_info['3M'],
-            stock_info['6M'],
-            stock_info['YTD'],
-            stock_info['1Y'],
-            stock_info['네이버url']
-        ]
+    for stock_info in quant_df.to_dict('records'):
+        info_row = [stock_info[header] for header in headers]
         ws.append(info_row)
     
     # 파일 저장
@@ -1,11 +1,11 @@
 # naver_report_search_pc.py
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime, timedelta
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app_secrets.endpoints import NAVER_COMPANY_REPORT_URL
+from utils.http_util import http_get
 
 def fetch_research_data_pc(itemName, itemCode, writeFromDate='', writeToDate=''):
     print(f"Fetching research data for: {itemName} ({itemCode})")
@@ -27,7 +27,7 @@ def fetch_research_data_pc(itemName, itemCode, writeFromDate='', writeToDate='')
         'x': 46,
         'y': 18
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
     soup = BeautifulSoup(response.text, 'html.parser')
     
     columns = ['종목명', '제목', '브로커', '파일보기', '작성일', '번호']
@@ -1,40 +1,105 @@
 from datetime import datetime
 import argparse
 import re
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd  # pandas를 추가합니다
 import sys
 import os
+import asyncio
+import concurrent.futures
 
 # 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from models.CacheManager import CacheManager
+from models.CacheManager import CacheManager, FRESH, STALE
 from app_secrets.endpoints import (
     NAVER_INDUSTRY_URL, NAVER_FINANCE_BASE,
     NAVER_STOCK_BASIC_URL, NAVER_STOCK_INTEGRATION_URL,
     NAVER_STOCK_FINANCE_URL, NAVER_REUTERS_BASIC_URL,
 )
-from utils.naver_stock_util import stock_fetch_yield_by_period, search_stock_code, get_industry_name, safe_float, safe_int, clean_numeric_dict
+from utils.naver_stock_util import (
+    stock_fetch_yield_by_period, stock_fetch_yield_by_period_async,
+    search_stock_code, search_stock_code_async,
+    get_industry_name, get_industry_name_async, safe_float, safe_int, clean_numeric_dict,
+)
+from utils.http_util import DEFAULT_HEADERS, http_get, http_get_async
+from utils.circuit_breaker_util import CircuitOpenError
+from utils.deadline_util import DeadlineExceeded, gather_until, remaining_or_none
+from utils.singleflight_util import singleflight
+from utils.market_calendar_util import stale_before, SESSION, TRADING_DAY, DAILY
 from modules.finviz_stock_quant import fetch_worldstock_info
+from models.NegativeCache import NEGATIVE_CACHE
+from models.QuantSnapshot import QUANT_SNAPSHOT, MISSING
 
 # 전역 상수 설정
-DEFAULT_HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
 NUMERIC_KEYS = ['PER', 'fwdPER', 'PBR', '배당수익률', '예상배당수익률', 'ROE', '현재가', '전일비', '등락률', '1D', '1W', '1M', '3M', '6M', 'YTD', '1Y']
+# 퀀트 결과 컬럼 순서 (해외 종목은 FinvizUrl이 추가로 붙음)
+QUANT_COLUMNS = ['종목명', '시장구분', 'PER', 'fwdPER', 'PBR', '배당수익률', '예상배당수익률', 'ROE', '현재가', '전일비', '등락률', '비고(메모)', '업종', '1D', '1W', '1M', '3M', '6M', 'YTD', '1Y', '종목코드', '네이버url']
+# 조회 필드 그룹 (fields 인자로 필요한 그룹만 선택) 및 항상 포함되는 식별 컬럼
+QUANT_FIELD_GROUPS = {
+    'quote': ['시장구분', '현재가', '전일비', '등락률', '1D'],
+    'valuation': ['PER', 'PBR', '배당수익률', '업종'],
+    'consensus': ['fwdPER'],
+    'finance': ['ROE', '예상배당수익률'],
+    'returns': ['1W', '1M', '3M', '6M', 'YTD', '1Y'],
+}
+QUANT_IDENTITY_KEYS = ['종목명', '비고(메모)', '종목코드', '네이버url']
+# 봇이 메모리 매핑해 쓰는 전 종목 스냅샷 컬럼 (숫자 / 문자열, 엑셀 생성과 장 마감 후 예열에서 게시)
+QUANT_SNAPSHOT_NUMERIC_COLUMNS = NUMERIC_KEYS + ['시가총액(억)']
+QUANT_SNAPSHOT_STRING_COLUMNS = ['종목명', '시장구분', '업종', '비고(메모)', '네이버url']
+# 그룹별 캐시 갱신 주기 (시세는 장중 수 분, 밸류에이션/컨센서스/재무는 하루 한 번, 기간 수익률은 거래일마다 한 번)
+QUANT_GROUP_POLICIES = {
+    'quote': SESSION,
+    'valuation': DAILY,
+    'consensus': DAILY,
+    'finance': DAILY,
+    'returns': TRADING_DAY,
+}
+# 배치 조회에서 deadline까지 끝나지 않은 종목의 실패 사유
+DEADLINE_FAILURE = '처리 시한 초과'
+# 만료 직후 캐시를 반환한 경우(stale-while-revalidate) 비고(메모)에 남기는 표시
+STALE_NOTE = '캐시 데이터 (갱신 중)'
+# 배치 조회 최대 동시 실행 수 (실제 요청 속도는 utils.rate_limit_util의 호스트별 리미터가 응답 상태에 맞춰 조절)
+QUANT_BATCH_CONCURRENCY = int(os.getenv('QUANT_BATCH_CONCURRENCY', 32))
+# 국내 종목 하위 호출(basic/integration/finance/수익률)을 동시에 수행하는 공용 스레드 수
+# (종목마다 풀을 만들면 배치 동시 실행 수 x 4개까지 스레드가 늘어나므로 프로세스 전체에서 공유)
+DOMESTIC_FETCH_WORKERS = int(os.getenv('DOMESTIC_FETCH_WORKERS', 16))
+_DOMESTIC_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, DOMESTIC_FETCH_WORKERS), thread_name_prefix='domestic-fetch')
 
-def fetch_upjong_list_API(nation_code):
-    cache_manager = CacheManager("cache", "upjong")
-    
-    if cache_manager.is_cache_valid('upjong', nation_code):
+def _cached_upjong_list(cache_manager, nation_code, allow_stale):
+    """유효한(allow_stale이면 만료 직후 포함) 업종 목록 캐시. API를 호출해야 하면 None."""
+    freshness = cache_manager.cache_freshness('upjong', nation_code)
+    if freshness == FRESH:
         print("[DEBUG] 유효한 캐시를 발견했습니다.")
         return cache_manager.load_cache('upjong').get('result', [])
-    
+    if allow_stale and freshness == STALE:
+        print("[DEBUG] 만료 직후 캐시를 반환하고 백그라운드에서 갱신합니다.")
+        cache_manager.refresh_in_background('upjong', lambda: _fetch_upjong_list(cache_manager))
+        return cache_manager.load_cache('upjong').get('result', [])
     print("[DEBUG] 유효한 캐시가 없으므로 API를 호출합니다.")
-    url = NAVER_INDUSTRY_URL
-    response = requests.get(url)
-    
+    return None
+
+def fetch_upjong_list_API(nation_code, allow_stale=False):
+    """
+    업종 목록 [(업종명, 등락률, 링크)]. allow_stale=True면 만료 직후(최대 허용 지연 안)의 캐시를 바로 반환하고
+    백그라운드에서 갱신합니다. (봇 대화형 조회용)
+    """
+    cache_manager = CacheManager("cache", "upjong")
+    cached = _cached_upjong_list(cache_manager, nation_code, allow_stale)
+    return cached if cached is not None else _fetch_upjong_list(cache_manager)
+
+async def fetch_upjong_list_API_async(nation_code, allow_stale=False):
+    """fetch_upjong_list_API의 비동기 버전 (HTTP는 공용 AsyncClient, 캐시 I/O는 스레드에서 실행)"""
+    cache_manager = CacheManager("cache", "upjong")
+    cached = await asyncio.to_thread(_cached_upjong_list, cache_manager, nation_code, allow_stale)
+    if cached is not None:
+        return cached
+    result, closed = _parse_upjong_list(await http_get_async(NAVER_INDUSTRY_URL))
+    if closed:
+        await asyncio.to_thread(_save_closed_upjong_list, cache_manager, result)
+    return result
+
+def _parse_upjong_list(response):
+    """업종 목록 응답 → ([(업종명, 등락률, 링크)], 휴장(CLOSE) 여부)"""
     if response.status_code != 200:
         raise Exception(f"API 요청 실패: {response.status_code}")
     
@@ -46,25 +111,23 @@ def fetch_upjong_list_API(nation_code):
         change_rate = f"{group['changeRate']}%"
         link = f"/sise/sise_group_detail.naver?type=upjong&no={group['no']}"
         result.append((name, change_rate, link))
-    
-    if data['marketStatus'] == 'CLOSE':
-        print("[DEBUG] 마켓이 원래 개장 중이어야 하지만, 현재는 CLOSE 상태입니다 (휴장일 가능성).")
-        cache_manager.save_cache('upjong', {'result': result, 'marketStatus': 'CLOSE'})
-    
+    return result, data['marketStatus'] == 'CLOSE'
+
+def _save_closed_upjong_list(cache_manager, result):
+    print("[DEBUG] 마켓이 원래 개장 중이어야 하지만, 현재는 CLOSE 상태입니다 (휴장일 가능성).")
+    cache_manager.save_cache('upjong', {'result': result, 'marketStatus': 'CLOSE'})
+
+def _fetch_upjong_list(cache_manager):
+    """업종 목록을 조회하고 (휴장 상태면) 캐시에 저장합니다."""
+    result, closed = _parse_upjong_list(http_get(NAVER_INDUSTRY_URL))
+    if closed:
+        _save_closed_upjong_list(cache_manager, result)
     return result
 
-def fetch_stock_info_in_upjong(upjong_link):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+def _parse_stock_info_in_upjong(html, full_url):
+    """업종 상세 페이지 HTML에서 (종목명, 현재가, 전일비, 등락률, 링크) 목록을 추출합니다."""
     base_url = NAVER_FINANCE_BASE
-    full_url = base_url + upjong_link
-    print(f'Fetching stock info from: {full_url}')  # Debugging message
-
-    # 웹 페이지 요청
-    response = requests.get(full_url, headers=headers)
-    response.encoding = 'euc-kr'
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = BeautifulSoup(html, 'html.parser')
 
     # 종목 정보를 포함하는 테이블을 찾기
     table = soup.find('table', {'class': 'type_5'})  # 'type_5' 클래스가 사용됨
@@ -102,42 +165,31 @@ def fetch_stock_info_in_upjong(upjong_link):
     
     return stock_data
 
-def fetch_stock_info_quant_API(stock_code=None, stock_name=None, url=None, reutersCode=None, date=None):
+def fetch_stock_info_in_upjong(upjong_link):
+    full_url = NAVER_FINANCE_BASE + upjong_link
+    print(f'Fetching stock info from: {full_url}')  # Debugging message
+
+    # 웹 페이지 요청
+    response = http_get(full_url)
+    response.encoding = 'euc-kr'
+    return _parse_stock_info_in_upjong(response.text, full_url)
+
+async def fetch_stock_info_in_upjong_async(upjong_link):
+    """fetch_stock_info_in_upjong의 비동기 버전 (공용 AsyncClient 사용)"""
+    full_url = NAVER_FINANCE_BASE + upjong_link
+    print(f'Fetching stock info from: {full_url}')  # Debugging message
+
+    response = await http_get_async(full_url)
+    response.encoding = 'euc-kr'
+    return _parse_stock_info_in_upjong(response.text, full_url)
+
+def _select_search_target(stock_code=None, stock_name=None, url=None, reutersCode=None):
     if not any([stock_code, stock_name, url, reutersCode]):
         raise ValueError("Stock identification (code, name, url, or reutersCode) must be provided.")
-    
-    # 1. 종목 정보 기본 조회
-    results = search_stock_code(stock_code or stock_name or reutersCode)
-    if not results:
-        return {}
-    
-    target = results[0]
-    stock_code, stock_name, url = target['code'], target['name'], target['url']
-    reutersCode, nationCode = target['reutersCode'], target['nationCode']
-    
-    # 2. 캐시 확인
-    cache_manager = CacheManager("cache", "stock")
-    if cache_manager.is_cache_valid(stock_code, nationCode):
-        return cache_manager.load_cache(stock_code).get('result', {})
-    
-    # 3. 데이터 수집 (국내/해외 분기)
-    try:
-        if 'domestic' in url:
-            data = fetch_domestic_stock_info(stock_code, reutersCode, date)
-        elif 'worldstock' in url:
-            # Finviz 또는 Naver World API 사용 (기존 로직 유지)
-            ticker = url.split('/')[-2]
-            if '.T' in ticker: # 일본 주식 등은 Naver World API 선호 가능 (필요시 확장)
-                data = fetch_worldstock_info_NAVER(DEFAULT_HEADERS, stock_code, reutersCode)
-            else:
-                data = fetch_worldstock_info(stock_code)
-        else:
-            raise ValueError("Invalid stock URL format.")
-    except Exception as e:
-        print(f"[ERROR] Failed to fetch quant data for {stock_name}: {e}")
-        return {}
+    return stock_code or stock_name or reutersCode
 
-    # 4. 데이터 정제 및 공통 키 설정
+def _build_ordered_data(data, stock_code, stock_name, url):
+    """수집한 원본 데이터에 공통 키를 설정하고 컬럼 순서/숫자형을 정리합니다."""
     data['종목코드'] = str(stock_code)
     data['네이버url'] = url
     
@@ -171,43 +223,502 @@ def fetch_stock_info_quant_API(stock_code=None, stock_name=None, url=None, reute
         ordered_data['FinvizUrl'] = data.get('FinvizUrl', 'N/A')
 
     # 숫자 변환 유틸 적용
-    ordered_data = clean_numeric_dict(ordered_data, NUMERIC_KEYS)
-    
-    # 5. 캐시 저장 및 반환
-    cache_manager.save_cache(stock_code, {'result': ordered_data})
-    return ordered_data
-
-def fetch_domestic_stock_info(stock_code, reutersCode, date=None):
-    """국내 주식 상세 정보 조회 (API 기반)"""
-    basic_url = NAVER_STOCK_BASIC_URL.format(stock_code=stock_code)
-    integ_url = NAVER_STOCK_INTEGRATION_URL.format(stock_code=stock_code)
-    finance_url = NAVER_STOCK_FINANCE_URL.format(stock_code=stock_code)
-    
-    data = {}
-    
-    # Basic 정보
-    res_basic = requests.get(basic_url, headers=DEFAULT_HEADERS).json()
-    data.update({
+    return clean_numeric_dict(ordered_data, NUMERIC_KEYS)
+
+def _normalize_fields(fields):
+    """fields 인자를 검증하고 QUANT_FIELD_GROUPS 순서의 그룹 목록으로 바꿉니다. (None이면 전체)"""
+    if fields is None:
+        return list(QUANT_FIELD_GROUPS)
+    if isinstance(fields, str):
+        fields = [fields]
+    fields = set(fields)
+    unknown = fields - set(QUANT_FIELD_GROUPS)
+    if unknown:
+        raise ValueError(f"Unknown quant field groups: {sorted(unknown)} (choose from {list(QUANT_FIELD_GROUPS)})")
+    return [group for group in QUANT_FIELD_GROUPS if group in fields]
+
+def _project_columns(groups):
+    """선택한 그룹과 식별용 컬럼만 QUANT_COLUMNS 순서로 반환합니다."""
+    keys = set(QUANT_IDENTITY_KEYS)
+    for group in groups:
+        keys.update(QUANT_FIELD_GROUPS[group])
+    return [column for column in QUANT_COLUMNS if column in keys]
+
+def _project(data, groups):
+    """퀀트 결과 dict에서 선택한 그룹의 컬럼만 남깁니다."""
+    projected = {column: data.get(column, 'N/A') for column in _project_columns(groups)}
+    if 'FinvizUrl' in data:
+        projected['FinvizUrl'] = data['FinvizUrl']
+    return projected
+
+def _domestic_fetch_groups(groups):
+    """국내 종목 조회 시 실제로 채워지는 그룹 (예상배당수익률 계산에 현재가가 필요해 finance는 quote를 함께 가져옴)"""
+    fetched = set(groups)
+    if 'finance' in fetched:
+        fetched.add('quote')
+    return [group for group in QUANT_FIELD_GROUPS if group in fetched]
+
+def _preloaded_fields(preloaded, groups=None):
+    """미리 받은 {그룹: 필드} 에서 (groups에 해당하는) 필드를 하나의 dict로 합칩니다."""
+    fields = {}
+    for group, values in (preloaded or {}).items():
+        if group in QUANT_FIELD_GROUPS and (groups is None or group in groups):
+            fields.update(values)
+    return fields
+
+def merge_preloaded(*tables):
+    """{코드: {그룹: 필드}} 형식의 테이블(시장 목록 시세, KRX 일괄 지표 등)을 코드별로 합칩니다."""
+    merged = {}
+    for table in tables:
+        for code, groups in (table or {}).items():
+            merged.setdefault(code, {}).update(groups)
+    return merged
+
+def _group_stored_at(stored_at, fallback):
+    """그룹 저장시각(ISO 문자열)을 epoch 초로 바꿉니다. 없으면 fallback(캐시 전체 저장시각)."""
+    if not stored_at:
+        return fallback
+    try:
+        return datetime.fromisoformat(stored_at).timestamp()
+    except (TypeError, ValueError):
+        return fallback
+
+def _load_cached_groups(cache_manager, stock_code, nationCode):
+    """
+    캐시의 (result, groups, stale_groups)를 반환합니다. groups는 {그룹명: 저장시각} 중 QUANT_GROUP_POLICIES 기준으로
+    아직 유효한 그룹만 담으며, result에는 만료된 그룹의 값도 남아 있습니다. (조회 후 병합 저장 시 유지)
+    stale_groups는 만료됐지만 최대 허용 지연(cache_manager.max_stale()) 안인 그룹입니다.
+    그룹 정보가 없는 기존 캐시는 캐시 전체 저장시각을 모든 그룹의 저장시각으로 간주합니다.
+    캐시에 유효한 값이 없는 그룹은 reporter-worker가 게시한 전 종목 스냅샷(국내)에서 채웁니다.
+    """
+    cached = cache_manager.load_cache(stock_code) or {}
+    result = cached.get('result', {})
+    fresh_groups, stale_groups = {}, set()
+    if result:
+        stored_at = cache_manager.get_stored_at(stock_code)
+        fallback = stored_at.timestamp() if stored_at else None
+        groups = cached.get('groups') or {group: None for group in QUANT_FIELD_GROUPS}
+
+        for group, group_stored_at in groups.items():
+            timestamp = _group_stored_at(group_stored_at, fallback)
+            if group not in QUANT_GROUP_POLICIES or timestamp is None:
+                continue
+            boundary = stale_before(nationCode, policy=QUANT_GROUP_POLICIES[group])
+            if timestamp >= boundary:
+                fresh_groups[group] = group_stored_at or datetime.fromtimestamp(timestamp).isoformat(timespec='seconds')
+            elif timestamp >= boundary - cache_manager.max_stale():
+                stale_groups.add(group)
+
+    identity, snapshot_values, snapshot_groups = _load_snapshot_groups(stock_code, nationCode, fresh_groups)
+    if snapshot_groups:
+        result = {**identity, **result, **snapshot_values}
+        fresh_groups.update(snapshot_groups)
+        stale_groups.difference_update(snapshot_groups)
+    return result, fresh_groups, stale_groups
+
+def _load_snapshot_groups(stock_code, nationCode, fresh_groups):
+    """
+    전 종목 스냅샷(models.QuantSnapshot)에서 fresh_groups에 없는 그룹 중 스냅샷 게시 시각 기준으로 아직 유효한 그룹을 찾습니다.
+    ({종목명/종목코드}, {채운 그룹의 컬럼: 값}, {그룹: 게시 시각}). 스냅샷은 국내 종목만 담습니다.
+    엑셀 생성 시점의 비고(메모)/네이버url은 가져오지 않으며, 스냅샷에 컬럼이 없거나 값이 모두 비어 있는 그룹
+    (예: 일괄 자료로 만든 행의 추정PER)은 유효하다고 보지 않고 종목별 조회로 채웁니다.
+    """
+    missing = [group for group in QUANT_GROUP_POLICIES if group not in fresh_groups]
+    entry = QUANT_SNAPSHOT.get(stock_code) if nationCode == 'KOR' and missing else None
+    if entry is None:
+        return {}, {}, {}
+    snapshot, published_at = entry
+    stamp = datetime.fromtimestamp(published_at).isoformat(timespec='seconds')
+    values, groups = {}, {}
+    for group in missing:
+        if published_at < stale_before(nationCode, policy=QUANT_GROUP_POLICIES[group]):
+            continue
+        columns = QUANT_FIELD_GROUPS[group]
+        group_values = {column: snapshot[column] for column in columns if column in snapshot}
+        if len(group_values) < len(columns) or all(value == MISSING for value in group_values.values()):
+            continue
+        values.update(group_values)
+        groups[group] = stamp
+    identity = {'종목명': snapshot.get('종목명', MISSING), '종목코드': str(stock_code)}
+    return identity, values, groups
+
+def fresh_quant_groups(stock_code, nationCode='KOR'):
+    """캐시(국내는 전 종목 스냅샷 포함)에서 지금 유효한 그룹 집합. 캐시 예열 전후 점검용."""
+    _, fresh_groups, _ = _load_cached_groups(CacheManager("cache", "stock"), stock_code, nationCode)
+    return set(fresh_groups)
+
+def _serve_stale(cache_manager, record, date, cached_result, preloaded, groups, missing_groups):
+    """
+    stale-while-revalidate: 만료 직후 캐시를 바로 반환하고 만료된 그룹만 백그라운드에서 다시 조회해 캐시에 저장합니다.
+    반환값의 비고(메모)에 갱신 전 캐시 데이터임을 표시합니다.
+    """
+    stock_code, stock_name = record['code'], record['name']
+    print(f"[DEBUG] {stock_name} 만료 직후 캐시 반환, 백그라운드 갱신: {missing_groups}")
+    cache_manager.refresh_in_background(
+        stock_code, lambda: fetch_stock_info_quant_by_record(record, date, fields=missing_groups)
+    )
+    result = _project({**cached_result, **_preloaded_fields(preloaded, groups)}, groups)
+    result['비고(메모)'] = STALE_NOTE
+    return result
+
+def _load_stale_result(cache_manager, stock_code, stock_name, error):
+    """
+    회로가 열려 네이버/finviz를 호출할 수 없을 때 만료된 캐시 결과라도 있으면 반환합니다. 없으면 {}.
+    캐시가 전혀 없으면 요청은 즉시 실패로 끝납니다.
+    """
+    cached = cache_manager.load_cache(stock_code) or {}
+    result = cached.get('result', {})
+    if result:
+        print(f"[DEBUG] {error} - {stock_name} 만료된 캐시 데이터를 반환합니다.")
+    else:
+        print(f"[ERROR] Failed to fetch quant data for {stock_name}: {error}")
+    return result
+
+def _save_cached_groups(cache_manager, stock_code, cached_result, cached_groups, fetched, fetched_groups):
+    """
+    새로 조회한 그룹을 기존 캐시 결과에 병합해 저장하고 병합된 결과를 반환합니다.
+    cached_groups에 없는(만료된) 그룹은 저장시각을 남기지 않으므로 다음 조회 때 다시 가져옵니다.
+    조회하는 동안 다른 프로세스/스레드가 같은 종목의 다른 그룹을 저장했을 수 있으므로
+    키 잠금 안에서 저장소의 최신 캐시를 다시 읽어 그 위에 병합합니다. (그룹별 저장시각은 읽을 때 다시 판정)
+    """
+    stored_at = datetime.now().isoformat(timespec='seconds')
+    with cache_manager.lock(stock_code):
+        latest = cache_manager.reload_cache(stock_code) or {}
+        if latest.get('groups') and latest.get('result'):
+            cached_result, cached_groups = latest['result'], latest['groups']
+
+        merged = dict(cached_result)
+        for column in _project_columns(fetched_groups):
+            merged[column] = fetched.get(column, 'N/A')
+        if 'FinvizUrl' in fetched:
+            merged['FinvizUrl'] = fetched['FinvizUrl']
+
+        groups = dict(cached_groups)
+        groups.update({group: stored_at for group in fetched_groups})
+        cache_manager.save_cache(stock_code, {'result': merged, 'groups': groups})
+    return merged
+
+def _unpack_record(record):
+    """search_stock_code 결과 항목(또는 동일 키를 가진 dict)에서 조회에 필요한 값을 꺼냅니다."""
+    missing = [key for key in ('code', 'name', 'url') if not record.get(key)]
+    if missing:
+        raise ValueError(f"Resolved stock record is missing keys: {missing}")
+    url = record['url']
+    # nationCode가 없으면 url로 국내/해외를 판단
+    nationCode = record.get('nationCode') or ('KOR' if 'domestic' in url else 'USA')
+    return record['code'], record['name'], url, record.get('reutersCode'), nationCode
+
+class _QuantLookup:
+    """
+    레코드 기반 퀀트 조회의 조회 전(캐시 확인/stale 반환/부정 캐시)과 조회 후(정제/캐시 병합 저장/실패 처리) 단계.
+    fetch_stock_info_quant_by_record와 비동기 버전은 이 단계를 공유하고 데이터 수집 호출만 다릅니다.
+    """
+
+    def __init__(self, record, fields=None, preloaded=None):
+        self.record = record
+        self.groups = _normalize_fields(fields)
+        self.stock_code, self.stock_name, self.url, self.reutersCode, self.nationCode = _unpack_record(record)
+        self.preloaded = {group: values for group, values in (preloaded or {}).items() if group in QUANT_FIELD_GROUPS}
+        self.cache_manager = CacheManager("cache", "stock")
+        self.cached_result, self.cached_groups, self.stale_groups = {}, {}, set()
+        self.missing_groups = list(self.groups)
+
+    def source(self):
+        """데이터 수집 경로: 'domestic'(네이버 국내 API), 'naver_world'(네이버 해외 API, 일본 등), 'finviz'"""
+        if 'domestic' in self.url or self.nationCode == 'KOR':
+            return 'domestic'
+        if 'worldstock' in self.url:
+            ticker = self.url.split('/')[-2]
+            return 'naver_world' if '.T' in ticker else 'finviz'
+        raise ValueError("Invalid stock URL format.")
+
+    def load(self):
+        """캐시 확인 (저장소 I/O). 요청한 그룹 중 캐시에도 preloaded에도 없는 그룹을 missing_groups로 둡니다."""
+        self.cached_result, self.cached_groups, self.stale_groups = _load_cached_groups(self.cache_manager, self.stock_code, self.nationCode)
+        self.missing_groups = [group for group in self.groups if group not in self.cached_groups and group not in self.preloaded]
+
+    def cached_response(self, date, allow_stale):
+        """조회 없이 끝낼 수 있으면 결과(캐시/만료 직후 캐시/부정 캐시의 {}), 데이터 수집이 필요하면 None."""
+        if not self.missing_groups:
+            return self.project(self.cached_result)
+        if allow_stale and self.stale_groups.issuperset(self.missing_groups):
+            return _serve_stale(self.cache_manager, self.record, date, self.cached_result, self.preloaded, self.groups, self.missing_groups)
+        # 최근 조회에 실패한 종목은 부정 캐시 유지시간 동안 다시 호출하지 않음
+        if NEGATIVE_CACHE.get('quant', self.stock_code):
+            return {}
+        return None
+
+    def project(self, result):
+        """선택한 그룹의 컬럼만 남기고 미리 받은 그룹은 그 값으로 채웁니다."""
+        return _project({**result, **_preloaded_fields(self.preloaded, self.groups)}, self.groups)
+
+    def fetched_groups(self, source):
+        """수집으로 새로 채워 캐시에 저장할 그룹 (미리 받은 그룹과 finance와 함께 채워지는 quote 중 미리 받은 것은 제외)"""
+        fetched = _domestic_fetch_groups(self.missing_groups) if source == 'domestic' else list(QUANT_FIELD_GROUPS)
+        return [group for group in fetched if group not in self.preloaded]
+
+    def failed(self, error):
+        """수집 실패 처리. 회로 차단/시한 초과는 만료된 캐시라도 반환하고, 그 밖의 실패는 부정 캐시에 기록합니다."""
+        if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+            stale = _load_stale_result(self.cache_manager, self.stock_code, self.stock_name, error)
+            return self.project(stale) if stale else {}
+        print(f"[ERROR] Failed to fetch quant data for {self.stock_name}: {error}")
+        NEGATIVE_CACHE.put('quant', self.stock_code, 'failed')
+        return {}
+
+    def finish(self, source, data, deadline=None):
+        """수집 결과 정제 후 캐시에 병합 저장 (저장소 I/O). 시한 초과 부분 결과와 finviz 오류 행은 저장하지 않습니다."""
+        # 미리 받은 그룹은 그 값으로 채움 (일괄 자료는 종목별 조회와 항목이 다를 수 있어 캐시에는 저장하지 않음)
+        data.update(_preloaded_fields(self.preloaded))
+        ordered_data = _build_ordered_data(data, self.stock_code, self.stock_name, self.url)
+
+        if deadline is not None and deadline.expired():
+            print(f"[DEBUG] 처리 시한 초과 - {self.stock_name} 부분 결과를 반환합니다.")
+            return self.project({**self.cached_result, **ordered_data})
+        if data.get('종목명') == 'Error':
+            return self.project(ordered_data)
+        merged = _save_cached_groups(self.cache_manager, self.stock_code, self.cached_result, self.cached_groups,
+                                     ordered_data, self.fetched_groups(source))
+        # 수집에 성공했으므로 이전 실패 기록은 지움
+        NEGATIVE_CACHE.forget('quant', self.stock_code)
+        return self.project(merged)
+
+@singleflight('record', 'date', 'fields', 'preloaded', 'allow_stale')
+def fetch_stock_info_quant_by_record(record, date=None, fields=None, preloaded=None, deadline=None, allow_stale=False):
+    """
+    이미 검색된 종목 레코드(search_stock_code 결과 항목)로 퀀트 정보를 조회합니다.
+    자동완성 검색을 다시 호출하지 않고 바로 캐시 확인과 데이터 수집을 진행합니다.
+    fields로 필요한 그룹(quote/valuation/consensus/finance/returns)만 지정하면 그 그룹에 필요한 호출만 수행합니다.
+    preloaded={그룹: 필드}로 미리 받은 값(시장 목록 시세, KRX 일괄 지표 등)을 넘기면 그 그룹은 호출 없이 그 값을 사용합니다.
+    deadline이 지나면 그때까지 받은 항목만 채운 부분 결과를 반환하며, 부분 결과는 캐시에 저장하지 않습니다.
+    allow_stale=True면 만료 직후(최대 허용 지연 안)의 캐시를 바로 반환하고 백그라운드에서 갱신합니다. (봇 대화형 조회용)
+    """
+    lookup = _QuantLookup(record, fields, preloaded)
+
+    # 1. 캐시 확인 (요청한 그룹이 모두 캐시에 있으면 그대로 반환)
+    lookup.load()
+    cached = lookup.cached_response(date, allow_stale)
+    if cached is not None:
+        return cached
+
+    # 2. 데이터 수집 (국내/해외 분기, 국내는 캐시에 없는 그룹만 조회)
+    try:
+        source = lookup.source()
+        if source == 'domestic':
+            data = fetch_domestic_stock_info(lookup.stock_code, lookup.reutersCode, date, fields=lookup.missing_groups,
+                                             preloaded=lookup.preloaded, deadline=deadline)
+        elif source == 'naver_world':
+            data = fetch_worldstock_info_NAVER(DEFAULT_HEADERS, lookup.stock_code, lookup.reutersCode, deadline=deadline)
+        else:
+            # finvizfinance는 요청 단위 타임아웃을 받지 않으므로 시작 전에만 시한을 확인
+            if deadline is not None:
+                deadline.check()
+            data = fetch_worldstock_info(lookup.stock_code)
+    except Exception as e:
+        return lookup.failed(e)
+
+    # 3. 데이터 정제, 캐시 병합 저장 및 반환
+    return lookup.finish(source, data, deadline)
+
+@singleflight('stock_code', 'stock_name', 'url', 'reutersCode', 'date', 'fields', 'allow_stale')
+def fetch_stock_info_quant_API(stock_code=None, stock_name=None, url=None, reutersCode=None, date=None, fields=None, deadline=None, allow_stale=False):
+    # 종목 정보 기본 조회 후 레코드 기반 조회로 위임 (같은 deadline을 넘겨 남은 시간만 사용)
+    results = search_stock_code(_select_search_target(stock_code, stock_name, url, reutersCode), deadline=deadline)
+    if not results:
+        return {}
+    return fetch_stock_info_quant_by_record(results[0], date, fields, deadline=deadline, allow_stale=allow_stale)
+
+@singleflight('record', 'date', 'fields', 'preloaded', 'allow_stale')
+async def fetch_stock_info_quant_by_record_async(record, date=None, fields=None, preloaded=None, hedge=False, deadline=None, allow_stale=False):
+    """
+    fetch_stock_info_quant_by_record의 비동기 버전 (봇 이벤트 루프를 막지 않음).
+    hedge=True면 네이버 호출에 헤지 요청을 사용합니다. (대화형 단건 조회 전용, 배치 조회는 사용하지 않음)
+    deadline/allow_stale 처리는 동기 버전과 같습니다.
+    """
+    lookup = _QuantLookup(record, fields, preloaded)
+
+    # 1. 캐시 확인 (키 잠금/SQLite 대기가 이벤트 루프를 막지 않도록 저장소 I/O는 스레드에서 실행)
+    await asyncio.to_thread(lookup.load)
+    cached = lookup.cached_response(date, allow_stale)
+    if cached is not None:
+        return cached
+
+    # 2. 데이터 수집 (국내/해외 분기)
+    try:
+        source = lookup.source()
+        if source == 'domestic':
+            data = await fetch_domestic_stock_info_async(lookup.stock_code, lookup.reutersCode, date, fields=lookup.missing_groups,
+                                                         preloaded=lookup.preloaded, hedge=hedge, deadline=deadline)
+        elif source == 'naver_world':
+            data = await fetch_worldstock_info_NAVER_async(lookup.stock_code, lookup.reutersCode, hedge=hedge, deadline=deadline)
+        else:
+            # finvizfinance는 동기 라이브러리이므로 스레드에서 실행 (남은 시간까지만 대기)
+            try:
+                data = await asyncio.wait_for(asyncio.to_thread(fetch_worldstock_info, lookup.stock_code), remaining_or_none(deadline))
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"Deadline exceeded while fetching {lookup.stock_code} from finviz")
+    except Exception as e:
+        return await asyncio.to_thread(lookup.failed, e)
+
+    # 3. 데이터 정제, 캐시 병합 저장 및 반환 (저장소 I/O는 스레드에서 실행)
+    return await asyncio.to_thread(lookup.finish, source, data, deadline)
+
+@singleflight('stock_code', 'stock_name', 'url', 'reutersCode', 'date', 'fields', 'allow_stale')
+async def fetch_stock_info_quant_API_async(stock_code=None, stock_name=None, url=None, reutersCode=None, date=None, fields=None, hedge=False, deadline=None, allow_stale=False):
+    """
+    fetch_stock_info_quant_API의 비동기 버전.
+    공용 httpx.AsyncClient를 사용하므로 봇 이벤트 루프를 막지 않습니다.
+    """
+    results = await search_stock_code_async(_select_search_target(stock_code, stock_name, url, reutersCode), hedge=hedge, deadline=deadline)
+    if not results:
+        return {}
+    return await fetch_stock_info_quant_by_record_async(results[0], date, fields, hedge=hedge, deadline=deadline, allow_stale=allow_stale)
+
+def _unique_codes(codes):
+    """
+    입력 순서를 유지하면서 중복/빈 종목코드를 제거합니다.
+    검색이 끝난 레코드(dict)는 레코드의 code를 키로 사용하며 {키: 레코드} 매핑을 함께 반환합니다.
+    """
+    unique = []
+    records = {}
+    for item in codes:
+        if isinstance(item, dict):
+            code = str(item.get('code') or '').strip()
+        else:
+            code = str(item).strip() if item is not None else ''
+        if not code or code in records:
+            continue
+        records[code] = item if isinstance(item, dict) else None
+        unique.append(code)
+    return unique, records
+
+def _build_quant_frame(codes, results, failures, groups):
+    """
+    배치 조회 결과를 입력 순서대로 정렬한 DataFrame으로 만듭니다.
+    index는 요청한 코드('요청코드'), 컬럼은 선택한 그룹만, 숫자 컬럼은 float(NaN = N/A)로 변환하고
+    실패한 코드는 df.attrs['failures'] = {코드: 사유} 에 담습니다.
+    """
+    rows = [results[code] for code in codes if code in results]
+    index = [code for code in codes if code in results]
+    columns = _project_columns(groups)
+    for row in rows:
+        columns.extend(key for key in row if key not in columns)
+
+    df = pd.DataFrame(rows, index=pd.Index(index, name='요청코드'), columns=columns)
+    for key in NUMERIC_KEYS:
+        if key in df.columns:
+            df[key] = pd.to_numeric(df[key], errors='coerce')
+    df.attrs['failures'] = {code: failures[code] for code in codes if code in failures}
+    return df
+
+def _empty_result_reason(deadline):
+    """빈 조회 결과의 실패 사유 (시한이 지난 뒤라면 시한 초과로 기록)."""
+    return DEADLINE_FAILURE if deadline is not None and deadline.expired() else '조회 결과 없음'
+
+def _record_batch_result(code, data, error, deadline, results, failures):
+    """배치의 종목 하나의 조회 결과(또는 예외)를 results/failures에 기록합니다."""
+    if error is not None:
+        failures[code] = DEADLINE_FAILURE if isinstance(error, DeadlineExceeded) else str(error)
+    elif data:
+        results[code] = data
+    else:
+        failures[code] = _empty_result_reason(deadline)
+
+def _finish_batch(codes, results, failures, groups):
+    """시한까지 끝나지 않은 종목을 DEADLINE_FAILURE로 기록하고 결과 DataFrame을 만듭니다."""
+    for code in codes:
+        if code not in results and code not in failures:
+            failures[code] = DEADLINE_FAILURE
+    if failures:
+        print(f"[DEBUG] 퀀트 배치 조회 실패 {len(failures)}/{len(codes)}건: {list(failures)[:10]}")
+    return _build_quant_frame(codes, results, failures, groups)
+
+def fetch_stock_info_quant_batch(codes, concurrency=QUANT_BATCH_CONCURRENCY, date=None, fields=None, preloaded=None, deadline=None):
+    """
+    여러 종목의 퀀트 정보를 한 번에 조회해 DataFrame으로 반환합니다.
+    codes에는 종목코드/종목명 또는 search_stock_code 결과 레코드를 섞어 넘길 수 있으며 레코드는 검색 없이 바로 조회합니다.
+    fields로 필요한 그룹만 지정할 수 있으며(fetch_stock_info_quant_API와 동일) 컬럼도 그 그룹으로 제한됩니다.
+    preloaded={코드: {그룹: 필드}}로 시장 목록 시세/KRX 일괄 지표 등을 넘기면 해당 그룹의 종목별 호출을 생략합니다.
+    중복 코드는 한 번만 조회하고, 최대 concurrency개를 동시에 조회하며, 결과는 입력 순서를 유지합니다.
+    실패한 종목은 행에서 빠지고 df.attrs['failures']에 사유와 함께 기록됩니다.
+    deadline이 지나면 그때까지 끝난 종목만으로 결과를 만들고 나머지는 DEADLINE_FAILURE('처리 시한 초과')로 기록합니다.
+    """
+    groups = _normalize_fields(fields)
+    codes, records = _unique_codes(codes)
+    results, failures = {}, {}
+
+    preloaded = preloaded or {}
+
+    def fetch_one(code):
+        record = records[code]
+        if not record:
+            search_results = search_stock_code(code, deadline=deadline)
+            if not search_results:
+                return {}
+            record = search_results[0]
+        return fetch_stock_info_quant_by_record(record, date=date, fields=groups, preloaded=preloaded.get(code), deadline=deadline)
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, concurrency))
+    future_map = {executor.submit(fetch_one, code): code for code in codes}
+    try:
+        for future in concurrent.futures.as_completed(future_map, timeout=remaining_or_none(deadline)):
+            error = future.exception()
+            _record_batch_result(future_map[future], None if error else future.result(), error, deadline, results, failures)
+    except concurrent.futures.TimeoutError:
+        pass
+    finally:
+        # 시한 초과 시 대기 중인 조회는 취소하고, 실행 중인 조회는 deadline에 따라 곧 끝나므로 기다리지 않음
+        executor.shutdown(wait=deadline is None, cancel_futures=True)
+    return _finish_batch(codes, results, failures, groups)
+
+async def fetch_stock_info_quant_batch_async(codes, concurrency=QUANT_BATCH_CONCURRENCY, date=None, fields=None, preloaded=None, deadline=None):
+    """fetch_stock_info_quant_batch의 비동기 버전 (Semaphore로 동시 실행 수 제한, deadline 처리도 동일)"""
+    groups = _normalize_fields(fields)
+    codes, records = _unique_codes(codes)
+    results, failures = {}, {}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    preloaded = preloaded or {}
+
+    async def fetch_one(code):
+        data, error = {}, None
+        async with semaphore:
+            try:
+                record = records[code]
+                if not record:
+                    search_results = await search_stock_code_async(code, deadline=deadline)
+                    record = search_results[0] if search_results else None
+                if record:
+                    data = await fetch_stock_info_quant_by_record_async(record, date=date, fields=groups, preloaded=preloaded.get(code), deadline=deadline)
+            except Exception as e:
+                error = e
+        _record_batch_result(code, data, error, deadline, results, failures)
+
+    await gather_until(deadline, *(fetch_one(code) for code in codes))
+    return _finish_batch(codes, results, failures, groups)
+
+def _parse_basic(res_basic):
+    """Basic 정보 (종목명, 시장구분, 현재가 등)"""
+    return {
         '종목명': res_basic.get('stockName'),
         '시장구분': res_basic.get('stockExchangeType', {}).get('nameEng'),
         '현재가': res_basic.get('closePrice'),
         '전일비': res_basic.get('compareToPreviousClosePrice'),
         '등락률': res_basic.get('fluctuationsRatio')
-    })
-    
-    # Integration 정보 (PER, PBR, 업종 등)
-    res_integ = requests.get(integ_url, headers=DEFAULT_HEADERS).json()
+    }
+
+def _parse_integration(res_integ):
+    """Integration 정보 (PER, PBR 등). 업종명은 industryCode로 별도 변환합니다."""
     total_infos = {info['key']: info['value'] for info in res_integ.get('totalInfos', [])}
-    data.update({
+    return {
         'PER': total_infos.get('PER', 'N/A').replace('배', ''),
         'fwdPER': total_infos.get('추정PER', 'N/A').replace('배', ''),
         'PBR': total_infos.get('PBR', 'N/A').replace('배', ''),
         '배당수익률': total_infos.get('배당수익률', 'N/A').replace('%', ''),
-        '업종': get_industry_name(res_integ.get('industryCode', ''))
-    })
-    
-    # 재무 정보 (ROE, 예상 배당)
-    res_fin = requests.get(finance_url, headers=DEFAULT_HEADERS).json()
+    }
+
+def _parse_finance(res_fin, current_price):
+    """재무 정보 (ROE, 예상 배당). 예상배당수익률 계산을 위해 현재가가 필요합니다."""
+    data = {}
     if res_fin.get('financeInfo'):
         current_year = str(datetime.now().year)
         row_list = res_fin['financeInfo'].get('rowList', [])
@@ -225,33 +736,128 @@ def fetch_domestic_stock_info(stock_code, reutersCode, date=None):
 
         data['ROE'] = get_fin_val('ROE')
         est_div = safe_int(get_fin_val('주당배당금'))
-        curr_price = safe_int(data['현재가'])
+        curr_price = safe_int(current_price)
         if est_div != 'N/A' and curr_price != 'N/A' and curr_price > 0:
             data['예상배당수익률'] = round(est_div / curr_price * 100, 2)
         else:
             data['예상배당수익률'] = 'N/A'
+    return data
 
-    # 기간 수익률 추가
-    yield_data = stock_fetch_yield_by_period(stock_code, date)
-    data.update(yield_data)
-    
+def _merge_domestic_stock_info(res_basic, res_integ, industry_name, res_fin, yield_data, preloaded=None):
+    """
+    동시에 받아온 basic / integration / finance / 기간수익률 결과를 하나의 data로 병합합니다. (호출하지 않은 항목은 None)
+    preloaded에 있는 그룹은 호출 결과 대신 미리 받은 값을 사용합니다.
+    """
+    data = {}
+    if res_basic is not None:
+        data.update(_parse_basic(res_basic))
+    if res_integ is not None:
+        data.update(_parse_integration(res_integ))
+        if industry_name is not None:
+            data['업종'] = industry_name
+    # 컨센서스만 받으려고 integration을 호출해도 미리 받은 밸류에이션 값이 우선
+    data.update(_preloaded_fields(preloaded))
+    # 예상배당수익률은 basic의 현재가가 필요하므로 병합 단계에서 계산
+    if res_fin is not None:
+        data.update(_parse_finance(res_fin, data.get('현재가')))
+    if yield_data is not None:
+        data.update(yield_data)
     return data
 
-def fetch_worldstock_info_NAVER(headers, stock_code, reutersCode):
-    api_url = NAVER_REUTERS_BASIC_URL.format(reutersCode=reutersCode)
-    print('='*5 , 'fetch_worldstock_info', '='*5 )
-    print(api_url)
+async def _skip_call():
+    return None
+
+def _domestic_call_plan(stock_code, fields, preloaded):
+    """
+    국내 조회에 필요한 호출 목록 (동기/비동기 버전 공용). 호출하지 않는 항목은 None/False.
+    {'basic': url, 'integration': url, 'finance': url, 'returns': bool, 'industry': bool}
+    """
+    groups = [group for group in _domestic_fetch_groups(_normalize_fields(fields)) if group not in (preloaded or {})]
+    return {
+        'basic': NAVER_STOCK_BASIC_URL.format(stock_code=stock_code) if 'quote' in groups else None,
+        'integration': NAVER_STOCK_INTEGRATION_URL.format(stock_code=stock_code) if {'valuation', 'consensus'} & set(groups) else None,
+        'finance': NAVER_STOCK_FINANCE_URL.format(stock_code=stock_code) if 'finance' in groups else None,
+        'returns': 'returns' in groups,
+        # 업종명은 valuation을 조회할 때만 industryCode로 변환 (컨센서스만 필요하면 생략)
+        'industry': 'valuation' in groups,
+    }
+
+def fetch_domestic_stock_info(stock_code, reutersCode, date=None, fields=None, preloaded=None, deadline=None):
+    """
+    국내 주식 상세 정보 조회 (API 기반). 서로 의존하지 않는 호출을 동시에 수행합니다.
+    fields에 없는 그룹의 호출은 건너뜁니다. (quote: basic, valuation/consensus: integration, finance: basic+finance, returns: 차트)
+    preloaded({그룹: 필드})에 있는 그룹의 호출은 생략합니다. (미리 받은 quote가 있으면 basic 호출 없음)
+    deadline까지 끝나지 않은 호출은 결과에서 빠집니다. (해당 항목은 N/A)
+    """
+    plan = _domestic_call_plan(stock_code, fields, preloaded)
+
+    def fetch_json(url):
+        return http_get(url, deadline=deadline).json()
+
+    def submit(needed, fn, *args, **kwargs):
+        return _DOMESTIC_EXECUTOR.submit(fn, *args, **kwargs) if needed else None
+
+    def result(future):
+        if not future:
+            return None
+        try:
+            return future.result(timeout=remaining_or_none(deadline))
+        except (concurrent.futures.TimeoutError, DeadlineExceeded):
+            return None
+        except Exception:
+            if deadline is not None and deadline.expired():
+                return None
+            raise
+
+    basic_future = submit(plan['basic'], fetch_json, plan['basic'])  # Basic 정보
+    integ_future = submit(plan['integration'], fetch_json, plan['integration'])  # Integration 정보 (PER, 추정PER, PBR 등)
+    fin_future = submit(plan['finance'], fetch_json, plan['finance'])  # 재무 정보 (ROE, 예상 배당)
+    yield_future = submit(plan['returns'], stock_fetch_yield_by_period, stock_code, date, deadline=deadline)  # 기간 수익률
     try:
-        api_response = requests.get(api_url, headers=headers)
-        if api_response.status_code != 200:
-            raise Exception(f"Failed to fetch API data: Status code {api_response.status_code}")
-    except Exception as e:
-        print(f"Error fetching API data: {e}")
-        return {}
-    
-    stock_data = api_response.json()
+        res_integ = result(integ_future)
+        industry_name = None
+        if res_integ is not None and plan['industry']:
+            try:
+                industry_name = get_industry_name(res_integ.get('industryCode', ''), deadline=deadline)
+            except DeadlineExceeded:
+                pass
+        return _merge_domestic_stock_info(result(basic_future), res_integ, industry_name, result(fin_future), result(yield_future), preloaded)
+    finally:
+        # 시한 초과/실패로 결과를 쓰지 않는 호출 중 아직 시작하지 않은 것은 취소 (실행 중인 호출은 deadline에 따라 곧 끝나므로 기다리지 않음)
+        for future in (basic_future, integ_future, fin_future, yield_future):
+            if future:
+                future.cancel()
+
+async def fetch_domestic_stock_info_async(stock_code, reutersCode, date=None, fields=None, preloaded=None, hedge=False, deadline=None):
+    """
+    국내 주식 상세 정보 조회 (API 기반, 비동기). fields에 필요한 호출만 동시에 수행합니다.
+    hedge=True면 basic/integration/finance/차트 호출이 느릴 때 헤지 요청을 보냅니다.
+    deadline까지 끝나지 않은 호출은 취소하고 결과에서 뺍니다. (해당 항목은 N/A)
+    """
+    plan = _domestic_call_plan(stock_code, fields, preloaded)
+
+    async def fetch_json(url):
+        if not url:
+            return None
+        return (await http_get_async(url, hedge=hedge, deadline=deadline)).json()
 
-    data = {
+    res_basic, res_integ, res_fin, yield_data = await gather_until(
+        deadline,
+        fetch_json(plan['basic']),
+        fetch_json(plan['integration']),
+        fetch_json(plan['finance']),
+        stock_fetch_yield_by_period_async(stock_code, date, hedge=hedge, deadline=deadline) if plan['returns'] else _skip_call(),
+    )
+    industry_name = None
+    if res_integ is not None and plan['industry']:
+        try:
+            industry_name = await get_industry_name_async(res_integ.get('industryCode', ''), deadline=deadline)
+        except DeadlineExceeded:
+            pass
+    return _merge_domestic_stock_info(res_basic, res_integ, industry_name, res_fin, yield_data, preloaded)
+
+def _parse_worldstock_NAVER(stock_data):
+    return {
         '종목명': stock_data.get('stockName', 'N/A'),
         '시장구분': stock_data.get('stockExchangeName', 'N/A'),
         '현재가': stock_data.get('closePrice', 'N/A'),  # 현재가는 closePrice
@@ -262,7 +868,34 @@ def fetch_worldstock_info_NAVER(headers, stock_code, reutersCode):
         'reutersCode': stock_data.get('reutersCode', 'N/A')  # 네이버 고유 라우트코드
     }
 
-    return data
+def fetch_worldstock_info_NAVER(headers, stock_code, reutersCode, deadline=None):
+    api_url = NAVER_REUTERS_BASIC_URL.format(reutersCode=reutersCode)
+    print('='*5 , 'fetch_worldstock_info', '='*5 )
+    print(api_url)
+    try:
+        api_response = http_get(api_url, headers=headers, deadline=deadline)
+        if api_response.status_code != 200:
+            raise Exception(f"Failed to fetch API data: Status code {api_response.status_code}")
+    except Exception as e:
+        print(f"Error fetching API data: {e}")
+        return {}
+    
+    return _parse_worldstock_NAVER(api_response.json())
+
+async def fetch_worldstock_info_NAVER_async(stock_code, reutersCode, hedge=False, deadline=None):
+    """fetch_worldstock_info_NAVER의 비동기 버전 (공용 AsyncClient 사용)"""
+    api_url = NAVER_REUTERS_BASIC_URL.format(reutersCode=reutersCode)
+    print('='*5 , 'fetch_worldstock_info', '='*5 )
+    print(api_url)
+    try:
+        api_response = await http_get_async(api_url, hedge=hedge, deadline=deadline)
+        if api_response.status_code != 200:
+            raise Exception(f"Failed to fetch API data: Status code {api_response.status_code}")
+    except Exception as e:
+        print(f"Error fetching API data: {e}")
+        return {}
+    
+    return _parse_worldstock_NAVER(api_response.json())
 
 
 def fetch_stock_info_quant(stock_code):
@@ -286,11 +919,10 @@ def main():
                 print(f"\n업종명: {args.upjong_name} - 퀀트 정보 수집 중...")
                 stock_info = fetch_stock_info_in_upjong(링크)
                 if stock_info:
-                    all_quant_data = [fetch_stock_info_quant_API(stock_code=link.split('=')[-1]) for _, _, _, _, link in stock_info]
-                    all_quant_data = [d for d in all_quant_data if d]
+                    df = fetch_stock_info_quant_batch([link.split('=')[-1] for _, _, _, _, link in stock_info])
                     
                     excel_file_name = f'{args.upjong_name}_quant.xlsx'
-                    pd.DataFrame(all_quant_data).to_excel(excel_file_name, index=False, engine='openpyxl')
+                    df.to_excel(excel_file_name, index=False, na_rep='N/A', engine='openpyxl')
                     print(f'퀀트 정보가 {excel_file_name} 파일에 저장되었습니다.')
             else:
                 stock_info = fetch_stock_info_in_upjong(링크)
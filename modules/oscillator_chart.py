@@ -6,16 +6,37 @@ from pykrx import stock
 from datetime import datetime, timedelta
 import pandas as pd
 import os
+import sys
 import subprocess
 import platform
+import threading
+
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.singleflight_util import singleflight
 
 CHART_DIR = "chart/"
+# pyplot은 전역 상태를 쓰므로 여러 스레드에서 차트를 그릴 때 렌더링 구간만 직렬화
+_RENDER_LOCK = threading.Lock()
 
 # 변환 및 반올림 함수
 def convert_and_round(value):
     return round(value / 1e9, 3)  # 10억 단위로 변환 및 반올림
 
-def draw_chart(stock_code, stock_name):
+def _deadline_expired(deadline, stock_name):
+    """명령 처리 시한이 지났으면 로그를 남기고 True를 반환합니다."""
+    if deadline is not None and deadline.expired():
+        print(f"[ERROR] 처리 시한 초과로 {stock_name} 차트 생성을 중단합니다.")
+        return True
+    return False
+
+@singleflight('stock_code', 'stock_name')
+def draw_chart(stock_code, stock_name, deadline=None):
+    """
+    수급 오실레이터 차트를 그려 파일 경로를 반환합니다. 실패 시 None.
+    deadline(utils.deadline_util.Deadline)이 지나면 다음 pykrx 조회를 시작하지 않고 None을 반환합니다.
+    같은 종목 차트를 동시에 요청하면 먼저 시작한 생성 결과를 함께 받습니다.
+    """
     if not os.path.exists(CHART_DIR):
         os.makedirs(CHART_DIR)
     
@@ -35,6 +56,9 @@ def draw_chart(stock_code, stock_name):
     
     print(f"[DEBUG] Drawing chart for {stock_name} ({stock_code}) from {start_date_krx} to {end_date_krx}")
     
+    if _deadline_expired(deadline, stock_name):
+        return None
+
     try:
         trading_value = stock.get_market_trading_value_by_date(start_date_krx, end_date_krx, stock_code, on='순매수')
         
@@ -70,6 +94,8 @@ def draw_chart(stock_code, stock_name):
     })
     data = data.dropna()
 
+    if _deadline_expired(deadline, stock_name):
+        return None
     market_cap = stock.get_market_cap_by_date(start_date, end_date, stock_code)
     market_cap['시가총액'] = (market_cap['시가총액'] / 10**9).round(2)  # 10억 단위로 변환 및 반올림
 
@@ -117,37 +143,38 @@ def draw_chart(stock_code, stock_name):
     print(f"Data saved as: {csv_filename}")
 
     # Plotting
-    fig, ax1 = plt.subplots(figsize=(10, 8))
+    with _RENDER_LOCK:
+        fig, ax1 = plt.subplots(figsize=(10, 8))
     
-    # Market Cap Oscillator
-    ax1.set_xlabel('날짜')
-    ax1.set_ylabel('시가총액 (억원)', color='tab:blue')
-    ax1.plot(data.index, data['시가총액 오실레이터'], label=f'{stock_name} 시가총액 오실레이터', color='tab:blue')
-    ax1.tick_params(axis='y', labelcolor='tab:blue')
-    ax1.axhline(0, color='gray', linestyle='--')  # Baseline
-    ax1.set_ylim(data['시가총액 오실레이터'].min() , data['시가총액 오실레이터'].max() )
-
-    # Supply-Demand Oscillator
-    ax2 = ax1.twinx()
-    ax2.set_ylabel('수급 오실레이터 (%)', color='tab:red')
-    ax2.plot(data.index, data['수급오실레이터'], label=f'{stock_name} 수급 오실레이터', color='tab:red')
-    ax2.tick_params(axis='y', labelcolor='tab:red')
-    ax2.axhline(0, color='gray', linestyle='--')  # Baseline
-    ax2.set_ylim(data['수급오실레이터'].min() , data['수급오실레이터'].max() )
-
-    # X-axis formatting
-    ax1.xaxis.set_major_locator(mdates.WeekdayLocator(interval=1))
-    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-    fig.autofmt_xdate()
-
-    plt.title(f'{stock_name} 시가총액 오실레이터과 수급 오실레이터(순매수금액기준)', fontsize=24, pad=40)
-    fig.tight_layout(rect=[0, 0, 1, 0.95])
-
-    # Save chart
-    last_date = data.index[-1].strftime('%Y%m%d')
-    chart_filename = os.path.join(CHART_DIR, f'{stock_name}_{stock_code}_{last_date}_chart.png')
-    fig.savefig(chart_filename, format='png', bbox_inches='tight')
-    plt.close(fig)
+        # Market Cap Oscillator
+        ax1.set_xlabel('날짜')
+        ax1.set_ylabel('시가총액 (억원)', color='tab:blue')
+        ax1.plot(data.index, data['시가총액 오실레이터'], label=f'{stock_name} 시가총액 오실레이터', color='tab:blue')
+        ax1.tick_params(axis='y', labelcolor='tab:blue')
+        ax1.axhline(0, color='gray', linestyle='--')  # Baseline
+        ax1.set_ylim(data['시가총액 오실레이터'].min() , data['시가총액 오실레이터'].max() )
+
+        # Supply-Demand Oscillator
+        ax2 = ax1.twinx()
+        ax2.set_ylabel('수급 오실레이터 (%)', color='tab:red')
+        ax2.plot(data.index, data['수급오실레이터'], label=f'{stock_name} 수급 오실레이터', color='tab:red')
+        ax2.tick_params(axis='y', labelcolor='tab:red')
+        ax2.axhline(0, color='gray', linestyle='--')  # Baseline
+        ax2.set_ylim(data['수급오실레이터'].min() , data['수급오실레이터'].max() )
+
+        # X-axis formatting
+        ax1.xaxis.set_major_locator(mdates.WeekdayLocator(interval=1))
+        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        fig.autofmt_xdate()
+
+        plt.title(f'{stock_name} 시가총액 오실레이터과 수급 오실레이터(순매수금액기준)', fontsize=24, pad=40)
+        fig.tight_layout(rect=[0, 0, 1, 0.95])
+
+        # Save chart
+        last_date = data.index[-1].strftime('%Y%m%d')
+        chart_filename = os.path.join(CHART_DIR, f'{stock_name}_{stock_code}_{last_date}_chart.png')
+        fig.savefig(chart_filename, format='png', bbox_inches='tight')
+        plt.close(fig)
     print(f"Chart saved as: {chart_filename}")
 
     return chart_filename
@@ -16,15 +16,27 @@ def run_task(command):
     else:
         print(f"[{time.ctime()}] 작업 실패 (에러 코드: {result.returncode})")
 
-# 15:40: 비동기 데이터 수집
-schedule.every().day.at("15:40").do(run_task, "python run/fetch_kr_stock_quant_async.py")
+# 15:40: 국내 전 종목 캐시 예열 (16:00 엑셀 생성용)
+schedule.every().day.at("15:40").do(run_task, "python run/warm_quant_cache.py")
+
+# 16:35: 장 마감 데이터 확정(16:30) 후 국내 재예열 및 전 종목 스냅샷 재게시 (장 마감 후 봇 조회용)
+schedule.every().day.at("16:35").do(run_task, "python run/warm_quant_cache.py --deadline 1800 --publish_snapshot")
+
+# 07:00: 미국 장 마감 후 해외 시가총액 상위 종목 예열
+schedule.every().day.at("07:00").do(run_task, "python run/warm_quant_cache.py --market NYSE --market NASDAQ --market AMEX --deadline 1800")
 
 # 16:00: 엑셀 생성 및 텔레그램 전송
 schedule.every().day.at("16:00").do(run_task, "python make_kr_excel_quant.py")
 
+# 매시 30분: 캐시 정리 (크기/보관기간 상한, 저장소 압축, 통계)
+schedule.every().hour.at(":30").do(run_task, "python run/cache_maintenance.py")
+
 print("📅 [Reporter Worker] 스케줄러가 시작되었습니다.")
-print("🕒 15:40 KST: 데이터 수집")
+print("🕒 07:00 KST: 해외 캐시 예열")
+print("🕒 15:40 KST: 국내 캐시 예열")
 print("🕒 16:00 KST: 엑셀 생성 및 전송")
+print("🕒 16:35 KST: 국내 캐시 재예열 (마감 후)")
+print("🕒 매시 30분: 캐시 정리")
 
 while True:
     schedule.run_pending()
@@ -0,0 +1,25 @@
+import os
+import sys
+import argparse
+
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from models.CacheMaintenance import (
+    run_maintenance, cache_stats, CACHE_MAX_BYTES, CACHE_MAX_AGE_DAYS, CACHE_EVICTION_POLICY,
+)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='캐시 디렉터리를 크기/보관기간 상한에 맞게 정리하고 통계를 출력합니다.')
+    parser.add_argument('--cache_dir', default='cache', help='캐시 디렉터리')
+    parser.add_argument('--max_bytes', type=int, default=CACHE_MAX_BYTES, help='전체 크기 상한 (바이트)')
+    parser.add_argument('--max_age_days', type=float, default=CACHE_MAX_AGE_DAYS, help='저장 후 보관 기간 (일)')
+    parser.add_argument('--policy', choices=['lru', 'lfu'], default=CACHE_EVICTION_POLICY, help='상한 초과 시 삭제 순서')
+    parser.add_argument('--stats_only', action='store_true', help='정리 없이 통계만 출력')
+    args = parser.parse_args()
+
+    if args.stats_only:
+        for prefix, prefix_stats in cache_stats(args.cache_dir).items():
+            print(f"{prefix}: {prefix_stats}")
+    else:
+        run_maintenance(args.cache_dir, max_bytes=args.max_bytes, max_age_days=args.max_age_days, policy=args.policy)
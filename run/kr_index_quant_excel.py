@@ -1,12 +1,11 @@
 import os
 import sys
 import pandas as pd
-import requests
 from openpyxl import Workbook
 from dotenv import load_dotenv
 from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from app_secrets.endpoints import NAVER_DOMESTIC_STOCK_URL
+from utils.http_util import http_get
 
 # .env 파일 로드
 load_dotenv()
@@ -16,7 +15,7 @@ NAVER_API_KR_INDEX = os.getenv("NAVER_API_KR_INDEX")
 
 # Import the quant API module
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from modules.naver_upjong_quant import fetch_stock_info_quant_API
+from modules.naver_upjong_quant import fetch_stock_info_quant_batch
 
 def fetch_stock_data(market_type, page=1, page_size=60):
     """
@@ -34,7 +33,7 @@ def fetch_stock_data(market_type, page=1, page_size=60):
         "type": "object"
     }
 
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params)
 
     if response.status_code == 200:
         data = response.json()
@@ -76,41 +75,26 @@ def fetch_quant_data_for_all_stocks(stocks):
     Fetch quant data for all stocks in the given list.
 
     :param stocks: List of stock data with "itemCode" and "stockName"
-    :return: List of dictionaries containing quant data
+    :return: DataFrame containing quant data (one row per stock, input order)
     """
-    all_quant_data = []
-
-    for stock in stocks:
-        stock_code = stock["itemCode"]
-        stock_name = stock["stockName"]
-        url = NAVER_DOMESTIC_STOCK_URL.format(stock_code=stock_code)
-
-        quant_data = fetch_stock_info_quant_API(stock_code, url)
-        if quant_data:
-            quant_data["종목코드"] = stock_code
-            quant_data["종목명"] = stock_name
-            all_quant_data.append(quant_data)
-
-    return all_quant_data
+    return fetch_stock_info_quant_batch([stock["itemCode"] for stock in stocks])
 
 def save_quant_data_to_excel(kospi_quant_data, kosdaq_quant_data):
     """
     Save quant data to an Excel file with 'KOSPI' and 'KOSDAQ' sheets.
 
-    :param kospi_quant_data: List of KOSPI quant data
-    :param kosdaq_quant_data: List of KOSDAQ quant data
+    :param kospi_quant_data: DataFrame of KOSPI quant data
+    :param kosdaq_quant_data: DataFrame of KOSDAQ quant data
     """
     today_date = datetime.today().strftime('%y%m%d')
     file_name = f"quant_data_{today_date}.xlsx"
 
     with pd.ExcelWriter(file_name, engine="openpyxl") as writer:
-        if kospi_quant_data:
-            df_kospi = pd.DataFrame(kospi_quant_data)
-            df_kospi.to_excel(writer, sheet_name="KOSPI", index=False)
+        if not kospi_quant_data.empty:
+            kospi_quant_data.to_excel(writer, sheet_name="KOSPI", index=False, na_rep='N/A')
 
-        if kosdaq_quant_data:
-            df_kosdaq = pd.DataFrame(kosdaq_quant_data)
-            df_kosdaq.to_excel(writer, sheet_name="KOSDAQ", index=False)
+        if not kosdaq_quant_data.empty:
+            kosdaq_quant_data.to_excel(writer, sheet_name="KOSDAQ", index=False, na_rep='N/A')
 
     print(f"퀀트 데이터가 {file_name} 파일에 저장되었습니다.")
 
@@ -11,7 +11,7 @@ import argparse
 # 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from modules.naver_upjong_quant import fetch_upjong_list_API, fetch_stock_info_in_upjong, fetch_stock_info_quant_API
+from modules.naver_upjong_quant import fetch_upjong_list_API, fetch_stock_info_in_upjong, fetch_stock_info_quant_batch
 
 # Define the folder path
 EXCEL_FOLDER_PATH = 'excel/'  # Adjust this to your actual folder path if needed
@@ -42,13 +42,8 @@ if SHEET_TYPE == '전체':
     wb.remove(wb.active)  # '전체' 시트에 대해 기본 시트를 제거합니다.
 
 def process_stock_info(stock_info):
-    all_quant_data = []
-    for 종목명, _, _, _, 종목링크 in stock_info:
-        stock_code = 종목링크.split('=')[-1]
-        quant_data = fetch_stock_info_quant_API(stock_code)
-        if quant_data:
-            all_quant_data.append(quant_data)
-    return all_quant_data
+    stock_codes = [종목링크.split('=')[-1] for 종목명, _, _, _, 종목링크 in stock_info]
+    return fetch_stock_info_quant_batch(stock_codes)
 
 def save_to_excel(df, sheet_name):
     # 시트 이름에 따라 새 시트 생성
@@ -57,7 +52,8 @@ def save_to_excel(df, sheet_name):
     else:
         ws = wb.create_sheet(title=sheet_name)
     
-    # 데이터프레임을 시트에 작성
+    # 데이터프레임을 시트에 작성 (숫자 결측값은 N/A로 표기)
+    df = df.astype(object).where(df.notna(), 'N/A')
     for row in dataframe_to_rows(df, index=False, header=True):
         ws.append(row)
 
@@ -86,14 +82,13 @@ if SHEET_TYPE == '업종별':
 
         stock_info = fetch_stock_info_in_upjong(링크)
         if stock_info:
-            all_quant_data = process_stock_info(stock_info)
-            if all_quant_data:
-                df = pd.DataFrame(all_quant_data)
+            df = process_stock_info(stock_info)
+            if not df.empty:
                 save_to_excel(df, 업종명)
 
 elif SHEET_TYPE == '전체':
     # 전체 시트 생성
-    all_quant_data = []
+    all_quant_frames = []
     for 업종명, (등락률, 링크) in upjong_map.items():
         print(f"=================업종명: {업종명}, 등락률: {등락률}=================")
         if 업종명 == '기타':  # ETN & ETF는 건너뛰기
@@ -101,10 +96,10 @@ elif SHEET_TYPE == '전체':
 
         stock_info = fetch_stock_info_in_upjong(링크)
         if stock_info:
-            all_quant_data.extend(process_stock_info(stock_info))
+            all_quant_frames.append(process_stock_info(stock_info))
 
-    if all_quant_data:
-        df = pd.DataFrame(all_quant_data)
+    df = pd.concat(all_quant_frames) if all_quant_frames else pd.DataFrame()
+    if not df.empty:
         save_to_excel(df, '전체')
 
 # 엑셀 파일 저장
@@ -0,0 +1,59 @@
+import os
+import sys
+import argparse
+
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from models.CacheStorage import get_storage, CACHE_PREFIXES, CacheWriteError
+
+# 한 트랜잭션으로 저장하는 항목 수
+MIGRATE_BATCH_SIZE = 500
+
+
+def migrate(cache_dir, prefixes, delete_json=False):
+    """
+    키별 JSON 캐시 파일(cache_dir/{prefix}_{key}_cache.json)을 SQLite 저장소로 한 번에 옮깁니다.
+    저장시각은 파일 수정시각을 그대로 유지하므로 옮긴 뒤에도 캐시 유효성 판단이 같습니다.
+    커밋에 실패한 묶음의 키는 옮긴 것으로 치지 않으며 delete_json이어도 JSON 파일을 지우지 않습니다.
+    """
+    json_storage = get_storage(cache_dir, 'json')
+    sqlite_storage = get_storage(cache_dir, 'sqlite')
+
+    def commit(prefix, batch, migrated_keys):
+        try:
+            sqlite_storage.save_many(prefix, batch)
+        except CacheWriteError as e:
+            print(f"[ERROR] {e} - 이 묶음의 JSON 파일은 그대로 둡니다.")
+            return False
+        migrated_keys.extend(key for key, _, _ in batch)
+        return True
+
+    failed = 0
+    for prefix in prefixes:
+        batch, migrated_keys = [], []
+        for item in json_storage.items(prefix):
+            batch.append(item)
+            if len(batch) >= MIGRATE_BATCH_SIZE:
+                failed += 0 if commit(prefix, batch, migrated_keys) else len(batch)
+                batch = []
+        if batch:
+            failed += 0 if commit(prefix, batch, migrated_keys) else len(batch)
+        print(f"[DEBUG] {prefix}: {len(migrated_keys)}개 캐시를 {sqlite_storage.db_path}로 옮겼습니다.")
+
+        if delete_json:
+            for key in migrated_keys:
+                os.remove(json_storage._path(prefix, key))
+            print(f"[DEBUG] {prefix}: 옮긴 JSON 캐시 파일을 삭제했습니다.")
+    if failed:
+        print(f"[ERROR] {failed}개 캐시를 옮기지 못했습니다. 다시 실행하세요.")
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='JSON 캐시 파일을 SQLite 캐시 저장소로 옮깁니다.')
+    parser.add_argument('--cache_dir', default='cache', help='캐시 디렉터리')
+    parser.add_argument('--prefix', action='append', choices=CACHE_PREFIXES, help='옮길 캐시 접두어 (기본: 전체)')
+    parser.add_argument('--delete_json', action='store_true', help='옮긴 뒤 JSON 파일 삭제')
+    args = parser.parse_args()
+
+    sys.exit(1 if migrate(args.cache_dir, args.prefix or CACHE_PREFIXES, args.delete_json) else 0)
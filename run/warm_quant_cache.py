@@ -0,0 +1,196 @@
+import asyncio
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.naver_upjong_quant import (
+    fetch_upjong_list_API_async, fetch_stock_info_quant_batch_async, fresh_quant_groups, QUANT_FIELD_GROUPS, QUANT_GROUP_POLICIES,
+    QUANT_BATCH_CONCURRENCY, QUANT_SNAPSHOT_NUMERIC_COLUMNS, QUANT_SNAPSHOT_STRING_COLUMNS,
+)
+from modules.naver_market_listing import fetch_market_listing, build_listing_record
+from models.NegativeCache import negative_cache_stats
+from models.QuantSnapshot import publish_snapshot
+from utils.deadline_util import Deadline
+from utils.market_calendar_util import SESSION
+from utils.http_util import aclose_async_client
+from app_secrets.endpoints import (
+    NAVER_KOSPI_MARKET_URL, NAVER_KOSDAQ_MARKET_URL,
+    NAVER_NYSE_MARKET_URL, NAVER_NASDAQ_MARKET_URL, NAVER_AMEX_MARKET_URL,
+)
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+# 시장별 (목록 URL, 종목코드 키, 국가코드)
+WARMUP_MARKETS = {
+    'KOSPI': (NAVER_KOSPI_MARKET_URL, 'itemCode', 'KOR'),
+    'KOSDAQ': (NAVER_KOSDAQ_MARKET_URL, 'itemCode', 'KOR'),
+    'NYSE': (NAVER_NYSE_MARKET_URL, 'symbolCode', 'USA'),
+    'NASDAQ': (NAVER_NASDAQ_MARKET_URL, 'symbolCode', 'USA'),
+    'AMEX': (NAVER_AMEX_MARKET_URL, 'symbolCode', 'USA'),
+}
+# 해외 시장은 종목별 검색/finviz 호출이 필요하므로 시가총액 상위 N개만 예열
+WARMUP_US_TOP_N = int(_env_float('WARMUP_US_TOP_N', 300))
+# 예열 전체 처리 시한(초): 15:40 예열이 16:00 엑셀 생성 전에 끝나도록 기본 18분
+WARMUP_DEADLINE = _env_float('WARMUP_DEADLINE', 1080)
+# 유효성 확인 대상 그룹: 장중 예열(15:40)에서는 시세(SESSION, 수 분 TTL)가 확인 시점에 이미 만료될 수 있으므로
+# 하루/거래일 단위로 유지되는 그룹(밸류에이션/컨센서스/재무/기간수익률)만 확인
+WARMUP_VERIFY_GROUPS = [group for group in QUANT_FIELD_GROUPS if QUANT_GROUP_POLICIES[group] != SESSION]
+# 장 마감 후 스냅샷 재게시: 캐시에서 다시 모으는 처리 시한(초), 국내 대상 중 이 비율 이상 모였을 때만 교체
+WARMUP_SNAPSHOT_DEADLINE = _env_float('WARMUP_SNAPSHOT_DEADLINE', 300)
+WARMUP_SNAPSHOT_MIN_COVERAGE = _env_float('WARMUP_SNAPSHOT_MIN_COVERAGE', 0.9)
+WARMUP_REPORT_PATH = os.getenv('WARMUP_REPORT_PATH', os.path.join('cache', 'warmup_report.json'))
+
+
+def _market_value(stock):
+    try:
+        return float(str(stock.get('marketValue', 0)).replace(',', '').replace('-', '0') or 0)
+    except ValueError:
+        return 0.0
+
+
+def build_universe(markets, us_top_n=WARMUP_US_TOP_N):
+    """
+    시장 목록 API로 예열 대상 전체를 만듭니다.
+    [(종목코드, 조회 대상(레코드 또는 코드), 국가코드)], {제외 사유: 개수}, {종목코드: 시가총액(억)}
+    국내는 ETF/ETN을 포함한 전 종목(스팩 제외)을 목록 레코드로 바로 조회하고, 해외는 시가총액 상위 us_top_n개만 포함합니다.
+    """
+    universe, excluded, market_values = [], Counter(), {}
+    for market in markets:
+        base_url, code_key, nation_code = WARMUP_MARKETS[market]
+        stocks = fetch_market_listing(base_url, market)
+        if nation_code != 'KOR':
+            stocks = sorted(stocks, key=_market_value, reverse=True)
+            excluded['해외 시가총액 상위 외'] += max(0, len(stocks) - us_top_n)
+            stocks = stocks[:us_top_n]
+        for stock in stocks:
+            code, name = stock.get(code_key), stock.get('stockName', '')
+            if not code:
+                continue
+            if '스팩' in name and '호' in name:
+                excluded['스팩'] += 1
+                continue
+            target = build_listing_record(stock, code_key) if nation_code == 'KOR' else None
+            universe.append((code, target or code, nation_code))
+            market_values[code] = _market_value(stock)
+        print(f"[DEBUG] {market} 예열 대상 {len(stocks)}개")
+    return universe, excluded, market_values
+
+
+def _is_fresh(code, nation_code):
+    return fresh_quant_groups(code, nation_code).issuperset(WARMUP_VERIFY_GROUPS)
+
+
+def _write_report(report, path=WARMUP_REPORT_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
+
+
+async def republish_snapshot(universe, market_values, concurrency=QUANT_BATCH_CONCURRENCY):
+    """
+    예열된 캐시로 국내 전 종목 스냅샷을 다시 게시합니다. 16:00 엑셀 생성 때 게시한 스냅샷은 장 마감 데이터 확정(16:30)
+    전 시각으로 게시되어 이후 시세/기간수익률 그룹이 만료로 판단되므로, 확정 후 예열(16:35)에서 다시 게시해
+    장 마감 후 조회도 스냅샷으로 처리되게 합니다. 캐시에서 모은 종목이 WARMUP_SNAPSHOT_MIN_COVERAGE 미만이면
+    기존 스냅샷을 유지합니다. 게시한 종목 수를 반환합니다.
+    """
+    targets = [target for _, target, nation_code in universe if nation_code == 'KOR']
+    if not targets:
+        return 0
+    quant_df = await fetch_stock_info_quant_batch_async(targets, concurrency=concurrency, deadline=Deadline(WARMUP_SNAPSHOT_DEADLINE))
+    coverage = len(quant_df) / len(targets)
+    if coverage < WARMUP_SNAPSHOT_MIN_COVERAGE:
+        print(f"[ERROR] 스냅샷 재게시 생략: 국내 {len(targets)}개 중 {len(quant_df)}개만 수집 ({coverage:.1%})")
+        return 0
+    records = quant_df.to_dict('records')
+    for record in records:
+        record['시가총액(억)'] = market_values.get(record.get('종목코드'))
+    try:
+        return await asyncio.to_thread(
+            publish_snapshot, records, QUANT_SNAPSHOT_NUMERIC_COLUMNS, QUANT_SNAPSHOT_STRING_COLUMNS,
+            target_date=time.strftime('%y%m%d'),
+        )
+    except Exception as e:
+        print(f"[ERROR] 퀀트 스냅샷 게시 실패: {e}")
+        return 0
+
+
+async def warm_up(markets, concurrency=QUANT_BATCH_CONCURRENCY, deadline_seconds=WARMUP_DEADLINE, us_top_n=WARMUP_US_TOP_N, publish=False):
+    """
+    1) 업종(섹터) 목록 캐시 갱신 2) 시장 목록으로 전체 종목 구성 3) 이미 유효한 종목은 건너뛰고 나머지를 배치로 조회
+    (퀀트 캐시의 시세/밸류에이션/재무/기간수익률(일봉 이력) 그룹을 모두 채움) 4) 조회 후 캐시 유효성 재확인
+    (유효성은 시세를 제외한 WARMUP_VERIFY_GROUPS 기준으로 판단) 5) publish이면 국내 전 종목 스냅샷 재게시
+    순으로 실행하고 예열/실패/건너뜀/소요시간 보고서를 반환합니다.
+    """
+    started = time.time()
+    deadline = Deadline(deadline_seconds)
+
+    sector_count = 0
+    if any(WARMUP_MARKETS[market][2] == 'KOR' for market in markets):
+        try:
+            sector_count = len(await fetch_upjong_list_API_async('KOR'))
+        except Exception as e:
+            print(f"[ERROR] 업종 목록 예열 실패: {e}")
+
+    universe, excluded, market_values = await asyncio.to_thread(build_universe, markets, us_top_n)
+    nations = {code: nation_code for code, _, nation_code in universe}
+    already_fresh = {code for code, _, nation_code in universe if _is_fresh(code, nation_code)}
+    targets = [target for code, target, _ in universe if code not in already_fresh]
+    print(f"[DEBUG] 예열 대상 {len(universe)}개 중 이미 유효 {len(already_fresh)}개, 조회 {len(targets)}개")
+
+    quant_df = await fetch_stock_info_quant_batch_async(targets, concurrency=concurrency, deadline=deadline)
+    failures = quant_df.attrs['failures']
+    warmed = list(quant_df.index)
+    # 조회에 성공해도 시한 초과 부분 결과 등은 캐시에 저장되지 않으므로 저장소 기준으로 다시 확인
+    # (해외 종목은 검색 결과의 종목코드가 캐시 키)
+    cache_keys = dict(zip(quant_df.index, quant_df['종목코드'])) if '종목코드' in quant_df else {}
+    unverified = [code for code in warmed if not _is_fresh(cache_keys.get(code, code), nations.get(code, 'KOR'))]
+    covered = len(already_fresh) + len(warmed) - len(unverified)
+    snapshot_rows = await republish_snapshot(universe, market_values, concurrency) if publish else 0
+
+    report = {
+        'markets': list(markets),
+        'universe': len(universe),
+        'warmed': len(warmed),
+        'failed': len(failures),
+        'skipped': {'이미 유효': len(already_fresh), **excluded},
+        'verified': len(warmed) - len(unverified),
+        'unverified': unverified[:50],
+        'coverage': round(covered / max(1, len(universe)), 4),
+        'failure_reasons': Counter(failures.values()).most_common(10),
+        'sectors': sector_count,
+        'snapshot_rows': snapshot_rows,
+        'negative_cache': negative_cache_stats(10),
+        'elapsed': round(time.time() - started, 1),
+        'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    await aclose_async_client()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='시장 전체 종목의 퀀트/업종 캐시를 미리 채우고 커버리지 보고서를 출력합니다.')
+    parser.add_argument('--market', action='append', choices=list(WARMUP_MARKETS), help='예열할 시장 (기본: KOSPI, KOSDAQ)')
+    parser.add_argument('--concurrency', type=int, default=QUANT_BATCH_CONCURRENCY, help='최대 동시 조회 수')
+    parser.add_argument('--deadline', type=float, default=WARMUP_DEADLINE, help='전체 처리 시한 (초)')
+    parser.add_argument('--us_top', type=int, default=WARMUP_US_TOP_N, help='해외 시장별 시가총액 상위 예열 종목 수')
+    parser.add_argument('--publish_snapshot', action='store_true', help='예열 후 국내 전 종목 스냅샷 재게시 (장 마감 데이터 확정 후 실행)')
+    args = parser.parse_args()
+
+    report = asyncio.run(warm_up(args.market or ['KOSPI', 'KOSDAQ'], args.concurrency, args.deadline, args.us_top, args.publish_snapshot))
+    _write_report(report)
+    print(f"[DEBUG] 캐시 예열 완료: 대상 {report['universe']}개, 예열 {report['warmed']}개, 실패 {report['failed']}개, "
+          f"건너뜀 {report['skipped']}, 커버리지 {report['coverage']:.1%}, {report['elapsed']}초")
+    print(json.dumps(report, ensure_ascii=False, indent=4))
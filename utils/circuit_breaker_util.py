@@ -0,0 +1,203 @@
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+# 연속 실패가 이 횟수에 도달하면 회로를 엽니다
+CIRCUIT_FAILURE_THRESHOLD = int(_env_float('CIRCUIT_FAILURE_THRESHOLD', 5))
+# 회로가 열린 뒤 half-open 시험 요청을 허용하기까지의 시간(초)
+CIRCUIT_OPEN_SECONDS = _env_float('CIRCUIT_OPEN_SECONDS', 30.0)
+
+# 재시도 횟수 / 지수 백오프(full jitter) 기준 및 상한(초)
+HTTP_MAX_RETRIES = int(_env_float('HTTP_MAX_RETRIES', 2))
+RETRY_BACKOFF_BASE = _env_float('RETRY_BACKOFF_BASE', 0.2)
+RETRY_BACKOFF_CAP = _env_float('RETRY_BACKOFF_CAP', 2.0)
+# 전역 재시도 예산: 요청 1건당 적립되는 재시도 비율, 초당 기본 적립량, 최대 적립량
+RETRY_BUDGET_RATIO = _env_float('RETRY_BUDGET_RATIO', 0.1)
+RETRY_BUDGET_MIN_PER_SEC = _env_float('RETRY_BUDGET_MIN_PER_SEC', 1.0)
+RETRY_BUDGET_MAX = _env_float('RETRY_BUDGET_MAX', 20.0)
+
+# 재시도/실패로 보는 응답 코드 (429 및 5xx)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+CLOSED, OPEN, HALF_OPEN = 'CLOSED', 'OPEN', 'HALF_OPEN'
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 요청을 보내지 않고 즉시 실패한 경우."""
+
+    def __init__(self, endpoint, retry_in):
+        super().__init__(f"Circuit open for {endpoint} (retry in {retry_in:.1f}s)")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    엔드포인트 하나에 대한 회로 차단기.
+    CLOSED: 정상 호출, 연속 실패가 임계치에 도달하면 OPEN.
+    OPEN: CIRCUIT_OPEN_SECONDS 동안 CircuitOpenError로 즉시 실패.
+    HALF_OPEN: 시험 요청 하나만 통과시켜 성공하면 CLOSED, 실패하면 다시 OPEN.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """호출 전 확인. 호출할 수 없으면 CircuitOpenError를 발생시킵니다."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN:
+                retry_in = self.opened_at + CIRCUIT_OPEN_SECONDS - now
+                if retry_in > 0:
+                    raise CircuitOpenError(self.endpoint, retry_in)
+                self.state = HALF_OPEN
+                print(f"[DEBUG] 회로 half-open: {self.endpoint}")
+            if self.probe_in_flight:
+                raise CircuitOpenError(self.endpoint, 0.0)
+            self.probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"[DEBUG] 회로 닫힘 (복구): {self.endpoint}")
+            self.state = CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probe_in_flight = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= CIRCUIT_FAILURE_THRESHOLD):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                print(f"[ERROR] 회로 열림: {self.endpoint} (연속 실패 {self.failures}회, {CIRCUIT_OPEN_SECONDS:.0f}초간 즉시 실패)")
+
+    def cancel(self):
+        """결과를 기록하지 않고 half-open 시험 요청 자리만 반납합니다. (요청이 취소된 경우)"""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def is_closed(self):
+        with self._lock:
+            return self.state == CLOSED
+
+
+class RetryBudget:
+    """
+    프로세스 전역 재시도 예산. 요청마다 RETRY_BUDGET_RATIO 만큼, 그리고 초당 RETRY_BUDGET_MIN_PER_SEC 만큼 적립되며
+    재시도 1회에 1만큼 소모합니다. 장애 시 모든 요청이 재시도로 부하를 몇 배로 키우는 것을 막습니다.
+    """
+
+    def __init__(self):
+        self.tokens = RETRY_BUDGET_MAX
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(RETRY_BUDGET_MAX, self.tokens + (now - self.last_refill) * RETRY_BUDGET_MIN_PER_SEC)
+        self.last_refill = now
+
+    def record_request(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(RETRY_BUDGET_MAX, self.tokens + RETRY_BUDGET_RATIO)
+
+    def try_spend(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+RETRY_BUDGET = RetryBudget()
+
+# 엔드포인트별 회로 차단기 (프로세스 전역)
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def endpoint_key(url):
+    """
+    URL에서 회로 차단 단위(엔드포인트) 키를 만듭니다.
+    종목코드 등 숫자가 들어간 경로 조각은 '*'로 바꿔 같은 API는 하나의 회로를 공유하게 합니다.
+    예) https://m.stock.naver.com/api/stock/005930/basic -> m.stock.naver.com/api/stock/*/basic
+    """
+    parts = urlsplit(url)
+    path = '/'.join('*' if re.search(r'\d', segment) else segment for segment in parts.path.split('/'))
+    return f"{parts.hostname}{path}"
+
+
+def get_breaker(endpoint):
+    """엔드포인트 키에 해당하는 회로 차단기를 반환합니다. 없으면 생성."""
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(endpoint)
+        if breaker is None:
+            breaker = _BREAKERS[endpoint] = CircuitBreaker(endpoint)
+    return breaker
+
+
+def backoff_delay(attempt, retry_after=None, deadline=None):
+    """
+    attempt(0부터)번째 재시도 전 대기 시간. full jitter 지수 백오프이며 Retry-After가 있으면 그 값을 우선합니다.
+    deadline이 있으면 남은 시간을 넘지 않습니다.
+    """
+    if retry_after:
+        delay = min(retry_after, RETRY_BACKOFF_CAP)
+    else:
+        delay = random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * (2 ** attempt)))
+    return delay if deadline is None else deadline.cap(delay)
+
+
+def can_retry(attempt, retries, breaker, deadline=None):
+    """
+    재시도 가능 여부: 남은 횟수가 있고, 회로가 닫혀 있으며, (deadline이 있으면) 시간이 남아 있고,
+    전역 재시도 예산이 남아 있어야 합니다.
+    """
+    if deadline is not None and deadline.expired():
+        return False
+    return attempt < retries and breaker.is_closed() and RETRY_BUDGET.try_spend()
+
+
+@contextmanager
+def circuit_guard(endpoint):
+    """
+    httpx 공용 클라이언트를 거치지 않는 호출(finviz 등)에 회로 차단기를 적용하는 context manager.
+    회로가 열려 있으면 CircuitOpenError, 블록에서 예외가 나면 실패로 기록합니다.
+    """
+    breaker = get_breaker(endpoint)
+    breaker.before_call()
+    try:
+        yield breaker
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+
+
+def breaker_stats():
+    """엔드포인트별 회로 상태 (로그 출력용)."""
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    return {breaker.endpoint: {'state': breaker.state, 'failures': breaker.failures} for breaker in breakers}
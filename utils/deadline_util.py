@@ -0,0 +1,83 @@
+import asyncio
+import os
+import time
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+# 봇 명령별 전체 처리 시간 상한(초) (환경 변수로 조정 가능)
+STOCK_QUANT_DEADLINE = _env_float('STOCK_QUANT_DEADLINE', 20.0)
+CHART_DEADLINE = _env_float('CHART_DEADLINE', 30.0)
+EXCEL_JOB_DEADLINE = _env_float('EXCEL_JOB_DEADLINE', 300.0)
+
+
+class DeadlineExceeded(Exception):
+    """명령에 주어진 처리 시간이 모두 소진된 경우."""
+
+
+class Deadline:
+    """
+    명령 하나의 처리 시한. 하위 호출에는 같은 Deadline 객체를 넘기고,
+    각 호출은 remaining()으로 남은 시간만큼만 기다립니다.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self):
+        """시한이 지났으면 DeadlineExceeded를 발생시킵니다."""
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline of {self.seconds:.0f}s exceeded")
+
+    def cap(self, seconds):
+        """seconds와 남은 시간 중 작은 값 (seconds가 None이면 남은 시간)."""
+        remaining = self.remaining()
+        return remaining if seconds is None else min(seconds, remaining)
+
+
+def remaining_or_none(deadline):
+    """deadline이 없으면 None(무제한), 있으면 남은 시간."""
+    return None if deadline is None else deadline.remaining()
+
+
+async def gather_until(deadline, *aws):
+    """
+    asyncio.gather처럼 결과를 순서대로 반환하되, deadline이 지나면 끝나지 않은 작업은 취소하고 None으로 채웁니다.
+    시한 초과로 실패한 작업도 None이며, 그 밖의 예외는 그대로 발생시킵니다.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return []
+    done, pending = await asyncio.wait(tasks, timeout=remaining_or_none(deadline))
+    for task in pending:
+        task.cancel()
+    if pending:
+        print(f"[DEBUG] 처리 시한 초과로 {len(pending)}개 호출을 취소합니다.")
+
+    results = []
+    for task in tasks:
+        if task in pending:
+            results.append(None)
+            continue
+        error = task.exception()
+        if error is not None:
+            if isinstance(error, DeadlineExceeded) or (deadline is not None and deadline.expired()):
+                results.append(None)
+                continue
+            for other in pending:
+                other.cancel()
+            raise error
+        results.append(task.result())
+    return results
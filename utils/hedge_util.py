@@ -0,0 +1,116 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+# 엔드포인트별로 보관하는 최근 응답시간 표본 수 / 헤지를 시작하기 위한 최소 표본 수
+HEDGE_SAMPLE_SIZE = int(_env_float('HEDGE_SAMPLE_SIZE', 200))
+HEDGE_MIN_SAMPLES = int(_env_float('HEDGE_MIN_SAMPLES', 20))
+# 헤지 기준 백분위수 (이 시간 안에 응답이 없으면 같은 요청을 한 번 더 보냄)
+HEDGE_PERCENTILE = _env_float('HEDGE_PERCENTILE', 0.9)
+# 헤지 지연 하한(초) - 응답이 아주 빠른 엔드포인트에서 불필요한 헤지를 막음
+HEDGE_MIN_DELAY = _env_float('HEDGE_MIN_DELAY', 0.05)
+# 전체 요청 대비 헤지 요청 비율 상한과 최대 적립량 (상류 부하가 최대 이 비율만큼만 늘어남)
+HEDGE_MAX_RATIO = _env_float('HEDGE_MAX_RATIO', 0.1)
+HEDGE_BUDGET_MAX = _env_float('HEDGE_BUDGET_MAX', 5.0)
+
+
+class LatencyTracker:
+    """엔드포인트별 최근 응답시간을 보관하고 백분위수를 계산합니다."""
+
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=HEDGE_SAMPLE_SIZE)).append(seconds)
+
+    def percentile(self, endpoint, q=HEDGE_PERCENTILE):
+        """표본이 HEDGE_MIN_SAMPLES 미만이면 None."""
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+class HedgeBudget:
+    """요청마다 HEDGE_MAX_RATIO 만큼 적립되고 헤지 1회에 1만큼 소모하는 예산 (헤지 비율 상한)."""
+
+    def __init__(self):
+        self.tokens = 0.0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.tokens = min(HEDGE_BUDGET_MAX, self.tokens + HEDGE_MAX_RATIO)
+
+    def try_spend(self):
+        with self._lock:
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+LATENCY_TRACKER = LatencyTracker()
+HEDGE_BUDGET = HedgeBudget()
+
+
+def hedge_delay(endpoint):
+    """헤지 요청을 보낼 시점(초). 표본이 부족하면 None(헤지하지 않음)."""
+    p = LATENCY_TRACKER.percentile(endpoint)
+    return None if p is None else max(HEDGE_MIN_DELAY, p)
+
+
+async def timed(endpoint, make_request):
+    """요청 코루틴을 실행하고 성공한 경우 응답시간을 엔드포인트 표본에 기록합니다."""
+    start = time.monotonic()
+    result = await make_request()
+    LATENCY_TRACKER.record(endpoint, time.monotonic() - start)
+    return result
+
+
+async def hedged(endpoint, make_request):
+    """
+    make_request(코루틴 함수)를 실행하고, 엔드포인트의 p90 시간 안에 응답이 없으면 같은 요청을 한 번 더 보내
+    먼저 성공한 응답을 반환하고 나머지는 취소합니다. 헤지 예산이 없거나 표본이 부족하면 단일 요청과 같습니다.
+    멱등(GET) 요청에만 사용해야 합니다.
+    """
+    HEDGE_BUDGET.record_request()
+    first = asyncio.ensure_future(timed(endpoint, make_request))
+    delay = hedge_delay(endpoint)
+    if delay is None:
+        return await first
+
+    second = None
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not HEDGE_BUDGET.try_spend():
+            return await first
+
+        print(f"[DEBUG] 헤지 요청: {endpoint} ({delay:.2f}s 초과)")
+        second = asyncio.ensure_future(timed(endpoint, make_request))
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in (first, second):
+            if task is not None and not task.done():
+                task.cancel()
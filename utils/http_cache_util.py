@@ -0,0 +1,264 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import httpx
+
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app_secrets.endpoints import (
+    NAVER_INDUSTRY_URL, NAVER_INDUSTRY_PAGED_URL, NAVER_DIVIDEND_RATE_URL, NAVER_STOCK_FINANCE_URL,
+)
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+# HTTP 응답 캐시 저장 위치 / 서버가 max-age를 주지 않을 때 재검증 없이 로컬 응답을 쓰는 시간(초)
+HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', os.path.join('cache', 'http'))
+HTTP_CACHE_DEFAULT_TTL = _env_float('HTTP_CACHE_DEFAULT_TTL', 60.0)
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', '1') == '1'
+
+# 하루 중 거의 바뀌지 않는 엔드포인트만 캐시 (URL 템플릿의 {..} 자리는 임의 값과 일치)
+HTTP_CACHE_URL_TEMPLATES = [
+    NAVER_INDUSTRY_URL,
+    NAVER_INDUSTRY_PAGED_URL,
+    NAVER_DIVIDEND_RATE_URL,
+    NAVER_STOCK_FINANCE_URL,
+]
+
+# 캐시 응답에 보존하는 헤더 (본문은 전송 인코딩된 그대로 저장하므로 Content-Encoding 포함)
+_STORED_HEADERS = ['content-type', 'content-encoding', 'etag', 'last-modified', 'cache-control']
+
+
+def _template_pattern(template):
+    pattern = re.sub(r'\\\{[^}]*\\\}', '[^/?&]+', re.escape(template))
+    return re.compile(pattern + r'([?&].*)?$')
+
+_CACHEABLE_PATTERNS = [_template_pattern(template) for template in HTTP_CACHE_URL_TEMPLATES]
+
+
+def is_cacheable(request):
+    """캐시 대상 GET 요청인지 확인합니다."""
+    if not HTTP_CACHE_ENABLED or request.method != 'GET':
+        return False
+    url = str(request.url)
+    return any(pattern.match(url) for pattern in _CACHEABLE_PATTERNS)
+
+
+def _parse_cache_control(value):
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"')
+    return directives
+
+
+def _fresh_for(headers):
+    """응답 헤더로 재검증 없이 사용할 시간(초)을 정합니다. no-store면 None(저장하지 않음)."""
+    directives = _parse_cache_control(headers.get('cache-control'))
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+    try:
+        return float(directives['max-age'])
+    except (KeyError, ValueError):
+        return HTTP_CACHE_DEFAULT_TTL
+
+
+class HttpCacheStore:
+    """요청 URL별로 응답 본문(.body)과 메타데이터(.json: 상태/헤더/저장시각/유효시간)를 디스크에 저장합니다."""
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.stats = {'hit': 0, 'miss': 0, 'revalidated': 0, 'stored': 0}
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def load(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def save(self, url, response, body, fresh_for):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'status_code': response.status_code,
+            'headers': {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers},
+            'stored_at': time.time(),
+            'fresh_for': fresh_for,
+        }
+        # 임시 파일에 쓴 뒤 교체해 다른 스레드/프로세스가 쓰다 만 파일을 읽지 않도록 함
+        for path, data, mode in ((body_path, body, 'wb'), (meta_path, json.dumps(meta), 'w')):
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self.count('stored')
+
+    def touch(self, url, meta, headers):
+        """304 재검증 성공 시 저장시각과 유효시간만 갱신합니다."""
+        fresh_for = _fresh_for(headers)
+        meta['stored_at'] = time.time()
+        meta['fresh_for'] = HTTP_CACHE_DEFAULT_TTL if fresh_for is None else fresh_for
+        for name in ('etag', 'last-modified', 'cache-control'):
+            if name in headers:
+                meta['headers'][name] = headers[name]
+        meta_path, _ = self._paths(url)
+        tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+
+HTTP_CACHE = HttpCacheStore()
+
+
+def _is_fresh(meta):
+    return time.time() - meta.get('stored_at', 0) < meta.get('fresh_for', 0)
+
+
+def _conditional_request(request, meta):
+    """저장된 ETag/Last-Modified로 조건부 요청을 만듭니다. 검증자가 없으면 원래 요청 그대로."""
+    headers = dict(request.headers)
+    stored = meta.get('headers', {})
+    if 'etag' in stored:
+        headers['If-None-Match'] = stored['etag']
+    if 'last-modified' in stored:
+        headers['If-Modified-Since'] = stored['last-modified']
+    return httpx.Request(request.method, request.url, headers=headers, extensions=request.extensions)
+
+
+def _cached_response(request, meta, body):
+    return httpx.Response(
+        meta['status_code'],
+        headers=meta.get('headers', {}),
+        stream=httpx.ByteStream(body),
+        request=request,
+        extensions={'from_cache': True},
+    )
+
+
+def _fresh_response(request, response, body):
+    """본문을 이미 읽은 원본 응답을 클라이언트에 돌려줄 새 응답으로 만듭니다."""
+    return httpx.Response(
+        response.status_code,
+        headers=response.headers,
+        stream=httpx.ByteStream(body),
+        request=request,
+        extensions=response.extensions,
+    )
+
+
+def _store_if_cacheable(url, response, body):
+    if response.status_code != 200:
+        return
+    fresh_for = _fresh_for(response.headers)
+    if fresh_for is not None:
+        HTTP_CACHE.save(url, response, body, fresh_for)
+
+
+class CachingTransport(httpx.BaseTransport):
+    """
+    httpx transport 래퍼. 캐시 대상 GET은 유효시간 안이면 디스크 응답을 그대로 반환하고,
+    지난 경우 ETag/Last-Modified로 조건부 요청을 보내 304면 저장된 본문을 재사용합니다.
+    캐시 대상이 아닌 요청은 그대로 내부 transport로 전달합니다.
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def handle_request(self, request):
+        if not is_cacheable(request):
+            return self._transport.handle_request(request)
+
+        url = str(request.url)
+        entry = HTTP_CACHE.load(url)
+        if entry and _is_fresh(entry[0]):
+            HTTP_CACHE.count('hit')
+            return _cached_response(request, *entry)
+
+        response = self._transport.handle_request(_conditional_request(request, entry[0]) if entry else request)
+        if entry and response.status_code == 304:
+            response.close()
+            HTTP_CACHE.count('revalidated')
+            HTTP_CACHE.touch(url, entry[0], response.headers)
+            return _cached_response(request, *entry)
+
+        HTTP_CACHE.count('miss')
+        # 전송 인코딩(gzip/br)을 풀지 않은 원본 바이트를 저장 (클라이언트가 Content-Encoding에 따라 디코딩)
+        body = b''.join(response.iter_raw())
+        response.close()
+        _store_if_cacheable(url, response, body)
+        return _fresh_response(request, response, body)
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncCachingTransport(httpx.AsyncBaseTransport):
+    """
+    CachingTransport의 비동기 버전 (같은 디스크 캐시와 통계를 공유).
+    디스크 읽기/쓰기는 이벤트 루프를 막지 않도록 asyncio.to_thread로 실행합니다.
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        if not is_cacheable(request):
+            return await self._transport.handle_async_request(request)
+
+        url = str(request.url)
+        entry = await asyncio.to_thread(HTTP_CACHE.load, url)
+        if entry and _is_fresh(entry[0]):
+            HTTP_CACHE.count('hit')
+            return _cached_response(request, *entry)
+
+        response = await self._transport.handle_async_request(_conditional_request(request, entry[0]) if entry else request)
+        if entry and response.status_code == 304:
+            await response.aclose()
+            HTTP_CACHE.count('revalidated')
+            await asyncio.to_thread(HTTP_CACHE.touch, url, entry[0], response.headers)
+            return _cached_response(request, *entry)
+
+        HTTP_CACHE.count('miss')
+        body = b''.join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+        await asyncio.to_thread(_store_if_cacheable, url, response, body)
+        return _fresh_response(request, response, body)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def http_cache_stats():
+    """HTTP 응답 캐시의 hit/miss/revalidated/stored 횟수."""
+    with HTTP_CACHE._lock:
+        return dict(HTTP_CACHE.stats)
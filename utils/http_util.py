@@ -0,0 +1,290 @@
+import asyncio
+import atexit
+import os
+import sys
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+import httpx
+
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app_secrets import endpoints
+from utils.rate_limit_util import get_limiter, parse_retry_after
+from utils.circuit_breaker_util import (
+    HTTP_MAX_RETRIES, RETRYABLE_STATUS, RETRY_BUDGET,
+    backoff_delay, can_retry, endpoint_key, get_breaker,
+)
+from utils.hedge_util import hedged, timed
+from utils.deadline_util import DeadlineExceeded
+from utils.http_cache_util import CachingTransport, AsyncCachingTransport
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return int(default)
+
+def _has_module(name):
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+# 타임아웃 / 커넥션 풀 설정 (환경 변수로 조정 가능)
+HTTP_CONNECT_TIMEOUT = _env_float('HTTP_CONNECT_TIMEOUT', 5.0)
+HTTP_READ_TIMEOUT = _env_float('HTTP_READ_TIMEOUT', 15.0)
+HTTP_KEEPALIVE_EXPIRY = _env_float('HTTP_KEEPALIVE_EXPIRY', 60.0)
+HTTP_POOL_SIZE = _env_int('HTTP_POOL_SIZE', 10)  # 기타 호스트 기본 풀 크기
+HTTP_NAVER_POOL_SIZE = _env_int('HTTP_NAVER_POOL_SIZE', 32)  # 네이버 호스트별 풀 크기
+
+# HTTP/2는 h2 패키지가 설치되어 있고 HTTP2_ENABLED=1 일 때만 사용
+HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', '0') == '1' and _has_module('h2')
+
+DEFAULT_TIMEOUT = httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+# 공통 요청 헤더 (모듈마다 중복 선언하던 User-Agent 통합)
+# br 응답은 brotli 패키지가 있을 때만 디코딩 가능하므로 그때만 요청
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate, br' if (_has_module('brotli') or _has_module('brotlicffi')) else 'gzip, deflate',
+}
+
+
+def _naver_hosts():
+    """엔드포인트 설정에서 네이버 호스트 목록을 추출합니다."""
+    hosts = set()
+    for name, value in vars(endpoints).items():
+        if name.startswith('NAVER_') and isinstance(value, str):
+            host = urlsplit(value.split('{')[0]).hostname
+            if host:
+                hosts.add(host)
+    return sorted(hosts)
+
+# 호스트별 커넥션 풀 크기
+HOST_POOL_SIZES = {host: HTTP_NAVER_POOL_SIZE for host in _naver_hosts()}
+
+
+def _limits(pool_size):
+    return httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+def _client_kwargs(transport_cls, cache_cls):
+    """
+    호스트별 풀을 가진 transport를 mount 하여 Client/AsyncClient 공통 인자를 만듭니다.
+    모든 transport는 조건부 GET 응답 캐시(http_cache_util) 래퍼로 감쌉니다. (캐시 대상이 아닌 요청은 그대로 통과)
+    """
+    mounts = {
+        f"all://{host}": cache_cls(transport_cls(limits=_limits(pool_size), http2=HTTP2_ENABLED))
+        for host, pool_size in HOST_POOL_SIZES.items()
+    }
+    return {
+        'headers': DEFAULT_HEADERS,
+        'timeout': DEFAULT_TIMEOUT,
+        'follow_redirects': True,
+        'transport': cache_cls(transport_cls(limits=_limits(HTTP_POOL_SIZE), http2=HTTP2_ENABLED)),
+        'mounts': mounts,
+    }
+
+
+# 프로세스 전역 동기 클라이언트 (스레드 간 공유)
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+# 이벤트 루프별 AsyncClient (커넥션 풀은 생성된 루프에 묶이므로 루프마다 하나씩 유지)
+_ASYNC_CLIENTS = weakref.WeakKeyDictionary()
+_ASYNC_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client():
+    """
+    프로세스 전역 공용 httpx.Client를 반환.
+    최초 호출 시에만 생성하고 이후에는 keep-alive 커넥션을 재사용.
+    """
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        with _CLIENT_LOCK:
+            if _CLIENT is None or _CLIENT.is_closed:
+                _CLIENT = httpx.Client(**_client_kwargs(httpx.HTTPTransport, CachingTransport))
+    return _CLIENT
+
+
+def get_async_client():
+    """
+    현재 실행 중인 이벤트 루프에 바인딩된 공용 httpx.AsyncClient를 반환.
+    최초 호출 시에만 생성하고 이후에는 커넥션 풀을 재사용.
+    """
+    loop = asyncio.get_running_loop()
+    with _ASYNC_CLIENTS_LOCK:
+        client = _ASYNC_CLIENTS.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_client_kwargs(httpx.AsyncHTTPTransport, AsyncCachingTransport))
+            _ASYNC_CLIENTS[loop] = client
+    return client
+
+
+def _request_timeout(timeout, deadline):
+    """요청 타임아웃을 deadline의 남은 시간 이하로 줄입니다. (이미 지났으면 DeadlineExceeded)"""
+    if deadline is None:
+        return timeout or DEFAULT_TIMEOUT
+    deadline.check()
+    if isinstance(timeout, (int, float)):
+        return deadline.cap(timeout)
+    return httpx.Timeout(deadline.cap(HTTP_READ_TIMEOUT), connect=deadline.cap(HTTP_CONNECT_TIMEOUT))
+
+
+def _limited_get(url, params=None, headers=None, timeout=None, deadline=None, **kwargs):
+    """
+    공용 클라이언트로 GET 요청 1회. timeout 미지정 시 기본 connect/read 타임아웃 적용 (deadline이 있으면 남은 시간 이하).
+    호스트별 적응형 리미터(rate_limit_util)에서 슬롯을 얻은 뒤 요청하고, 응답 코드/지연시간을 리미터에 반영합니다.
+    deadline 때문에 끊긴 요청은 리미터/회로에 실패로 반영하지 않고 DeadlineExceeded로 올립니다.
+    """
+    limiter = get_limiter(url)
+    limiter.acquire(deadline)
+    start = time.monotonic()
+    try:
+        response = get_client().get(url, params=params, headers=headers, timeout=_request_timeout(timeout, deadline), **kwargs)
+    except (httpx.HTTPError, DeadlineExceeded) as e:
+        if deadline is not None and deadline.expired():
+            limiter.cancel()
+            raise DeadlineExceeded(f"Deadline exceeded while fetching {url}") from e
+        limiter.release(None, time.monotonic() - start)
+        raise
+    limiter.release(response.status_code, time.monotonic() - start, parse_retry_after(response))
+    return response
+
+
+def http_get(url, params=None, headers=None, timeout=None, endpoint=None, retries=HTTP_MAX_RETRIES, deadline=None, **kwargs):
+    """
+    공용 클라이언트로 GET 요청.
+    엔드포인트별 회로 차단기(circuit_breaker_util)가 열려 있으면 요청 없이 CircuitOpenError를 발생시키고,
+    연결 오류/429/5xx는 jitter 백오프로 최대 retries회 재시도합니다. (전역 재시도 예산이 남아 있을 때만)
+    endpoint를 지정하지 않으면 URL 경로로 엔드포인트 키를 만듭니다.
+    deadline(utils.deadline_util.Deadline)을 넘기면 대기/요청/재시도 모두 남은 시간 안에서만 수행하고, 초과 시 DeadlineExceeded.
+    """
+    breaker = get_breaker(endpoint or endpoint_key(url))
+    RETRY_BUDGET.record_request()
+    attempt = 0
+    while True:
+        breaker.before_call()
+        retry_after = None
+        try:
+            response = _limited_get(url, params=params, headers=headers, timeout=timeout, deadline=deadline, **kwargs)
+        except DeadlineExceeded:
+            breaker.cancel()
+            raise
+        except httpx.HTTPError:
+            breaker.record_failure()
+            if not can_retry(attempt, retries, breaker, deadline):
+                raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if not can_retry(attempt, retries, breaker, deadline):
+                return response
+            retry_after = parse_retry_after(response)
+        time.sleep(backoff_delay(attempt, retry_after, deadline))
+        attempt += 1
+
+
+def http_post(url, data=None, files=None, headers=None, timeout=None, **kwargs):
+    """공용 클라이언트로 POST 요청."""
+    return get_client().post(url, data=data, files=files, headers=headers, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+
+async def _limited_get_async(url, params=None, headers=None, timeout=None, deadline=None, **kwargs):
+    """
+    _limited_get의 비동기 버전 (현재 이벤트 루프의 공용 AsyncClient 사용, 같은 호스트 리미터 공유).
+    deadline이 있으면 요청 전체를 남은 시간으로 asyncio.wait_for 하여 응답 대기 시간의 상한을 보장합니다.
+    """
+    client = get_async_client()
+    limiter = get_limiter(url)
+    await limiter.acquire_async(deadline)
+    start = time.monotonic()
+    try:
+        request = client.get(url, params=params, headers=headers, timeout=_request_timeout(timeout, deadline), **kwargs)
+        response = await (request if deadline is None else asyncio.wait_for(request, deadline.remaining()))
+    except asyncio.CancelledError:
+        limiter.cancel()
+        raise
+    except (httpx.HTTPError, asyncio.TimeoutError, DeadlineExceeded) as e:
+        if deadline is not None and deadline.expired():
+            limiter.cancel()
+            raise DeadlineExceeded(f"Deadline exceeded while fetching {url}") from e
+        limiter.release(None, time.monotonic() - start)
+        raise
+    limiter.release(response.status_code, time.monotonic() - start, parse_retry_after(response))
+    return response
+
+
+async def http_get_async(url, params=None, headers=None, timeout=None, endpoint=None, retries=HTTP_MAX_RETRIES, hedge=False, deadline=None, **kwargs):
+    """
+    http_get의 비동기 버전 (같은 회로 차단기/재시도 예산/deadline 규칙 공유, 백오프 대기는 asyncio.sleep).
+    hedge=True면 엔드포인트의 p90 응답시간 안에 응답이 없을 때 같은 요청을 한 번 더 보내 먼저 온 응답을 사용합니다.
+    (봇 대화형 조회 전용, 헤지 비율은 hedge_util의 예산으로 제한)
+    """
+    endpoint = endpoint or endpoint_key(url)
+    breaker = get_breaker(endpoint)
+    RETRY_BUDGET.record_request()
+
+    def send():
+        return _limited_get_async(url, params=params, headers=headers, timeout=timeout, deadline=deadline, **kwargs)
+
+    attempt = 0
+    while True:
+        breaker.before_call()
+        retry_after = None
+        try:
+            response = await (hedged(endpoint, send) if hedge else timed(endpoint, send))
+        except (asyncio.CancelledError, DeadlineExceeded):
+            breaker.cancel()
+            raise
+        except httpx.HTTPError:
+            breaker.record_failure()
+            if not can_retry(attempt, retries, breaker, deadline):
+                raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if not can_retry(attempt, retries, breaker, deadline):
+                return response
+            retry_after = parse_retry_after(response)
+        await asyncio.sleep(backoff_delay(attempt, retry_after, deadline))
+        attempt += 1
+
+
+def close_client():
+    """공용 동기 클라이언트를 닫습니다. (프로세스 종료 시 자동 호출)"""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is not None and not _CLIENT.is_closed:
+            _CLIENT.close()
+        _CLIENT = None
+
+atexit.register(close_client)
+
+
+async def aclose_async_client():
+    """현재 이벤트 루프의 공용 AsyncClient를 닫습니다. (봇 종료 시 호출)"""
+    loop = asyncio.get_running_loop()
+    with _ASYNC_CLIENTS_LOCK:
+        client = _ASYNC_CLIENTS.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
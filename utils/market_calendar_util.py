@@ -0,0 +1,158 @@
+import threading
+import time as time_module
+from datetime import datetime, time, timedelta
+import pytz
+
+# 거래소 휴장일 (주말 제외, 임시공휴일/선거일/연말 휴장 포함)
+KRX_HOLIDAYS = {
+    # 2025
+    '2025-01-01', '2025-01-27', '2025-01-28', '2025-01-29', '2025-01-30', '2025-03-03', '2025-05-01',
+    '2025-05-05', '2025-05-06', '2025-06-03', '2025-06-06', '2025-08-15', '2025-10-03', '2025-10-06',
+    '2025-10-07', '2025-10-08', '2025-10-09', '2025-12-25', '2025-12-31',
+    # 2026
+    '2026-01-01', '2026-02-16', '2026-02-17', '2026-02-18', '2026-03-02', '2026-05-01', '2026-05-05',
+    '2026-05-25', '2026-06-03', '2026-08-17', '2026-09-24', '2026-09-25', '2026-10-05', '2026-10-09',
+    '2026-12-25', '2026-12-31',
+    # 2027
+    '2027-01-01', '2027-02-08', '2027-02-09', '2027-03-01', '2027-05-05', '2027-05-13', '2027-08-16',
+    '2027-09-14', '2027-09-15', '2027-09-16', '2027-10-04', '2027-10-11', '2027-12-27', '2027-12-31',
+}
+NYSE_HOLIDAYS = {
+    # 2025
+    '2025-01-01', '2025-01-09', '2025-01-20', '2025-02-17', '2025-04-18', '2025-05-26', '2025-06-19',
+    '2025-07-04', '2025-09-01', '2025-11-27', '2025-12-25',
+    # 2026
+    '2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25', '2026-06-19', '2026-07-03',
+    '2026-09-07', '2026-11-26', '2026-12-25',
+    # 2027
+    '2027-01-01', '2027-01-18', '2027-02-15', '2027-03-26', '2027-05-31', '2027-06-18', '2027-07-05',
+    '2027-09-06', '2027-11-25', '2027-12-24',
+}
+TSE_HOLIDAYS = {
+    # 2025
+    '2025-01-01', '2025-01-02', '2025-01-03', '2025-01-13', '2025-02-11', '2025-02-24', '2025-03-20',
+    '2025-04-29', '2025-05-05', '2025-05-06', '2025-07-21', '2025-08-11', '2025-09-15', '2025-09-23',
+    '2025-10-13', '2025-11-03', '2025-11-24', '2025-12-31',
+    # 2026
+    '2026-01-01', '2026-01-02', '2026-01-12', '2026-02-11', '2026-02-23', '2026-03-20', '2026-04-29',
+    '2026-05-04', '2026-05-05', '2026-05-06', '2026-07-20', '2026-08-11', '2026-09-21', '2026-09-22',
+    '2026-09-23', '2026-10-12', '2026-11-03', '2026-11-23', '2026-12-31',
+    # 2027
+    '2027-01-01', '2027-01-11', '2027-02-11', '2027-02-23', '2027-03-22', '2027-04-29', '2027-05-03',
+    '2027-05-04', '2027-05-05', '2027-07-19', '2027-08-11', '2027-09-20', '2027-09-23', '2027-10-11',
+    '2027-11-03', '2027-11-23', '2027-12-31',
+}
+# 휴장일 표가 있는 연도 (범위 밖은 주말만 휴장으로 간주)
+CALENDAR_YEARS = range(2025, 2028)
+
+# 시장별 세션: 거래소 시간대, 개장 시각, 데이터 확정 시각(이후 생성된 캐시는 다음 개장까지 유효), 장중 캐시 유효시간(초)
+# 해외 주식은 장중 캐시를 사용하지 않음 (기존 정책 유지)
+MARKET_SESSIONS = {
+    'KOR': {'tz': 'Asia/Seoul', 'open': time(9, 0), 'settle': time(16, 30), 'holidays': KRX_HOLIDAYS, 'intraday_ttl': 300},
+    'USA': {'tz': 'America/New_York', 'open': time(9, 30), 'settle': time(16, 30), 'holidays': NYSE_HOLIDAYS, 'intraday_ttl': 0},
+    'JPN': {'tz': 'Asia/Tokyo', 'open': time(9, 0), 'settle': time(16, 0), 'holidays': TSE_HOLIDAYS, 'intraday_ttl': 0},
+}
+# 휴장일 표가 없는 시장은 한국 시간 기준 평일 세션으로 간주
+DEFAULT_SESSION = {'tz': 'Asia/Seoul', 'open': time(9, 0), 'settle': time(16, 30), 'holidays': set(), 'intraday_ttl': 0}
+
+# 캐시 갱신 주기 정책 (stale_before의 policy)
+SESSION, TRADING_DAY, DAILY = 'session', 'trading_day', 'daily'
+
+_warned_years = set()
+
+
+def _session(nation_code):
+    return MARKET_SESSIONS.get(nation_code, DEFAULT_SESSION)
+
+
+def is_trading_day(nation_code, day):
+    """주말과 거래소 휴장일을 제외한 거래일인지 확인합니다."""
+    if day.weekday() >= 5:
+        return False
+    if day.year not in CALENDAR_YEARS and day.year not in _warned_years:
+        _warned_years.add(day.year)
+        print(f"[ERROR] {day.year}년 휴장일 정보가 없어 주말만 휴장으로 간주합니다. (utils/market_calendar_util.py)")
+    return day.isoformat() not in _session(nation_code)['holidays']
+
+
+def _at(session, day, at):
+    tz = pytz.timezone(session['tz'])
+    return tz.localize(datetime.combine(day, at)).timestamp()
+
+
+def _compute_state(nation_code, now):
+    """
+    now(epoch 초) 기준 시장 상태를 계산합니다.
+    (상태 'OPEN'/'CLOSE', 다음 전환 시각(장중: 데이터 확정 시각, 장외: 다음 개장 시각), 마지막 데이터 확정 시각)
+    """
+    session = _session(nation_code)
+    tz = pytz.timezone(session['tz'])
+    today = datetime.fromtimestamp(now, tz).date()
+
+    # 마지막으로 데이터가 확정된 거래일 (오늘 확정 시각이 지났으면 오늘)
+    last_day = today
+    while not (is_trading_day(nation_code, last_day) and _at(session, last_day, session['settle']) <= now):
+        last_day -= timedelta(days=1)
+    settled_at = _at(session, last_day, session['settle'])
+
+    if is_trading_day(nation_code, today):
+        open_at, settle_at = _at(session, today, session['open']), _at(session, today, session['settle'])
+        if open_at <= now < settle_at:
+            return 'OPEN', settle_at, settled_at
+
+    # 다음 개장일 (오늘 개장 전이면 오늘)
+    next_day = today
+    while not (is_trading_day(nation_code, next_day) and _at(session, next_day, session['open']) > now):
+        next_day += timedelta(days=1)
+    return 'CLOSE', _at(session, next_day, session['open']), settled_at
+
+
+class MarketSessionService:
+    """
+    시장별로 '이 시각 이전에 저장된 캐시는 만료'인 기준 시각을 제공합니다.
+    장외 기준 시각은 다음 개장까지 변하지 않으므로 시장 상태가 바뀔 때(개장/마감)만 다시 계산하고,
+    장중에는 현재 시각에서 장중 캐시 유효시간을 뺀 값을 사용합니다. 네트워크 호출은 하지 않습니다.
+    """
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _state(self, nation_code, now):
+        entry = self._states.get(nation_code)
+        # 계산한 시각 ~ 다음 전환 시각 사이면 그대로 사용
+        if entry is None or not entry[0] <= now < entry[1][1]:
+            state = _compute_state(nation_code, now)
+            with self._lock:
+                entry = self._states[nation_code] = (now, state)
+            print(f"[DEBUG] {nation_code} 시장 상태 갱신: {state[0]} (다음 전환 {datetime.fromtimestamp(state[1])})")
+        return entry[1]
+
+    def market_status(self, nation_code, now=None):
+        """'OPEN' 또는 'CLOSE'"""
+        now = time_module.time() if now is None else now
+        return self._state(nation_code, now)[0]
+
+    def stale_before(self, nation_code, now=None, policy=SESSION):
+        """
+        이 시각(epoch 초)보다 먼저 저장된 캐시는 만료입니다. policy별 기준:
+        SESSION: 장중에는 장중 캐시 유효시간, 장외에는 마지막 데이터 확정 시각 (시세)
+        TRADING_DAY: 장중에도 마지막 데이터 확정 시각 (거래일마다 한 번 갱신, 기간 수익률)
+        DAILY: 거래소 현지 날짜가 바뀐 시각 (하루 한 번 갱신, 밸류에이션/재무)
+        """
+        now = time_module.time() if now is None else now
+        status, _, settled_at = self._state(nation_code, now)
+        if policy == DAILY:
+            session = _session(nation_code)
+            today = datetime.fromtimestamp(now, pytz.timezone(session['tz'])).date()
+            return _at(session, today, time(0, 0))
+        if policy == SESSION and status == 'OPEN':
+            return now - _session(nation_code)['intraday_ttl']
+        return settled_at
+
+
+MARKET_SESSION = MarketSessionService()
+
+
+def stale_before(nation_code, now=None, policy=SESSION):
+    return MARKET_SESSION.stale_before(nation_code, now, policy)
@@ -1,4 +1,3 @@
-import requests
 import os
 _MARKET_STATUS_CACHE = {}
 import sys
@@ -7,145 +6,162 @@ from datetime import datetime, timedelta, time
 import pytz
 # 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from app_secrets.endpoints import (
+from app_secrets.endpoints import (
     NAVER_INDUSTRY_PAGED_URL, NAVER_KOSPI_INDEX_URL,
     NAVER_NATION_INDEX_URL, NAVER_STOCK_CHART_URL, NAVER_AC_URL,
 )
+from utils.http_util import http_get, http_get_async
+from utils.circuit_breaker_util import CircuitOpenError
+from utils.singleflight_util import singleflight
+from models.NegativeCache import NEGATIVE_CACHE
 
 
 # 전역 변수로 업종 코드-업종명 매핑 딕셔너리 선언
 industry_code_name_map = None
 
-def get_industry_name(industry_code):
+def _build_industry_code_name_map(data):
+    """네이버 업종 목록 응답에서 코드-업종명 매핑 딕셔너리를 생성."""
+    return {str(group['no']): group['name'] for group in data['groups']}
+
+def get_industry_name(industry_code, deadline=None):
     """
     업종 코드를 입력하면 업종명을 반환.
     최초 호출 시에만 API를 통해 데이터를 로딩.
     """
     global industry_code_name_map
-    
 
-    def load_industry_code_name_map():
-        """
-        네이버 API에서 업종 목록을 받아와 코드-업종명 매핑 딕셔너리를 생성.
-        """
-        global industry_code_name_map
-        if industry_code_name_map is not None:
-            return  # 이미 로딩된 경우 재호출 방지
-
-        url = NAVER_INDUSTRY_PAGED_URL
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers)
-        data = response.json()
-
-        # 코드-업종명 매핑 생성
-        industry_code_name_map = {}
-        for group in data['groups']:
-            code = str(group['no'])
-            name = group['name']
-            industry_code_name_map[code] = name
+    if industry_code_name_map is None:
+        response = http_get(NAVER_INDUSTRY_PAGED_URL, deadline=deadline)
+        industry_code_name_map = _build_industry_code_name_map(response.json())
+    return industry_code_name_map.get(str(industry_code), "알 수 없음")
+
+async def get_industry_name_async(industry_code, deadline=None):
+    """get_industry_name의 비동기 버전. 매핑은 동기 버전과 공유합니다."""
+    global industry_code_name_map
 
-    
     if industry_code_name_map is None:
-        load_industry_code_name_map()
+        response = await http_get_async(NAVER_INDUSTRY_PAGED_URL, deadline=deadline)
+        industry_code_name_map = _build_industry_code_name_map(response.json())
     return industry_code_name_map.get(str(industry_code), "알 수 없음")
 
-def check_market_status(nation_code):
-    global _MARKET_STATUS_CACHE
-    import pytz
-    from datetime import datetime, timedelta
-    kst = pytz.timezone("Asia/Seoul")
-    now = datetime.now(kst)
+def _market_status_api_url(nation_code):
+    """nation_code에 따른 시장 상태 API URL"""
+    if nation_code == 'KOR':
+        return NAVER_KOSPI_INDEX_URL  # 한국 시장
+    return NAVER_NATION_INDEX_URL.format(nation_code=nation_code)  # 해외 시장
+
+def _parse_market_status(nation_code, stock_basic_data, now):
+    """시장 상태 API 응답에서 (시장 상태, 마지막 거래일시)를 계산합니다."""
+    # 한국 시장 데이터 처리
+    if nation_code == 'KOR':
+        market_status = stock_basic_data.get('marketStatus', 'UNKNOWN')
+        local_traded_at = stock_basic_data.get('localTradedAt')
+
+    # 해외 시장 데이터 처리 (첫 번째 거래소 정보 기준)
+    else:
+        first_exchange_data = stock_basic_data[0]  # 가장 첫 번째 거래소 데이터를 사용
+        market_status = first_exchange_data.get('marketStatus', 'UNKNOWN')
+        local_traded_at = first_exchange_data.get('localTradedAt')
+
+    last_traded_datetime = None
+    # localTradedAt 값이 존재하는 경우 처리
+    if local_traded_at:
+        # ISO 형식에서 타임존 제외 후 변환
+        last_traded_datetime = datetime.fromisoformat(local_traded_at[:-6])
+        print(f"[DEBUG] 마지막 거래일: {last_traded_datetime}")
+
+        # 현재 시간이 마지막 거래일보다 나중인지 확인하여 장이 휴장인지 판단
+        if last_traded_datetime.date() < now.date():
+            print("[DEBUG] 장이 휴장입니다.")
+            return 'CLOSE', last_traded_datetime
+
+    return market_status, last_traded_datetime
+
+def _get_cached_market_status(nation_code, now):
     if nation_code in _MARKET_STATUS_CACHE:
         res, t = _MARKET_STATUS_CACHE[nation_code]
-        if now - t < timedelta(minutes=5): return res
+        if now - t < timedelta(minutes=5):
+            return res
+    return None
+
+def _get_stale_market_status(nation_code, error):
+    """회로가 열려 API를 호출할 수 없을 때 만료된 캐시라도 있으면 반환합니다. 없으면 UNKNOWN."""
+    if nation_code in _MARKET_STATUS_CACHE:
+        print(f"[DEBUG] {error} - 이전 시장 상태를 사용합니다.")
+        return _MARKET_STATUS_CACHE[nation_code][0]
+    print(f"Error fetching API data: {error}")
+    return 'UNKNOWN', None
+
+def check_market_status(nation_code):
     """주어진 nation_code에 따라 API를 통해 시장 상태와 마지막 거래일을 확인하여 시장 상태를 결정합니다."""
-    
     kst = pytz.timezone('Asia/Seoul')
     now = datetime.now(kst)
-
-    # nation_code에 따른 API URL 정의
-    if nation_code == 'KOR':
-        api_url = NAVER_KOSPI_INDEX_URL  # 한국 시장
-    else:
-        api_url = NAVER_NATION_INDEX_URL.format(nation_code=nation_code)  # 해외 시장
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    cached = _get_cached_market_status(nation_code, now)
+    if cached:
+        return cached
 
     try:
-        api_response = requests.get(api_url, headers=headers)
+        api_response = http_get(_market_status_api_url(nation_code))
         if api_response.status_code == 200:
-            stock_basic_data = api_response.json()
-
-            # 한국 시장 데이터 처리
-            if nation_code == 'KOR':
-                market_status = stock_basic_data.get('marketStatus', 'UNKNOWN')
-                local_traded_at = stock_basic_data.get('localTradedAt')
-            
-            # 해외 시장 데이터 처리 (첫 번째 거래소 정보 기준)
-            else:
-                first_exchange_data = stock_basic_data[0]  # 가장 첫 번째 거래소 데이터를 사용
-                market_status = first_exchange_data.get('marketStatus', 'UNKNOWN')
-                local_traded_at = first_exchange_data.get('localTradedAt')
-
-            # localTradedAt 값이 존재하는 경우 처리
-            if local_traded_at:
-                # ISO 형식에서 타임존 제외 후 변환
-                last_traded_datetime = datetime.fromisoformat(local_traded_at[:-6])
-                print(f"[DEBUG] 마지막 거래일: {last_traded_datetime}")
-
-                # 현재 시간이 마지막 거래일보다 나중인지 확인하여 장이 휴장인지 판단
-                if last_traded_datetime.date() < now.date():
-                    print("[DEBUG] 장이 휴장입니다.")
-                    return 'CLOSE', last_traded_datetime  # 두 개의 값 반환
-
-            _MARKET_STATUS_CACHE[nation_code] = ((market_status, last_traded_datetime), now); return market_status, last_traded_datetime  # 두 개의 값 반환
+            result = _parse_market_status(nation_code, api_response.json(), now)
+            _MARKET_STATUS_CACHE[nation_code] = (result, now)
+            return result  # 두 개의 값 반환
 
         else:
             return 'UNKNOWN', None  # API 요청 실패 시 두 개의 값 반환
 
+    except CircuitOpenError as e:
+        return _get_stale_market_status(nation_code, e)
+
     except Exception as e:
         print(f"Error fetching API data: {e}")
         return 'UNKNOWN', None  # 예외 처리 시 두 개의 값 반환
 
-def stock_fetch_yield_by_period(stock_code=None, date=None):
-    if not stock_code:
-        print("Error: stock_code is required but was not provided.")
-        return {"error": "stock_code is required"}
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+async def check_market_status_async(nation_code):
+    """check_market_status의 비동기 버전. 결과 캐시(_MARKET_STATUS_CACHE)를 동기 버전과 공유합니다."""
+    kst = pytz.timezone('Asia/Seoul')
+    now = datetime.now(kst)
+    cached = _get_cached_market_status(nation_code, now)
+    if cached:
+        return cached
+
+    try:
+        api_response = await http_get_async(_market_status_api_url(nation_code))
+        if api_response.status_code == 200:
+            result = _parse_market_status(nation_code, api_response.json(), now)
+            _MARKET_STATUS_CACHE[nation_code] = (result, now)
+            return result
 
-    def fetch_data(url):
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.json()
         else:
-            print(f"Failed to fetch data: Status code {response.status_code}")
-            return None
+            return 'UNKNOWN', None
 
-    # 조회 기간을 380일로 설정 (1년 데이터 확보 보장)
-    # 날짜 파라미터가 있으면 해당 날짜를 기준으로, 없으면 현재 시각 기준
+    except CircuitOpenError as e:
+        return _get_stale_market_status(nation_code, e)
+
+    except Exception as e:
+        print(f"Error fetching API data: {e}")
+        return 'UNKNOWN', None
+
+def _resolve_end_date(date=None):
+    """날짜 파라미터(YYMMDD/YYYYMMDD 문자열 혹은 datetime)를 기준일로 변환. 없으면 현재 시각."""
     if date:
         if isinstance(date, str):
             try:
-                if len(date) == 6: end_date = datetime.strptime(date, "%y%m%d")
-                else: end_date = datetime.strptime(date, "%Y%m%d")
-            except: end_date = datetime.now()
-        else: end_date = date
-    else:
-        end_date = datetime.now()
-    
+                if len(date) == 6: return datetime.strptime(date, "%y%m%d")
+                else: return datetime.strptime(date, "%Y%m%d")
+            except: return datetime.now()
+        return date
+    return datetime.now()
+
+def _build_trend_url(stock_code, end_date):
+    # 조회 기간을 380일로 설정 (1년 데이터 확보 보장)
     start_date = end_date - timedelta(days=380)
     start_date_str = start_date.strftime("%Y%m%d")
     end_date_str = end_date.strftime("%Y%m%d")
+    return NAVER_STOCK_CHART_URL.format(stock_code=stock_code, start_date=start_date_str, end_date=end_date_str)
 
-    trend_url = NAVER_STOCK_CHART_URL.format(stock_code=stock_code, start_date=start_date_str, end_date=end_date_str)
-    print(f"[DEBUG] Fetching data from {trend_url}")
-    trend_data = fetch_data(trend_url)
-
+def _calculate_period_returns(trend_data, end_date):
+    """일봉 데이터(trend_data)에서 기준일(end_date) 대비 기간별 수익률을 계산합니다."""
     if not trend_data:
         return {}
     
@@ -241,29 +257,60 @@ def stock_fetch_yield_by_period(stock_code=None, date=None):
 
     return returns
 
-def search_stock_code(query):
-    url = NAVER_AC_URL
-    params = {
-        'q': query,
-        'target': 'index,stock,marketindicator'
+@singleflight('stock_code', 'date')
+def stock_fetch_yield_by_period(stock_code=None, date=None, deadline=None):
+    """기준일 대비 기간별(1D~1Y) 수익률. deadline이 있으면 남은 시간 안에서만 차트를 조회합니다."""
+    if not stock_code:
+        print("Error: stock_code is required but was not provided.")
+        return {"error": "stock_code is required"}
+
+    # 날짜 파라미터가 있으면 해당 날짜를 기준으로, 없으면 현재 시각 기준
+    end_date = _resolve_end_date(date)
+    trend_url = _build_trend_url(stock_code, end_date)
+    print(f"[DEBUG] Fetching data from {trend_url}")
+
+    response = http_get(trend_url, deadline=deadline)
+    if response.status_code != 200:
+        print(f"Failed to fetch data: Status code {response.status_code}")
+        return {}
+
+    return _calculate_period_returns(response.json(), end_date)
+
+@singleflight('stock_code', 'date')
+async def stock_fetch_yield_by_period_async(stock_code=None, date=None, hedge=False, deadline=None):
+    """stock_fetch_yield_by_period의 비동기 버전 (공용 AsyncClient 사용, hedge=True면 느린 응답에 헤지 요청)"""
+    if not stock_code:
+        print("Error: stock_code is required but was not provided.")
+        return {"error": "stock_code is required"}
+
+    end_date = _resolve_end_date(date)
+    trend_url = _build_trend_url(stock_code, end_date)
+    print(f"[DEBUG] Fetching data from {trend_url}")
+
+    response = await http_get_async(trend_url, hedge=hedge, deadline=deadline)
+    if response.status_code != 200:
+        print(f"Failed to fetch data: Status code {response.status_code}")
+        return {}
+
+    return _calculate_period_returns(response.json(), end_date)
+
+def _search_item_to_dict(item):
+    return {
+        'name': item['name'],
+        'code': item['code'],
+        'typeCode': item['typeCode'],
+        'typeName': item['typeName'],
+        'url': item['url'],
+        'reutersCode': item['reutersCode'],
+        'nationCode': item['nationCode'],
+        'nationName': item['nationName']
     }
 
-    response = requests.get(url, params=params)
-    data = response.json()
-    print(data)
-    
+def _filter_search_items(data, query):
+    """자동완성 응답에서 query와 일치하는 항목 혹은 스팩주를 제외한 항목을 반환합니다."""
     # 필터링된 결과를 저장할 리스트
     filtered_items = [
-        {
-            'name': item['name'],
-            'code': item['code'],
-            'typeCode': item['typeCode'],
-            'typeName': item['typeName'],
-            'url': item['url'],
-            'reutersCode': item['reutersCode'],
-            'nationCode': item['nationCode'],
-            'nationName': item['nationName']
-        }
+        _search_item_to_dict(item)
         for item in data['items']
         if (item['name'].strip().lower() == str(query).strip().lower() or item['code'].lower() == str(query).strip().lower())
     ]
@@ -277,33 +324,49 @@ def search_stock_code(query):
     non_spec_items = []
     for item in data['items']:
         if item['nationCode'] != 'KOR':
-            non_spec_items.append({
-                'name': item['name'],
-                'code': item['code'],
-                'typeCode': item['typeCode'],
-                'typeName': item['typeName'],
-                'url': item['url'],
-                'reutersCode': item['reutersCode'],
-                'nationCode': item['nationCode'],
-                'nationName': item['nationName']
-            })
+            non_spec_items.append(_search_item_to_dict(item))
         else:
             # `nationCode`가 'KOR'인 경우 추가 조건 적용
             if not (40000 <= int(item['code'][0:5]) <= 49999) and '스팩' not in item['name']:
-                non_spec_items.append({
-                    'name': item['name'],
-                    'code': item['code'],
-                    'typeCode': item['typeCode'],
-                    'typeName': item['typeName'],
-                    'url': item['url'],
-                    'reutersCode': item['reutersCode'],
-                    'nationCode': item['nationCode'],
-                    'nationName': item['nationName']
-                })
+                non_spec_items.append(_search_item_to_dict(item))
     
     print(non_spec_items)
     return non_spec_items
 
+def _search_params(query):
+    return {
+        'q': query,
+        'target': 'index,stock,marketindicator'
+    }
+
+def _remember_not_found(query, results):
+    """검색 결과가 없으면 부정 캐시에 기록 (같은 이름을 다시 검색하면 호출 없이 빈 결과 반환), 있으면 기록을 지움"""
+    if not results:
+        NEGATIVE_CACHE.put('search', query, 'not_found')
+    else:
+        NEGATIVE_CACHE.forget('search', query)
+    return results
+
+@singleflight('query')
+def search_stock_code(query, deadline=None):
+    """자동완성 API로 종목을 검색합니다. deadline이 지나면 DeadlineExceeded."""
+    if NEGATIVE_CACHE.get('search', query):
+        return []
+    response = http_get(NAVER_AC_URL, params=_search_params(query), deadline=deadline)
+    data = response.json()
+    print(data)
+    return _remember_not_found(query, _filter_search_items(data, query))
+
+@singleflight('query')
+async def search_stock_code_async(query, hedge=False, deadline=None):
+    """search_stock_code의 비동기 버전 (공용 AsyncClient 사용, 봇 대화형 검색은 hedge=True)"""
+    if NEGATIVE_CACHE.get('search', query):
+        return []
+    response = await http_get_async(NAVER_AC_URL, params=_search_params(query), hedge=hedge, deadline=deadline)
+    data = response.json()
+    print(data)
+    return _remember_not_found(query, _filter_search_items(data, query))
+
 def calculate_page_count(requested_count: int, page_size: int = 100) -> int:
     """
     페이지 수를 계산하는 함수.
@@ -362,4 +425,4 @@ def main():
         print('No results found.')
 
 if __name__ == '__main__':
-    main()
+    main()
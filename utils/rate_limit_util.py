@@ -0,0 +1,180 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return float(default)
+
+
+# 호스트별 요청 속도(초당 요청 수) / 동시 요청 수 범위 (환경 변수로 조정 가능)
+RATE_LIMIT_INITIAL_RPS = _env_float('RATE_LIMIT_INITIAL_RPS', 10.0)
+RATE_LIMIT_MIN_RPS = _env_float('RATE_LIMIT_MIN_RPS', 1.0)
+RATE_LIMIT_MAX_RPS = _env_float('RATE_LIMIT_MAX_RPS', 100.0)
+RATE_LIMIT_INITIAL_CONCURRENCY = _env_float('RATE_LIMIT_INITIAL_CONCURRENCY', 4)
+RATE_LIMIT_MIN_CONCURRENCY = _env_float('RATE_LIMIT_MIN_CONCURRENCY', 1)
+RATE_LIMIT_MAX_CONCURRENCY = _env_float('RATE_LIMIT_MAX_CONCURRENCY', 32)
+# 이 시간(초)보다 느린 응답은 과부하 신호로 보고 감속
+RATE_LIMIT_SLOW_SECONDS = _env_float('RATE_LIMIT_SLOW_SECONDS', 3.0)
+# 감속 후 다음 감속까지 최소 간격(초) - 같은 과부하 구간의 연속 실패로 여러 번 반감되지 않도록
+RATE_LIMIT_BACKOFF_COOLDOWN = _env_float('RATE_LIMIT_BACKOFF_COOLDOWN', 1.0)
+
+# 감속 대상 응답 코드 (429 및 5xx)
+_BACKOFF_STATUS = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """
+    호스트 하나에 대한 토큰 버킷 + 동시 요청 수 제한.
+    정상 응답이 이어지면 속도/동시 요청 수를 조금씩 늘리고(additive increase),
+    429/5xx/타임아웃/느린 응답이 오면 절반으로 줄입니다(multiplicative decrease).
+    스레드와 이벤트 루프 모두에서 사용할 수 있도록 상태는 threading.Lock으로 보호합니다.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.rate = RATE_LIMIT_INITIAL_RPS
+        self.concurrency = RATE_LIMIT_INITIAL_CONCURRENCY
+        self.tokens = 1.0
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.last_backoff = 0.0
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+    def _refill(self, now):
+        burst = max(1.0, self.rate)  # 최대 1초 분량까지 버스트 허용
+        self.tokens = min(burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def _try_acquire(self):
+        """슬롯을 잡았으면 0, 아니면 다시 시도할 때까지 기다릴 시간(초)을 반환합니다. (lock 보유 상태에서 호출)"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.concurrency):
+            return None  # 다른 요청이 끝날 때까지 대기
+        self._refill(now)
+        if self.tokens < 1.0:
+            return (1.0 - self.tokens) / self.rate
+        self.tokens -= 1.0
+        self.in_flight += 1
+        return 0
+
+    def acquire(self, deadline=None):
+        """요청 슬롯을 얻을 때까지 현재 스레드를 대기시킵니다. deadline이 지나면 DeadlineExceeded."""
+        with self._cond:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return
+                if deadline is not None:
+                    deadline.check()
+                    wait = deadline.cap(wait)
+                self._cond.wait(timeout=wait)
+
+    async def acquire_async(self, deadline=None):
+        """acquire의 비동기 버전 (이벤트 루프를 막지 않고 대기)."""
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+            if wait == 0:
+                return
+            wait = wait if wait is not None else 0.05
+            if deadline is not None:
+                deadline.check()
+                wait = deadline.cap(wait)
+            await asyncio.sleep(wait)
+
+    def release(self, status_code=None, elapsed=0.0, retry_after=None):
+        """
+        요청 결과를 반영하고 슬롯을 반납합니다.
+        status_code가 None이면 예외(타임아웃/연결 실패)로 간주합니다.
+        """
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            now = time.monotonic()
+            overloaded = status_code is None or status_code in _BACKOFF_STATUS or elapsed > RATE_LIMIT_SLOW_SECONDS
+            if overloaded:
+                if now - self.last_backoff >= RATE_LIMIT_BACKOFF_COOLDOWN:
+                    self.last_backoff = now
+                    self.rate = max(RATE_LIMIT_MIN_RPS, self.rate / 2)
+                    self.concurrency = max(RATE_LIMIT_MIN_CONCURRENCY, self.concurrency / 2)
+                    print(f"[DEBUG] {self.host} 감속: {self.rate:.1f} req/s, 동시 {int(self.concurrency)} (status={status_code}, {elapsed:.2f}s)")
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            else:
+                # 동시 요청 수만큼 성공하면 1씩 증가하도록 1/concurrency 만큼 증가
+                self.concurrency = min(RATE_LIMIT_MAX_CONCURRENCY, self.concurrency + 1 / self.concurrency)
+                self.rate = min(RATE_LIMIT_MAX_RPS, self.rate + 1 / self.concurrency)
+            self._cond.notify_all()
+
+    def cancel(self):
+        """결과를 반영하지 않고 슬롯만 반납합니다. (요청이 취소된 경우)"""
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._lock:
+            return {'rate': round(self.rate, 2), 'concurrency': int(self.concurrency), 'in_flight': self.in_flight}
+
+
+# 호스트별 리미터 (프로세스 전역)
+_LIMITERS = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def _host_of(url_or_host):
+    if '://' in url_or_host:
+        return urlsplit(url_or_host).hostname or url_or_host
+    return url_or_host
+
+
+def get_limiter(url_or_host):
+    """URL(혹은 호스트명)에 해당하는 호스트 리미터를 반환합니다. 없으면 생성."""
+    host = _host_of(url_or_host)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(host)
+        if limiter is None:
+            limiter = _LIMITERS[host] = HostRateLimiter(host)
+    return limiter
+
+
+def parse_retry_after(response):
+    """429/503 응답의 Retry-After(초) 헤더 값을 반환합니다. 없거나 날짜 형식이면 None."""
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+@contextmanager
+def rate_limited(url_or_host):
+    """
+    httpx 공용 클라이언트를 거치지 않는 호출(finviz, pykrx 등)에 리미터를 적용하는 context manager.
+    블록에서 예외가 나면 과부하로 간주해 감속합니다.
+    """
+    limiter = get_limiter(url_or_host)
+    limiter.acquire()
+    start = time.monotonic()
+    try:
+        yield limiter
+    except Exception:
+        limiter.release(None, time.monotonic() - start)
+        raise
+    limiter.release(200, time.monotonic() - start)
+
+
+def limiter_stats():
+    """호스트별 현재 속도/동시 요청 수 (로그 출력용)."""
+    with _LIMITERS_LOCK:
+        limiters = list(_LIMITERS.values())
+    return {limiter.host: limiter.stats() for limiter in limiters}
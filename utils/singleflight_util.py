@@ -0,0 +1,136 @@
+import asyncio
+import copy
+import functools
+import inspect
+import os
+import sys
+import threading
+
+# 현재 스크립트의 상위 디렉터리를 모듈 경로에 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.deadline_util import DeadlineExceeded, remaining_or_none
+
+
+def _freeze(value):
+    """dict/list 인자(레코드, fields, preloaded 등)도 키로 쓸 수 있도록 hashable 값으로 바꿉니다."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class _Call:
+    """진행 중인 호출 하나 (동기 버전). 대기자는 done 이벤트를 기다립니다."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 키의 호출이 이미 진행 중이면 새로 실행하지 않고 그 결과를 함께 받습니다.
+    동기 호출(스레드)과 비동기 호출(이벤트 루프)은 각각 따로 합쳐지며, 결과는 진행 중인 동안에만 공유합니다. (캐시 아님)
+    여러 호출자가 결과를 받은 경우 서로의 수정이 영향을 주지 않도록 각자 사본을 받습니다.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, deadline=None):
+        """key로 fn()을 한 번만 실행합니다. 대기자는 자신의 deadline까지만 기다리고 넘으면 DeadlineExceeded."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            print(f"[DEBUG] 진행 중인 동일 호출 결과를 기다립니다: {key[0]}{key[1:]}")
+            if not call.done.wait(timeout=remaining_or_none(deadline)):
+                raise DeadlineExceeded(f"Deadline exceeded while waiting for in-flight {key[0]}")
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.waiters > 0
+            call.done.set()
+        return copy.deepcopy(call.result) if shared else call.result
+
+    def _forget_task(self, loop_key, task):
+        # 완료된 Task 자리에 이미 새 Task가 들어왔으면 지우지 않음
+        entry = self._tasks.get(loop_key)
+        if entry is not None and entry[0] is task:
+            del self._tasks[loop_key]
+
+    async def do_async(self, key, fn, deadline=None):
+        """
+        do의 비동기 버전. fn()이 만든 코루틴은 Task로 한 번만 실행하고 모든 호출자가 그 Task를 기다립니다.
+        한 호출자가 취소되거나 시한을 넘겨도 다른 호출자를 위해 Task는 계속 실행됩니다.
+        """
+        loop_key = (id(asyncio.get_running_loop()), key)
+        entry = self._tasks.get(loop_key)
+        if entry is None or entry[0].done():
+            task = asyncio.ensure_future(fn())
+            entry = self._tasks[loop_key] = [task, 0]
+            task.add_done_callback(lambda done: self._forget_task(loop_key, done))
+        else:
+            print(f"[DEBUG] 진행 중인 동일 호출 결과를 기다립니다: {key[0]}{key[1:]}")
+        entry[1] += 1
+        task = entry[0]
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), remaining_or_none(deadline))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Deadline exceeded while waiting for in-flight {key[0]}")
+        return copy.deepcopy(result) if entry[1] > 1 else result
+
+
+SINGLE_FLIGHT = SingleFlight()
+
+
+def singleflight(*key_params):
+    """
+    함수 데코레이터. key_params로 지정한 인자 값과 함수 이름이 같은 동시 호출을 하나로 합칩니다.
+    대기자의 대기 시간은 그 호출의 deadline 인자로 제한합니다. 동기/비동기 함수 모두 사용할 수 있습니다.
+    예) @singleflight('stock_code', 'date')
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def call_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            key = (fn.__name__,) + tuple(_freeze(arguments.get(name)) for name in key_params)
+            return key, arguments.get('deadline')
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                key, deadline = call_key(args, kwargs)
+                return await SINGLE_FLIGHT.do_async(key, lambda: fn(*args, **kwargs), deadline)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key, deadline = call_key(args, kwargs)
+            return SINGLE_FLIGHT.do(key, lambda: fn(*args, **kwargs), deadline)
+        return wrapper
+
+    return decorator